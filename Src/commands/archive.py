@@ -0,0 +1,58 @@
+import datetime
+import time
+import click
+from sqlalchemy import delete, insert, literal, select
+from src.models.base import db
+from src.models.transaction import Transaction
+from src.models.transaction_archive import TransactionArchive, hot_horizon
+
+def archive_transactions(hot_days=None, batch_size=1000, echo=None):
+    """
+    Move transactions older than the hot horizon into transactions_archive.
+    Each batch is copied and deleted in its own short transaction, so the job
+    can be interrupted and rerun without holding long locks.
+    Returns the number of rows moved.
+    """
+    echo = echo or (lambda message: None)
+    cutoff = hot_horizon(hot_days)
+    hot = Transaction.__table__
+    cold = TransactionArchive.__table__
+    columns = [column.name for column in hot.columns]
+    moved = 0
+    # The primary, or the shard DATABASE_SHARD names
+    engine = db.session.get_bind(clause=hot)
+
+    while True:
+        with engine.begin() as connection:
+            ids = connection.execute(
+                select(hot.c.id)
+                .where(hot.c.created_at < cutoff)
+                .order_by(hot.c.created_at, hot.c.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            archived_at = literal(datetime.datetime.utcnow(), cold.c.archived_at.type)
+            connection.execute(
+                insert(cold).from_select(
+                    columns + ['archived_at'],
+                    select(*[hot.c[name] for name in columns], archived_at).where(hot.c.id.in_(ids))
+                )
+            )
+            connection.execute(delete(hot).where(hot.c.id.in_(ids)))
+
+        moved += len(ids)
+        echo(f'Archived {moved} transactions')
+
+    return moved
+
+def register_archive_commands(app):
+    @app.cli.command('archive-transactions')
+    @click.option('--batch-size', default=1000, show_default=True, help='Rows moved per transaction')
+    def archive(batch_size):
+        """Move transactions older than TRANSACTION_HOT_DAYS into transactions_archive."""
+        started = time.perf_counter()
+        moved = archive_transactions(batch_size=batch_size, echo=click.echo)
+        click.echo(f'Archived {moved} transactions older than '
+                   f"{app.config['TRANSACTION_HOT_DAYS']} days in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,44 @@
+import click
+from src.models.base import db
+
+def import_models():
+    """
+    Import every model module so db.metadata knows about all tables
+    """
+    from src.models import (  # noqa: F401
+        user,
+        account,
+        account_number_sequence,
+        transaction,
+        transaction_archive,
+        transaction_category,
+        bill,
+        budget,
+        outbox,
+        reconciliation_run,
+        journal,
+        balance_shard,
+        job,
+        user_shard
+    )
+
+def register_database_commands(app):
+    @app.cli.command('create-db')
+    def create_db():
+        """Create all database tables."""
+        from src.commands.shards import create_shard_schemas
+        import_models()
+        db.create_all()
+        # Shards hold only the per-user tables
+        create_shard_schemas()
+        click.echo('Database tables created')
+
+    @app.cli.command('drop-db')
+    @click.confirmation_option(prompt='This will drop every table. Continue?')
+    def drop_db():
+        """Drop all database tables."""
+        from src.commands.shards import drop_shard_schemas
+        import_models()
+        db.drop_all()
+        drop_shard_schemas()
+        click.echo('Database tables dropped')
@@ -0,0 +1,39 @@
+import json
+import signal
+import click
+from flask import current_app
+from src.models.base import db
+from src.models.utils.jobs import JOB_TYPES, JobWorker, job_queue
+
+def register_job_commands(app):
+    @app.cli.command('jobs-worker')
+    @click.option('--concurrency', type=int, help='Jobs run at once; defaults to JOB_WORKER_CONCURRENCY')
+    @click.option('--mode', type=click.Choice(['thread', 'process']), default='thread', show_default=True,
+                  help='Threads for I/O-bound jobs, processes for CPU-bound ones')
+    @click.option('--once', is_flag=True, help='Exit once no job is due instead of polling')
+    def jobs_worker(concurrency, mode, once):
+        """Claim and run queued jobs; run one per host, or several."""
+        worker = JobWorker(current_app._get_current_object(), concurrency, mode)
+        # Stop claiming on SIGTERM; jobs already running finish first
+        signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+        click.echo(f'Worker {worker.id} running up to {worker.concurrency} jobs in {mode} mode')
+        try:
+            finished = worker.run(once=once, echo=click.echo)
+        except KeyboardInterrupt:
+            worker.stop()
+            return
+        click.echo(', '.join(f'{count} {status}' for status, count in sorted(finished.items())) or 'No jobs due')
+
+    @app.cli.command('jobs-enqueue')
+    @click.argument('job_type', type=click.Choice(sorted(JOB_TYPES)))
+    @click.option('--payload', default='{}', show_default=True, help='JSON object passed to the job')
+    @click.option('--priority', type=int, default=0, show_default=True, help='Higher runs first')
+    def jobs_enqueue(job_type, payload, priority):
+        """Queue a job, e.g. a reconciliation run."""
+        try:
+            payload = json.loads(payload)
+        except ValueError as e:
+            raise click.ClickException(f'--payload is not JSON: {e}')
+        job = job_queue.enqueue(job_type, payload, priority=priority)
+        db.session.commit()
+        click.echo(f'Queued job {job.id} ({job_type})')
@@ -0,0 +1,104 @@
+import time
+import click
+from sqlalchemy import exists, select
+from src.models.base import db
+from src.models.account import Account
+from src.models.balance_shard import BalanceShard
+from src.models.journal import JournalLine
+from src.models.utils.ledger import (
+    fold_shards, opening_balance, posting_engine, rebuild_balances, set_balance_shards, trial_balance
+)
+
+ACCOUNTS = Account.__table__
+LINES = JournalLine.__table__
+SHARDS = BalanceShard.__table__
+
+def backfill_opening_entries(batch_size=1000):
+    """
+    Journal an opening entry for every account that has a balance but no
+    journal lines yet (accounts created before the ledger, or by the seeder).
+    The stored balances are already right, so nothing is projected.
+    Returns the number of accounts backfilled.
+    """
+    unjournaled = (
+        select(ACCOUNTS.c.id, ACCOUNTS.c.balance)
+        .where(ACCOUNTS.c.balance > 0, ~exists().where(LINES.c.account_id == ACCOUNTS.c.id))
+        .order_by(ACCOUNTS.c.id)
+    )
+    rows = db.session.execute(unjournaled).all()
+    for start in range(0, len(rows), batch_size):
+        posting_engine.post(
+            [opening_balance(account_id, balance) for account_id, balance in rows[start:start + batch_size]],
+            project=False
+        )
+        db.session.commit()
+    return len(rows)
+
+def fold_all_shards():
+    """
+    Fold the pending credits of every account with any, one account per
+    commit so no account's row lock is held for longer than its own fold.
+    Returns {account_id: amount folded}.
+    """
+    account_ids = db.session.execute(
+        select(SHARDS.c.account_id).where(SHARDS.c.balance != 0).distinct().order_by(SHARDS.c.account_id)
+    ).scalars().all()
+    db.session.rollback()
+    folded = {}
+    for account_id in account_ids:
+        folded[account_id] = fold_shards(account_id)
+        db.session.commit()
+    return folded
+
+def register_ledger_commands(app):
+    @app.cli.command('ledger-backfill')
+    @click.option('--batch-size', default=1000, show_default=True, help='Accounts journaled per commit')
+    def ledger_backfill(batch_size):
+        """Journal opening entries for balances that predate the ledger."""
+        count = backfill_opening_entries(batch_size)
+        click.echo(f'Journaled opening balances for {count} accounts')
+
+    @app.cli.command('ledger-rebuild')
+    @click.option('--dry-run', is_flag=True, help='Report drifted balances without rewriting them')
+    def ledger_rebuild(dry_run):
+        """Recompute cached account balances from the journal."""
+        debits, credits = trial_balance()
+        click.echo(f'Trial balance: debits {debits}, credits {credits}')
+        if debits != credits:
+            click.echo('The journal does not balance; fix it before trusting any rebuild', err=True)
+            raise SystemExit(1)
+
+        drifted = rebuild_balances()
+        for account_id, stored, projected in drifted:
+            click.echo(f'Account {account_id}: stored {stored}, journal {projected}')
+        if dry_run:
+            db.session.rollback()
+            click.echo(f'{len(drifted)} balances would be rebuilt')
+        else:
+            db.session.commit()
+            click.echo(f'Rebuilt {len(drifted)} balances')
+
+    @app.cli.command('ledger-shard-account')
+    @click.argument('account_id', type=int)
+    @click.option('--shards', default=8, show_default=True, help='Sub-balance rows to spread credits over; 0 turns it off')
+    def ledger_shard_account(account_id, shards):
+        """Spread a hot account's credits over several balance rows."""
+        try:
+            set_balance_shards(account_id, shards)
+        except LookupError as e:
+            raise click.ClickException(str(e))
+        db.session.commit()
+        click.echo(f'Account {account_id} now has {shards} balance shards')
+
+    @app.cli.command('ledger-fold-shards')
+    @click.option('--interval', default=0.0, show_default=True,
+                  help='Keep folding every this many seconds; 0 folds once and exits')
+    def ledger_fold_shards(interval):
+        """Fold hot accounts' pending shard credits into their balances."""
+        while True:
+            folded = fold_all_shards()
+            if folded or not interval:
+                click.echo(f'Folded {sum(folded.values())} across {len(folded)} accounts')
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,34 @@
+import click
+from src.models.utils.outbox import OutboxRelay, build_sink, prune_outbox
+
+def register_outbox_commands(app):
+    @app.cli.command('outbox-relay')
+    @click.option('--sink', 'sink_url', required=True,
+                  help='file:///path/events.jsonl, unix:///path/relay.sock or tcp://host:port')
+    @click.option('--consumer', default='default', show_default=True, help='Name the offset is stored under')
+    @click.option('--batch-size', default=1000, show_default=True, help='Events per delivery')
+    @click.option('--poll-interval', default=1.0, show_default=True, help='Seconds to wait when caught up')
+    @click.option('--once', is_flag=True, help='Exit once the outbox is drained')
+    def relay(sink_url, consumer, batch_size, poll_interval, once):
+        """Publish outbox events to a sink with at-least-once delivery."""
+        sink = build_sink(sink_url)
+        outbox_relay = OutboxRelay(
+            sink,
+            consumer=consumer,
+            batch_size=batch_size,
+            gap_timeout=app.config['OUTBOX_GAP_TIMEOUT_SECONDS']
+        )
+        try:
+            delivered = outbox_relay.run(poll_interval=poll_interval, once=once)
+        except KeyboardInterrupt:
+            delivered = None
+        finally:
+            sink.close()
+        if delivered is not None:
+            click.echo(f'Delivered {delivered} events to {consumer}')
+
+    @app.cli.command('outbox-prune')
+    @click.option('--keep-days', default=7, show_default=True, help='Keep delivered events this long')
+    def prune(keep_days):
+        """Delete outbox events every consumer has already received."""
+        click.echo(f'Pruned {prune_outbox(keep_days)} outbox events')
@@ -0,0 +1,285 @@
+import datetime
+import itertools
+import random
+import time
+import click
+from sqlalchemy import func, insert, select, update, bindparam
+from werkzeug.security import generate_password_hash
+from src.models.base import db
+from src.models.user import User
+from src.models.account import Account
+from src.models.transaction import Transaction
+from src.models.transaction_category import TransactionCategory
+from src.models.bill import Bill
+from src.models.budget import Budget
+
+SEED_PASSWORD = 'Seed1234!'
+
+CATEGORY_NAMES = [
+    'Housing', 'Food', 'Transportation', 'Utilities', 'Entertainment', 'Healthcare',
+    'Insurance', 'Education', 'Shopping', 'Travel', 'Savings', 'Salary'
+]
+
+BILLERS = ['Electricity Company', 'Water Company', 'Internet Provider', 'Mobile Carrier', 'Insurance Co', 'Landlord']
+
+# Relative activity by month (Jan..Dec) and weekday (Mon..Sun): a December peak and quieter Sundays
+MONTH_WEIGHTS = [0.85, 0.8, 0.9, 0.95, 1.0, 1.0, 1.05, 1.05, 0.95, 1.0, 1.15, 1.4]
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 1.05, 1.3, 1.2, 0.7]
+# Relative activity by hour of day
+HOUR_WEIGHTS = [0.1, 0.05, 0.05, 0.05, 0.05, 0.1, 0.3, 0.6, 0.9, 1.0, 1.0, 1.1,
+                1.3, 1.2, 1.0, 1.0, 1.0, 1.1, 1.2, 1.1, 0.9, 0.6, 0.4, 0.2]
+
+TRANSACTION_TYPES = ['deposit', 'withdrawal', 'transfer']
+TRANSACTION_TYPE_WEIGHTS = [0.3, 0.55, 0.15]
+
+# accounts.balance is Numeric(10, 2). The hottest accounts' deposits would
+# outgrow it at a few million transactions, so they stop at this balance
+# and those accounts only spend from then on.
+BALANCE_LIMIT = 99999999.99
+MAX_SEEDED_BALANCE = 10000000.0
+
+def _cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+def _zipf_cum_weights(count, exponent, rng):
+    """
+    Cumulative Zipf weights over `count` items in a random order, so activity
+    is concentrated on a few accounts without favouring low ids
+    """
+    weights = [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return _cumulative(weights)
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _tune_sqlite(connection):
+    # Bulk loading only: durability is irrelevant for a generated data set
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('PRAGMA synchronous = OFF')
+        connection.exec_driver_sql('PRAGMA journal_mode = MEMORY')
+
+def seed_database(users=1000, transactions=100000, seed=42, batch_size=50000,
+                  days=365, zipf_exponent=1.1, end_date=None, max_balance=MAX_SEEDED_BALANCE, echo=None):
+    """
+    Generate a reproducible data set with Core executemany inserts.
+    The same arguments always produce the same rows.
+    Returns a dict of row counts per table.
+    """
+    rng = random.Random(seed)
+    end_date = end_date or datetime.date.today()
+    start_date = end_date - datetime.timedelta(days=days)
+    echo = echo or (lambda message: None)
+    counts = {}
+
+    first_user_id = _next_id(User)
+    first_account_id = _next_id(Account)
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    db.session.remove()
+
+    with db.engine.begin() as connection:
+        _tune_sqlite(connection)
+
+        existing = set(connection.execute(select(TransactionCategory.name)).scalars())
+        missing = [{'name': name} for name in CATEGORY_NAMES if name not in existing]
+        if missing:
+            connection.execute(insert(TransactionCategory.__table__), missing)
+        category_ids = list(connection.execute(
+            select(TransactionCategory.id).order_by(TransactionCategory.id)
+        ).scalars())
+
+        opened_at = datetime.datetime.combine(start_date, datetime.time())
+        user_rows = []
+        account_rows = []
+        account_id = first_account_id
+        for user_id in range(first_user_id, first_user_id + users):
+            user_rows.append({
+                'id': user_id,
+                'username': f'seed{user_id}',
+                'email': f'seed{user_id}@example.com',
+                'password_hash': password_hash,
+                'first_name': 'Seed',
+                'last_name': f'User{user_id}',
+                'is_active': True
+            })
+            for index in range(rng.choices((1, 2, 3), weights=(0.5, 0.35, 0.15))[0]):
+                account_rows.append({
+                    'id': account_id,
+                    'user_id': user_id,
+                    'account_number': f'SD{account_id:010d}',
+                    'account_type': 'checking' if index == 0 else rng.choice(('savings', 'checking')),
+                    'balance': 0,
+                    'is_active': True,
+                    'created_at': opened_at,
+                    'updated_at': opened_at
+                })
+                account_id += 1
+
+        connection.execute(insert(User.__table__), user_rows)
+        connection.execute(insert(Account.__table__), account_rows)
+        counts['users'] = len(user_rows)
+        counts['accounts'] = len(account_rows)
+        echo(f'Inserted {len(user_rows)} users and {len(account_rows)} accounts')
+
+        accounts_by_user = {}
+        for row in account_rows:
+            accounts_by_user.setdefault(row['user_id'], []).append(row['id'])
+
+        bill_rows = []
+        budget_rows = []
+        for user_id, account_ids in accounts_by_user.items():
+            for _ in range(rng.randint(0, 4)):
+                due = end_date + datetime.timedelta(days=rng.randint(-30, 60))
+                bill_rows.append({
+                    'user_id': user_id,
+                    'biller_name': rng.choice(BILLERS),
+                    'due_date': due,
+                    'amount': round(rng.lognormvariate(4.5, 0.6), 2),
+                    'account_id': account_ids[0],
+                    'status': 'paid' if due < end_date and rng.random() < 0.8 else 'pending',
+                    'created_at': opened_at,
+                    'updated_at': opened_at
+                })
+            for index in range(rng.randint(0, 3)):
+                month_start = end_date.replace(day=1)
+                budget_rows.append({
+                    'user_id': user_id,
+                    'name': f'{rng.choice(CATEGORY_NAMES)} budget {index + 1}',
+                    'amount': float(rng.choice((200, 300, 500, 750, 1000))),
+                    'start_date': month_start,
+                    'end_date': month_start + datetime.timedelta(days=30),
+                    'created_at': opened_at,
+                    'updated_at': opened_at
+                })
+        if bill_rows:
+            connection.execute(insert(Bill.__table__), bill_rows)
+        if budget_rows:
+            connection.execute(insert(Budget.__table__), budget_rows)
+        counts['bills'] = len(bill_rows)
+        counts['budgets'] = len(budget_rows)
+
+    # Transactions: one opening deposit per account, then Zipf-distributed activity
+    all_account_ids = [row['id'] for row in account_rows]
+    account_cum_weights = _zipf_cum_weights(len(all_account_ids), zipf_exponent, rng)
+    day_weights = []
+    for offset in range(days):
+        day = start_date + datetime.timedelta(days=offset + 1)
+        day_weights.append(MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()])
+    day_cum_weights = _cumulative(day_weights)
+    day_offsets = range(1, days + 1)
+    hour_cum_weights = _cumulative(HOUR_WEIGHTS)
+    hours = range(24)
+    type_cum_weights = _cumulative(TRANSACTION_TYPE_WEIGHTS)
+
+    balances = dict.fromkeys(all_account_ids, 0.0)
+    table = Transaction.__table__
+    inserted = 0
+    started = time.perf_counter()
+
+    with db.engine.begin() as connection:
+        _tune_sqlite(connection)
+
+        opening_rows = []
+        for account_id in all_account_ids:
+            amount = round(rng.lognormvariate(8, 1), 2)
+            balances[account_id] += amount
+            opening_rows.append({
+                'account_id': account_id,
+                'transaction_type': 'deposit',
+                'amount': amount,
+                'description': 'Opening balance',
+                'category_id': None,
+                'created_at': opened_at,
+                'updated_at': opened_at
+            })
+        for start in range(0, len(opening_rows), batch_size):
+            connection.execute(insert(table), opening_rows[start:start + batch_size])
+        inserted += len(opening_rows)
+
+        remaining = max(transactions - len(opening_rows), 0)
+        while remaining:
+            size = min(batch_size, remaining)
+            account_choices = rng.choices(all_account_ids, cum_weights=account_cum_weights, k=size)
+            day_choices = rng.choices(day_offsets, cum_weights=day_cum_weights, k=size)
+            hour_choices = rng.choices(hours, cum_weights=hour_cum_weights, k=size)
+            type_choices = rng.choices(TRANSACTION_TYPES, cum_weights=type_cum_weights, k=size)
+
+            rows = []
+            for account_id, day_offset, hour, transaction_type in zip(
+                    account_choices, day_choices, hour_choices, type_choices):
+                created_at = opened_at + datetime.timedelta(
+                    days=day_offset, hours=hour, seconds=rng.randrange(3600))
+                if transaction_type == 'deposit' and balances[account_id] > max_balance - 1:
+                    transaction_type = 'withdrawal'
+                if transaction_type == 'deposit':
+                    amount = round(min(rng.lognormvariate(6, 1), max_balance - balances[account_id]), 2)
+                    balances[account_id] += amount
+                    category_id = None
+                else:
+                    amount = round(rng.lognormvariate(3.5, 1), 2)
+                    balances[account_id] -= amount
+                    category_id = rng.choice(category_ids)
+                rows.append({
+                    'account_id': account_id,
+                    'transaction_type': transaction_type,
+                    'amount': amount,
+                    'description': None,
+                    'category_id': category_id,
+                    'created_at': created_at,
+                    'updated_at': created_at
+                })
+
+            connection.execute(insert(table), rows)
+            inserted += size
+            remaining -= size
+            rate = inserted / (time.perf_counter() - started)
+            echo(f'Inserted {inserted} transactions ({rate:,.0f}/s)')
+
+        # Stored balances match the generated history so reconciliation starts clean
+        overflowing = [account_id for account_id, balance in balances.items() if abs(balance) > BALANCE_LIMIT]
+        if overflowing:
+            raise ValueError(f'Seeded balances of accounts {overflowing[:10]} do not fit accounts.balance')
+        accounts = Account.__table__
+        balance_rows = [
+            {'account_key': account_id, 'new_balance': round(balance, 2)}
+            for account_id, balance in balances.items()
+        ]
+        statement = (
+            update(accounts)
+            .where(accounts.c.id == bindparam('account_key'))
+            # Explicit, or onupdate would stamp the wall-clock time and break reproducibility
+            .values(balance=bindparam('new_balance'),
+                    updated_at=datetime.datetime.combine(end_date, datetime.time()))
+        )
+        for start in range(0, len(balance_rows), batch_size):
+            connection.execute(statement, balance_rows[start:start + batch_size])
+
+    counts['transactions'] = inserted
+    return counts
+
+def register_seed_commands(app):
+    @app.cli.command('seed')
+    @click.option('--users', default=1000, show_default=True, help='Users to create')
+    @click.option('--transactions', default=100000, show_default=True, help='Transactions to create')
+    @click.option('--seed', 'random_seed', default=42, show_default=True, help='Random seed')
+    @click.option('--batch-size', default=50000, show_default=True, help='Rows per executemany batch')
+    @click.option('--days', default=365, show_default=True, help='Days of history to spread transactions over')
+    @click.option('--zipf-exponent', default=1.1, show_default=True, help='Skew of activity across accounts')
+    @click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Last day of history (default: today); fix it for byte-identical runs')
+    def seed(users, transactions, random_seed, batch_size, days, zipf_exponent, end_date):
+        """Populate the database with synthetic users, accounts and transactions."""
+        started = time.perf_counter()
+        counts = seed_database(
+            users=users,
+            transactions=transactions,
+            seed=random_seed,
+            batch_size=batch_size,
+            days=days,
+            zipf_exponent=zipf_exponent,
+            end_date=end_date.date() if end_date else None,
+            echo=click.echo
+        )
+        summary = ', '.join(f'{count} {table}' for table, count in counts.items())
+        click.echo(f'Seeded {summary} in {time.perf_counter() - started:.1f}s')
+        click.echo(f'Every seeded user logs in as seed<id> with password {SEED_PASSWORD}')
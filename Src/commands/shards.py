@@ -0,0 +1,204 @@
+import time
+import click
+from sqlalchemy import MetaData, delete, func, insert, select, text
+from src.models.base import db
+from src.models.account import Account
+from src.models.balance_shard import BalanceShard
+from src.models.bill import Bill
+from src.models.budget import Budget
+from src.models.journal import JournalEntry, JournalLine
+from src.models.transaction import Transaction
+from src.models.transaction_archive import TransactionArchive
+from src.models.user import User
+from src.models.user_shard import UserShard
+from src.models.utils.sharding import SHARDED_TABLES, bind_key, shard_map, shard_name
+
+ACCOUNTS = Account.__table__
+SHARDS = BalanceShard.__table__
+ENTRIES = JournalEntry.__table__
+LINES = JournalLine.__table__
+USER_SHARDS = UserShard.__table__
+
+def shard_metadata(key):
+    """
+    The per-user tables as created on shard key: foreign keys to tables that
+    stay on the primary are dropped, and ids start at the shard's range
+    """
+    metadata = MetaData()
+    start = shard_map.id_start(key)
+    for source in db.metadata.sorted_tables:
+        if source.name not in SHARDED_TABLES:
+            continue
+        table = source.to_metadata(metadata)
+        for constraint in list(table.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split('.')[0] not in SHARDED_TABLES:
+                table.constraints.discard(constraint)
+                for element in constraint.elements:
+                    element.parent.foreign_keys.discard(element)
+                    table.foreign_keys.discard(element)
+        if table.autoincrement_column is not None:
+            table.dialect_options['mysql']['auto_increment'] = str(start)
+            table.dialect_options['sqlite']['autoincrement'] = True
+    return metadata
+
+def create_shard_schemas():
+    """
+    Create the per-user tables on every shard that lacks them. Returns the
+    shard keys. The primary's own tables come from migrations.
+    """
+    for key in shard_map.keys:
+        metadata = shard_metadata(key)
+        with db.engines[key].begin() as connection:
+            metadata.create_all(connection)
+            if connection.dialect.name == 'sqlite':
+                # AUTOINCREMENT continues from sqlite_sequence, so seeding it starts the range
+                for table in metadata.sorted_tables:
+                    if table.autoincrement_column is not None and not connection.execute(
+                        text('SELECT 1 FROM sqlite_sequence WHERE name = :name'), {'name': table.name}
+                    ).first():
+                        connection.execute(
+                            text('INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)'),
+                            {'name': table.name, 'seq': shard_map.id_start(key) - 1}
+                        )
+    return shard_map.keys
+
+def drop_shard_schemas():
+    for key in shard_map.keys:
+        shard_metadata(key).drop_all(db.engines[key])
+
+def user_counts():
+    """
+    {bind key: users homed there}, the primary included
+    """
+    counts = dict.fromkeys(shard_map.all_keys(), 0)
+    counts.update(db.session.execute(
+        select(USER_SHARDS.c.shard_key, func.count()).where(USER_SHARDS.c.shard_key.isnot(None))
+        .group_by(USER_SHARDS.c.shard_key)
+    ).all())
+    counts[None] = db.session.execute(select(func.count()).select_from(User.__table__)).scalar() - sum(
+        count for key, count in counts.items() if key is not None
+    )
+    return counts
+
+def _user_rows(connection, user_id, batch_size):
+    """
+    (table, condition) pairs selecting user_id's rows on connection's
+    database, parents before children
+    """
+    account_ids = connection.execute(select(ACCOUNTS.c.id).where(ACCOUNTS.c.user_id == user_id)).scalars().all()
+    entry_ids = connection.execute(
+        select(LINES.c.entry_id).where(LINES.c.account_id.in_(account_ids)).distinct().order_by(LINES.c.entry_id)
+    ).scalars().all()
+
+    rows = [(ACCOUNTS, ACCOUNTS.c.user_id == user_id), (SHARDS, SHARDS.c.account_id.in_(account_ids))]
+    for start in range(0, len(entry_ids), batch_size):
+        chunk = entry_ids[start:start + batch_size]
+        rows += [(ENTRIES, ENTRIES.c.id.in_(chunk)), (LINES, LINES.c.entry_id.in_(chunk))]
+    for model in (Transaction, TransactionArchive):
+        rows.append((model.__table__, model.__table__.c.account_id.in_(account_ids)))
+    for model in (Bill, Budget):
+        rows.append((model.__table__, model.__table__.c.user_id == user_id))
+    return rows
+
+def _check_id_ranges(connection, key):
+    # MySQL connections hand out ids by stride, so imported ids can't collide
+    # with later ones. Elsewhere the counter follows the highest id, which
+    # must stay inside the shard's own range.
+    if connection.dialect.name == 'mysql':
+        return
+    end = shard_map.id_start(key) + shard_map.id_span - 1
+    for table in shard_metadata(key).sorted_tables:
+        column = table.autoincrement_column
+        if column is not None and (connection.execute(select(func.max(column))).scalar() or 0) > end:
+            raise ValueError(
+                f'{table.name} ids would leave the id range of {shard_name(key)}; '
+                'on this backend users can only move to shards later in the list'
+            )
+
+def move_user(user_id, target, settle_seconds=None, batch_size=1000, echo=None):
+    """
+    Copy user_id's rows to shard target, point the shard map at it, then
+    delete them from the old shard; ids are kept. The user's requests get a
+    503 from when the move starts until the map is switched. An interrupted
+    move can be rerun. Returns {table name: rows copied}.
+    """
+    echo = echo or (lambda message: None)
+    if target not in shard_map.all_keys():
+        raise LookupError(f'No shard named {shard_name(target)}')
+    if db.session.get(User, user_id) is None:
+        raise LookupError(f'User {user_id} not found')
+
+    mapping = db.session.get(UserShard, user_id) or UserShard(user_id=user_id, shard_key=None)
+    source = mapping.shard_key
+    if source == target and not mapping.moving:
+        raise ValueError(f'User {user_id} is already on {shard_name(target)}')
+    mapping.moving = True
+    db.session.add(mapping)
+    db.session.commit()
+    shard_map.forget(user_id)
+
+    # Other processes keep a cached mapping this long before they see the move
+    settle_seconds = shard_map.cache_ttl if settle_seconds is None else settle_seconds
+    echo(f'Waiting {settle_seconds}s for workers to stop serving user {user_id}')
+    time.sleep(settle_seconds)
+
+    copied = {}
+    try:
+        if source != target:
+            with db.engines[source].connect() as reader, db.engines[target].begin() as writer:
+                # Left over from an interrupted move; the user isn't served from target yet
+                for table, condition in reversed(_user_rows(writer, user_id, batch_size)):
+                    writer.execute(delete(table).where(condition))
+                for table, condition in _user_rows(reader, user_id, batch_size):
+                    result = reader.execute(
+                        select(table).where(condition).order_by(*table.primary_key.columns)
+                        .execution_options(yield_per=batch_size)
+                    )
+                    for rows in result.partitions():
+                        writer.execute(insert(table), [row._asdict() for row in rows])
+                        copied[table.name] = copied.get(table.name, 0) + len(rows)
+                _check_id_ranges(writer, target)
+    except Exception:
+        mapping.moving = False
+        db.session.commit()
+        raise
+
+    mapping.shard_key = target
+    mapping.moving = False
+    db.session.commit()
+    shard_map.forget(user_id)
+    echo(f'User {user_id} is now served from {shard_name(target)}')
+
+    if source != target:
+        with db.engines[source].begin() as connection:
+            for table, condition in reversed(_user_rows(connection, user_id, batch_size)):
+                connection.execute(delete(table).where(condition))
+    return copied
+
+def register_shard_commands(app):
+    @app.cli.command('shards-create')
+    def shards_create():
+        """Create the per-user tables on every configured shard."""
+        keys = create_shard_schemas()
+        click.echo(f"Shard tables ready on {', '.join(keys)}" if keys else 'No DATABASE_SHARD_URLS configured')
+
+    @app.cli.command('shards-status')
+    def shards_status():
+        """Show how many users live on each shard."""
+        for key, count in user_counts().items():
+            click.echo(f'{shard_name(key)}: {count} users')
+
+    @app.cli.command('shards-move')
+    @click.argument('user_id', type=int)
+    @click.argument('target')
+    @click.option('--settle', type=float, help='Seconds to wait for cached shard maps to expire; '
+                                               'defaults to SHARD_MAP_CACHE_TTL')
+    @click.option('--batch-size', default=1000, show_default=True, help='Rows copied per INSERT')
+    def shards_move(user_id, target, settle, batch_size):
+        """Move a user's data to another shard (or 'primary')."""
+        try:
+            copied = move_user(user_id, bind_key(target), settle, batch_size, echo=click.echo)
+        except (LookupError, ValueError) as e:
+            raise click.ClickException(str(e))
+        for table, count in copied.items():
+            click.echo(f'{table}: {count} rows')
@@ -1,19 +1,34 @@
+from datetime import datetime
 from .base import db, BaseModel
+from .balance_shard import pending_balance
 from sqlalchemy.orm import relationship
 
 class Account(BaseModel):
     __tablename__ = 'accounts'
 
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     account_number = db.Column(db.String(20), unique=True, nullable=False)
     account_type = db.Column(db.String(50), nullable=False)
     balance = db.Column(db.Numeric(10, 2), default=0.00)
     is_active = db.Column(db.Boolean, default=True)
+    # Hot accounts (merchants, payroll): credits spread over this many
+    # BalanceShard rows instead of all waiting on this row's lock; 0 = off
+    balance_shards = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Every balance change bumps it; indexed so incremental reconciliation finds touched accounts
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationships
     user = relationship('User', back_populates='accounts')
     transactions = relationship('Transaction', back_populates='account')
 
+    def current_balance(self):
+        """Balance including credits still pending on the account's balance shards."""
+        if not self.balance_shards:
+            return self.balance
+        return db.session.scalar(
+            db.select(Account.balance + pending_balance(Account.id)).where(Account.id == self.id)
+        )
+
     def to_dict(self):
         """Convert account to dictionary for JSON serialization."""
         return {
@@ -21,7 +36,7 @@ class Account(BaseModel):
             'user_id': self.user_id,
             'account_number': self.account_number,
             'account_type': self.account_type,
-            'balance': float(self.balance),
+            'balance': float(self.current_balance()),
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
\ No newline at end of file
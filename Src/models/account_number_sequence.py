@@ -0,0 +1,11 @@
+from .base import db
+
+class AccountNumberSequence(db.Model):
+    """
+    High-water mark for account number allocation.
+    Workers advance next_value by a whole block and hand the block out from memory.
+    """
+    __tablename__ = 'account_number_sequences'
+
+    name = db.Column(db.String(50), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False, default=1)
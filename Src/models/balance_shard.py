@@ -0,0 +1,25 @@
+from .base import db
+
+class BalanceShard(db.Model):
+    """
+    One of an account's sub-balances. Credits to an account with
+    balance_shards > 0 land on a random shard instead of the accounts row;
+    the shards are folded into Account.balance by debits and by
+    `flask ledger-fold-shards`. Written only through utils/ledger.py.
+    """
+    __tablename__ = 'account_balance_shards'
+
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    balance = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+
+def pending_balance(account_id):
+    """
+    Credits not yet folded into the balance of the account with id account_id (a column)
+    """
+    shards = BalanceShard.__table__
+    return (
+        db.select(db.func.coalesce(db.func.sum(shards.c.balance), 0))
+        .where(shards.c.account_id == account_id)
+        .scalar_subquery()
+    )
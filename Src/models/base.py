@@ -1,7 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from src.models.utils.replica_routing import RoutingSession
 
-db = SQLAlchemy()
+# Reads from GET requests go to replicas when SQLALCHEMY_BINDS defines replica_* binds
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Plain declarative base for models that define their own id/timestamps
+Base = db.Model
 
 class BaseModel(db.Model):
     __abstract__ = True
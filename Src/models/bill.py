@@ -3,13 +3,16 @@ from src.models.base import db, Base
 
 class Bill(Base):
     __tablename__ = 'bills'
+    __table_args__ = (
+        db.Index('ix_bills_user_id_due_date', 'user_id', 'due_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     biller_name = db.Column(db.String(100), nullable=False)
     due_date = db.Column(db.Date, nullable=False)
     amount = db.Column(db.Float, nullable=False)
-    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False, index=True)
     status = db.Column(db.String(20), default='pending')  # pending, paid, cancelled
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -32,7 +35,7 @@ class Bill(Base):
             'user_id': self.user_id,
             'biller_name': self.biller_name,
             'due_date': self.due_date.isoformat() if self.due_date else None,
-            'amount': self.amount,
+            'amount': float(self.amount),
             'account_id': self.account_id,
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
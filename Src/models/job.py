@@ -0,0 +1,52 @@
+import json
+from datetime import datetime
+from .base import db
+
+class Job(db.Model):
+    """
+    A unit of slow work (an export, a reconciliation run) queued for
+    `flask jobs-worker`. Workers claim queued jobs highest priority first;
+    a failed attempt is retried after a backoff until max_attempts.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # The claim query: queued jobs by priority, oldest first
+        db.Index('ix_jobs_status_priority_id', 'status', 'priority', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)  # null for system jobs
+    job_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    priority = db.Column(db.Integer, nullable=False, default=0)  # higher runs first
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Set while running; a worker that stops renewing locked_at loses the job
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    progress_message = db.Column(db.String(255))
+    result_location = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'payload': json.loads(self.payload),
+            'status': self.status,
+            'priority': self.priority,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'progress': self.progress,
+            'progress_message': self.progress_message,
+            'result_location': self.result_location,
+            'error': self.error,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,59 @@
+from datetime import datetime
+from .base import db
+
+class JournalEntry(db.Model):
+    """
+    One balanced double-entry posting: the sum of its debit lines equals the
+    sum of its credit lines. Written only through utils/ledger.py.
+    """
+    __tablename__ = 'journal_entries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Unique per posting; lets a batch find its ids on backends without INSERT .. RETURNING
+    reference = db.Column(db.String(32), unique=True, nullable=False)
+    entry_type = db.Column(db.String(30), nullable=False)  # e.g., deposit, withdrawal, transfer, bill_payment
+    transaction_id = db.Column(db.Integer, index=True)  # not a foreign key: transactions get archived
+    description = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    lines = db.relationship('JournalLine', back_populates='entry', order_by='JournalLine.id')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'reference': self.reference,
+            'entry_type': self.entry_type,
+            'transaction_id': self.transaction_id,
+            'description': self.description,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'lines': [line.to_dict() for line in self.lines]
+        }
+
+class JournalLine(db.Model):
+    """
+    A debit or credit against either a customer account or a named system
+    ledger (cash, bill_settlement, ...). Customer balances are liabilities,
+    so a credit raises Account.balance and a debit lowers it.
+    """
+    __tablename__ = 'journal_lines'
+    __table_args__ = (
+        # Rebuilding or auditing one account's balance reads only its lines
+        db.Index('ix_journal_lines_account_id_entry_id', 'account_id', 'entry_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('journal_entries.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'))
+    ledger_account = db.Column(db.String(50))  # set instead of account_id for system ledgers
+    side = db.Column(db.String(6), nullable=False)  # debit, credit
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+
+    entry = db.relationship('JournalEntry', back_populates='lines')
+
+    def to_dict(self):
+        return {
+            'account_id': self.account_id,
+            'ledger_account': self.ledger_account,
+            'side': self.side,
+            'amount': float(self.amount)
+        }
@@ -0,0 +1,39 @@
+import json
+from datetime import datetime
+from .base import db
+
+class OutboxEvent(db.Model):
+    """
+    Domain event written in the same database transaction as the change it
+    describes; the outbox relay publishes it to downstream consumers
+    """
+    __tablename__ = 'outbox_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)  # e.g., transaction.created, bill.updated
+    aggregate_type = db.Column(db.String(50), nullable=False)
+    aggregate_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_type': self.event_type,
+            'aggregate_type': self.aggregate_type,
+            'aggregate_id': self.aggregate_id,
+            'payload': json.loads(self.payload),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class OutboxConsumerOffset(db.Model):
+    """
+    Id of the last event a named consumer has had delivered, and the lower
+    ids it passed before they committed
+    """
+    __tablename__ = 'outbox_consumer_offsets'
+
+    consumer = db.Column(db.String(100), primary_key=True)
+    last_event_id = db.Column(db.Integer, nullable=False, default=0)
+    gaps = db.Column(db.Text)  # JSON {id: epoch seconds it was first missed}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
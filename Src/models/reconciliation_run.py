@@ -0,0 +1,17 @@
+from datetime import datetime
+from .base import db
+
+class ReconciliationRun(db.Model):
+    """
+    One execution of `flask reconcile`; incremental runs start from the
+    started_at of the last completed run
+    """
+    __tablename__ = 'reconciliation_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String(20), nullable=False)  # full, incremental
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    accounts_checked = db.Column(db.Integer, default=0)
+    discrepancies = db.Column(db.Integer, default=0)
+    report_path = db.Column(db.String(255))
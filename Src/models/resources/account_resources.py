@@ -1,26 +1,52 @@
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.account import Account
+from src.models.transaction import Transaction
 from src.models.base import db
-import random
+from src.models.utils.account_numbers import account_number_allocator
+from src.models.utils.cache import account_cache
+from src.models.utils.outbox import record_event
+from src.models.utils.ledger import deposit, posting_engine
+from src.models.utils.fieldsets import ACCOUNT_FIELDS, UnknownFieldError
+from src.models.utils.schemas import ACCOUNT_CREATION_SCHEMA, ACCOUNT_UPDATE_SCHEMA, load_request
+from marshmallow import ValidationError
+
+def load_account_dicts(user_id):
+    # Plain column rows: the cache only ever needs the serialised form
+    names = ACCOUNT_FIELDS.names
+    rows = db.session.execute(
+        ACCOUNT_FIELDS.select(names).where(Account.user_id == user_id).order_by(Account.id)
+    )
+    return [ACCOUNT_FIELDS.serialize(row, names) for row in rows]
 
 class AccountListResource(Resource):
     @jwt_required()
     def get(self):
         current_user_id = get_jwt_identity()
-        accounts = Account.query.filter_by(user_id=current_user_id).all()
-        return [account.to_dict() for account in accounts], 200
+        try:
+            fields = ACCOUNT_FIELDS.from_request()
+        except UnknownFieldError as e:
+            return {'message': str(e)}, 400
+
+        # Invalidated on commit of any Account change, see utils/cache.py
+        accounts = account_cache.get_accounts(current_user_id, load_account_dicts)
+        return [ACCOUNT_FIELDS.project(account, fields) for account in accounts], 200
 
 class AccountResource(Resource):
     @jwt_required()
     def get(self, account_id):
         current_user_id = get_jwt_identity()
-        account = Account.query.filter_by(id=account_id, user_id=current_user_id).first()
+        try:
+            fields = ACCOUNT_FIELDS.from_request()
+        except UnknownFieldError as e:
+            return {'message': str(e)}, 400
+
+        account = account_cache.get_account(current_user_id, account_id, load_account_dicts)
         
         if not account:
             return {'message': 'Account not found or access denied'}, 404
         
-        return account.to_dict(), 200
+        return ACCOUNT_FIELDS.project(account, fields), 200
 
     @jwt_required()
     def put(self, account_id):
@@ -30,17 +56,18 @@ class AccountResource(Resource):
         if not account:
             return {'message': 'Account not found or access denied'}, 404
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('account_type', type=str)
-        parser.add_argument('is_active', type=bool)
-        args = parser.parse_args()
+        try:
+            args = load_request(ACCOUNT_UPDATE_SCHEMA)
+        except ValidationError as e:
+            return {'message': e.messages}, 400
 
         try:
-            if args['account_type']:
+            if args.get('account_type'):
                 account.account_type = args['account_type']
-            if args['is_active'] is not None:
+            if args.get('is_active') is not None:
                 account.is_active = args['is_active']
 
+            record_event('account.updated', 'account', account.id, account.to_dict())
             db.session.commit()
             return account.to_dict(), 200
         except Exception as e:
@@ -56,6 +83,7 @@ class AccountResource(Resource):
             return {'message': 'Account not found or access denied'}, 404
 
         try:
+            record_event('account.deleted', 'account', account.id, account.to_dict())
             db.session.delete(account)
             db.session.commit()
             return {'message': 'Account deleted successfully'}, 200
@@ -68,23 +96,39 @@ class AccountCreationResource(Resource):
     def post(self):
         current_user_id = get_jwt_identity()
         
-        parser = reqparse.RequestParser()
-        parser.add_argument('account_type', type=str, required=True, help='Account type is required')
-        parser.add_argument('initial_balance', type=float, default=0.0)
-        args = parser.parse_args()
+        try:
+            args = load_request(ACCOUNT_CREATION_SCHEMA)
+        except ValidationError as e:
+            return {'message': e.messages}, 400
 
-        # Generate unique account number
-        account_number = f'RB{random.randint(10000000, 99999999)}'
+        # Allocate from this worker's reserved block; never collides
+        account_number = account_number_allocator.allocate()
 
         new_account = Account(
             user_id=current_user_id,
             account_number=account_number,
             account_type=args['account_type'],
-            balance=args['initial_balance']
+            balance=0
         )
 
         try:
             db.session.add(new_account)
+            db.session.flush()
+            # The opening balance is a transaction like any other, so the
+            # balance always equals the net of the account's transactions
+            if args['initial_balance']:
+                opening = Transaction(
+                    account_id=new_account.id,
+                    transaction_type='deposit',
+                    amount=args['initial_balance'],
+                    description='Opening balance'
+                )
+                db.session.add(opening)
+                db.session.flush()
+                posting_engine.post([deposit(
+                    new_account.id, opening.amount, transaction_id=opening.id, description=opening.description
+                )])
+            record_event('account.created', 'account', new_account.id, new_account.to_dict())
             db.session.commit()
             return new_account.to_dict(), 201
         except Exception as e:
@@ -1,95 +1,204 @@
-from flask_restful import Resource, reqparse
+from datetime import timedelta
+from flask import Response, request
+from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.transaction import Transaction
+from src.models.transaction_archive import hot_horizon
 from src.models.account import Account
+from src.models.balance_shard import pending_balance
 from src.models.base import db
-from sqlalchemy import or_
+from src.models.utils.event_hub import event_hub, publish_transaction
+from src.models.utils.fieldsets import TRANSACTION_FIELDS, ARCHIVED_TRANSACTION_FIELDS, UnknownFieldError
+from src.models.utils.schemas import (
+    TRANSACTION_CREATION_SCHEMA, TRANSACTION_QUERY_SCHEMA, load_args, load_request, request_data
+)
+from src.models.utils.ledger import POSTINGS_BY_TRANSACTION_TYPE, InsufficientFundsError, posting_engine
+from marshmallow import ValidationError
+from sqlalchemy import select
 
 class TransactionListResource(Resource):
     @jwt_required()
     def get(self):
         current_user_id = get_jwt_identity()
-        
-        # Get all accounts for the current user
-        user_accounts = Account.query.filter_by(user_id=current_user_id).all()
-        account_ids = [account.id for account in user_accounts]
 
-        # Get transactions for these accounts
-        transactions = Transaction.query.filter(Transaction.account_id.in_(account_ids)).all()
-        return [transaction.to_dict() for transaction in transactions], 200
+        try:
+            args = load_args(TRANSACTION_QUERY_SCHEMA)
+            fields = TRANSACTION_FIELDS.from_request()
+        except ValidationError as e:
+            return {'message': e.messages}, 400
+        except UnknownFieldError as e:
+            return {'message': str(e)}, 400
+        start_date, end_date = args.get('start_date'), args.get('end_date')
+
+        # The hot table holds everything newer than the archive horizon, so the
+        # archive is only read when the requested range reaches further back,
+        # which a range with no start_date always does
+        fieldsets = [TRANSACTION_FIELDS]
+        if start_date is None or start_date < hot_horizon():
+            fieldsets.insert(0, ARCHIVED_TRANSACTION_FIELDS)
+
+        transactions = []
+        for fieldset in fieldsets:
+            model = fieldset.model
+            # Only the requested columns, for the user's accounts, in a single joined query
+            query = fieldset.select(fields).join(Account, model.account_id == Account.id).where(
+                Account.user_id == current_user_id
+            )
+            if start_date is not None:
+                query = query.where(model.created_at >= start_date)
+            if end_date is not None:
+                query = query.where(model.created_at < end_date + timedelta(days=1))
+            transactions.extend(fieldset.serialize(row, fields) for row in db.session.execute(query))
+        return transactions, 200
 
 class TransactionResource(Resource):
     @jwt_required()
     def get(self, transaction_id):
         current_user_id = get_jwt_identity()
-        
-        # Get all accounts for the current user
-        user_accounts = Account.query.filter_by(user_id=current_user_id).all()
-        account_ids = [account.id for account in user_accounts]
-
-        # Find the transaction and ensure it belongs to user's accounts
-        transaction = Transaction.query.filter(
-            Transaction.id == transaction_id,
-            Transaction.account_id.in_(account_ids)
-        ).first()
-
-        if not transaction:
-            return {'message': 'Transaction not found or access denied'}, 404
-        
-        return transaction.to_dict(), 200
+        try:
+            fields = TRANSACTION_FIELDS.from_request()
+        except UnknownFieldError as e:
+            return {'message': str(e)}, 400
+
+        # Find the transaction and ensure it belongs to user's accounts;
+        # ids are preserved on archival, so fall back to the archive on a miss
+        for fieldset in (TRANSACTION_FIELDS, ARCHIVED_TRANSACTION_FIELDS):
+            model = fieldset.model
+            row = db.session.execute(
+                fieldset.select(fields).join(Account, model.account_id == Account.id).where(
+                    model.id == transaction_id,
+                    Account.user_id == current_user_id
+                )
+            ).first()
+            if row:
+                return fieldset.serialize(row, fields), 200
+
+        return {'message': 'Transaction not found or access denied'}, 404
+
+def load_replay(user_id, after_id, limit):
+    """
+    The user's transactions with ids above after_id, oldest first, as stream
+    events carrying the account's current balance. Returns (events, truncated).
+    """
+    names = TRANSACTION_FIELDS.names
+    rows = db.session.execute(
+        TRANSACTION_FIELDS.select(names)
+        .add_columns(Account.balance + pending_balance(Account.id))
+        .join(Account, Transaction.account_id == Account.id)
+        .where(Account.user_id == user_id, Transaction.id > after_id)
+        .order_by(Transaction.id)
+        .limit(limit + 1)
+    ).all()
+    events = [
+        (row[0], {
+            'transaction': TRANSACTION_FIELDS.serialize(row[:-1], names),
+            'user_id': user_id,
+            'balance': float(row[-1])
+        })
+        for row in rows[:limit]
+    ]
+    return events, len(rows) > limit
+
+class TransactionStreamResource(Resource):
+    # EventSource can't set headers, so this route also takes ?jwt=<token>
+    @jwt_required(locations=['headers', 'query_string'])
+    def get(self):
+        """
+        Server-sent events: each new transaction on the user's accounts, with
+        the account's balance after it. Reconnects resume after Last-Event-ID.
+        """
+        if not event_hub.can_stream(request.environ):
+            return {'message': 'Streaming is not available on this server, please poll GET /transactions'}, 503
+        current_user_id = get_jwt_identity()
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        if last_event_id is not None and not last_event_id.isdigit():
+            return {'message': 'Last-Event-ID must be a transaction id'}, 400
+
+        # Subscribed before the replay query, so nothing committed in between is missed
+        subscription = event_hub.subscribe(current_user_id)
+        replay, truncated = [], False
+        if last_event_id is not None:
+            try:
+                replay, truncated = load_replay(current_user_id, int(last_event_id), event_hub.replay_limit)
+            except Exception:
+                event_hub.unsubscribe(subscription)
+                raise
+
+        # The body runs after this request's context and session are gone; it
+        # only waits on the hub, so an idle stream holds no database connection
+        return Response(
+            event_hub.stream(subscription, replay, truncated),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
 
 class TransactionCreationResource(Resource):
     @jwt_required()
     def post(self):
+        """
+        Create one transaction, or a JSON array of them posted as one batch
+        """
         current_user_id = get_jwt_identity()
-        
-        parser = reqparse.RequestParser()
-        parser.add_argument('account_id', type=int, required=True, help='Account ID is required')
-        parser.add_argument('transaction_type', type=str, required=True, help='Transaction type is required')
-        parser.add_argument('amount', type=float, required=True, help='Amount is required')
-        parser.add_argument('description', type=str)
-        args = parser.parse_args()
+        bulk = isinstance(request_data(), list)
+
+        try:
+            items = load_request(TRANSACTION_CREATION_SCHEMA, many=bulk)
+        except ValidationError as e:
+            return {'message': e.messages}, 400
+        if not bulk:
+            items = [items]
+        elif not items:
+            return {'message': 'No transactions to create'}, 400
 
         # Verify account ownership
-        account = Account.query.filter_by(id=args['account_id'], user_id=current_user_id).first()
-        if not account:
+        account_ids = {item['account_id'] for item in items}
+        owners = dict(db.session.execute(
+            select(Account.id, Account.user_id).where(Account.id.in_(account_ids), Account.user_id == current_user_id)
+        ).all())
+        if len(owners) != len(account_ids):
             return {'message': 'Account not found or access denied'}, 403
 
-        # Validate transaction type
-        valid_types = ['deposit', 'withdrawal', 'transfer']
-        if args['transaction_type'] not in valid_types:
-            return {'message': f'Invalid transaction type. Must be one of {valid_types}'}, 400
-
-        # Additional validation for withdrawal and transfer
-        if args['transaction_type'] in ['withdrawal', 'transfer']:
-            if args['amount'] > account.balance:
-                return {'message': 'Insufficient funds'}, 400
-
-        new_transaction = Transaction(
-            account_id=args['account_id'],
-            transaction_type=args['transaction_type'],
-            amount=args['amount'],
-            description=args.get('description')
-        )
+        transactions = [
+            Transaction(
+                account_id=item['account_id'],
+                transaction_type=item['transaction_type'],
+                amount=item['amount'],
+                description=item.get('description')
+            )
+            for item in items
+        ]
 
         try:
-            # Update account balance
-            if args['transaction_type'] == 'deposit':
-                account.balance += args['amount']
-            elif args['transaction_type'] in ['withdrawal', 'transfer']:
-                account.balance -= args['amount']
-
-            db.session.add(new_transaction)
+            db.session.add_all(transactions)
+            db.session.flush()
+            # Balances move only through the ledger, with the overdraft check in the same UPDATE
+            balances = posting_engine.post([
+                POSTINGS_BY_TRANSACTION_TYPE[transaction.transaction_type](
+                    transaction.account_id, transaction.amount,
+                    transaction_id=transaction.id, description=transaction.description
+                )
+                for transaction in transactions
+            ])
+            for transaction in transactions:
+                # Published by the outbox relay and to open streams once this commit lands
+                publish_transaction(transaction, current_user_id, balances[transaction.account_id])
             db.session.commit()
-            return new_transaction.to_dict(), 201
+        except InsufficientFundsError:
+            db.session.rollback()
+            return {'message': 'Insufficient funds'}, 400
         except Exception as e:
             db.session.rollback()
             return {'message': 'Error creating transaction', 'error': str(e)}, 500
 
+        if bulk:
+            return [transaction.to_dict() for transaction in transactions], 201
+        return transactions[0].to_dict(), 201
+
 def register_transaction_resources(api):
     api.add_resource(TransactionListResource, '/transactions')
     api.add_resource(TransactionCreationResource, '/transactions')
     api.add_resource(TransactionResource, '/transactions/<int:transaction_id>')
+    api.add_resource(TransactionStreamResource, '/transactions/stream')
 
 def register_additional_resources(api):
     # Placeholder for future additional resources like bill payments, investments
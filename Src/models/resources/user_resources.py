@@ -1,23 +1,18 @@
-from flask_restful import Resource, reqparse
+from flask_restful import Resource
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from src.models.user import User
 from src.models.base import db
-from werkzeug.exceptions import BadRequest
+from src.models.utils.fieldsets import USER_FIELDS, UnknownFieldError
+from src.models.utils.schemas import LOGIN_SCHEMA, USER_REGISTRATION_SCHEMA, USER_UPDATE_SCHEMA, load_request
+from src.models.utils.sharding import shard_map
+from marshmallow import ValidationError
 
 class UserRegistrationResource(Resource):
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('username', type=str, required=True, help='Username is required')
-        parser.add_argument('email', type=str, required=True, help='Email is required')
-        parser.add_argument('password', type=str, required=True, help='Password is required')
-        parser.add_argument('first_name', type=str)
-        parser.add_argument('last_name', type=str)
-        parser.add_argument('phone_number', type=str)
-        args = parser.parse_args()
-
-        # Validate input
-        if not args['username'] or not args['email'] or not args['password']:
-            return {'message': 'Missing required fields'}, 400
+        try:
+            args = load_request(USER_REGISTRATION_SCHEMA)
+        except ValidationError as e:
+            return {'message': e.messages}, 400
 
         # Check if user already exists
         if User.query.filter_by(username=args['username']).first():
@@ -38,6 +33,8 @@ class UserRegistrationResource(Resource):
         
         try:
             db.session.add(new_user)
+            db.session.flush()
+            shard_map.assign(new_user.id, db.session)
             db.session.commit()
             
             # Generate access token
@@ -54,10 +51,10 @@ class UserRegistrationResource(Resource):
 
 class UserLoginResource(Resource):
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument('username', type=str, required=True, help='Username is required')
-        parser.add_argument('password', type=str, required=True, help='Password is required')
-        args = parser.parse_args()
+        try:
+            args = load_request(LOGIN_SCHEMA)
+        except ValidationError as e:
+            return {'message': e.messages}, 400
 
         user = User.query.filter_by(username=args['username']).first()
         
@@ -74,10 +71,15 @@ class UserProfileResource(Resource):
     @jwt_required()
     def get(self):
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        try:
+            fields = USER_FIELDS.from_request()
+        except UnknownFieldError as e:
+            return {'message': str(e)}, 400
+
+        row = db.session.execute(USER_FIELDS.select(fields).where(User.id == current_user_id)).first()
         
-        if user:
-            return user.to_dict(), 200
+        if row:
+            return USER_FIELDS.serialize(row, fields), 200
         
         return {'message': 'User not found'}, 404
 
@@ -89,22 +91,20 @@ class UserProfileResource(Resource):
         if not user:
             return {'message': 'User not found'}, 404
 
-        parser = reqparse.RequestParser()
-        parser.add_argument('email', type=str)
-        parser.add_argument('first_name', type=str)
-        parser.add_argument('last_name', type=str)
-        parser.add_argument('phone_number', type=str)
-        args = parser.parse_args()
+        try:
+            args = load_request(USER_UPDATE_SCHEMA)
+        except ValidationError as e:
+            return {'message': e.messages}, 400
 
         try:
             # Update user fields if provided
-            if args['email']:
+            if args.get('email'):
                 user.email = args['email']
-            if args['first_name']:
+            if args.get('first_name'):
                 user.first_name = args['first_name']
-            if args['last_name']:
+            if args.get('last_name'):
                 user.last_name = args['last_name']
-            if args['phone_number']:
+            if args.get('phone_number'):
                 user.phone_number = args['phone_number']
 
             db.session.commit()
@@ -4,14 +4,18 @@ from sqlalchemy.orm import relationship
 
 class Transaction(BaseModel):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_account_id_created_at', 'account_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
     transaction_type = db.Column(db.String(50), nullable=False)  # e.g., deposit, withdrawal, transfer
     amount = db.Column(db.Float, nullable=False)
     description = db.Column(db.String(255))
-    category_id = db.Column(db.Integer, db.ForeignKey('transaction_categories.id'), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    category_id = db.Column(db.Integer, db.ForeignKey('transaction_categories.id'), nullable=True, index=True)
+    # Indexed for the archival job's oldest-first walk
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -35,7 +39,7 @@ class Transaction(BaseModel):
             'id': self.id,
             'account_id': self.account_id,
             'transaction_type': self.transaction_type,
-            'amount': self.amount,
+            'amount': float(self.amount),
             'description': self.description,
             'category_id': self.category_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from .base import db, Base
+
+def hot_horizon(hot_days=None):
+    """
+    Oldest created_at still guaranteed to be in the hot transactions table
+    """
+    if hot_days is None:
+        hot_days = current_app.config['TRANSACTION_HOT_DAYS']
+    return datetime.utcnow() - timedelta(days=hot_days)
+
+class TransactionArchive(Base):
+    """
+    Cold storage for transactions older than TRANSACTION_HOT_DAYS.
+    Rows keep their original id, so a transaction's URL never changes.
+    """
+    __tablename__ = 'transactions_archive'
+    __table_args__ = (
+        db.Index('ix_transactions_archive_account_id_created_at', 'account_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    transaction_type = db.Column(db.String(50), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    description = db.Column(db.String(255))
+    category_id = db.Column(db.Integer, db.ForeignKey('transaction_categories.id'), nullable=True)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Same shape as Transaction.to_dict so clients can't tell hot from cold rows."""
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'transaction_type': self.transaction_type,
+            'amount': self.amount,
+            'description': self.description,
+            'category_id': self.category_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,8 +1,7 @@
-from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-
-db = SQLAlchemy()
+from sqlalchemy.orm import relationship
+from .base import db
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -11,8 +10,14 @@ class User(UserMixin, db.Model):
     username = db.Column(db.String(50), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
+    first_name = db.Column(db.String(50))
+    last_name = db.Column(db.String(50))
+    phone_number = db.Column(db.String(20))
     is_active = db.Column(db.Boolean, default=True)
 
+    # Relationships
+    accounts = relationship('Account', back_populates='user')
+
     def set_password(self, password):
         """Create hashed password."""
         self.password_hash = generate_password_hash(password)
@@ -21,5 +26,17 @@ class User(UserMixin, db.Model):
         """Check hashed password."""
         return check_password_hash(self.password_hash, password)
 
+    def to_dict(self):
+        """Convert user to dictionary for JSON serialization."""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'phone_number': self.phone_number,
+            'is_active': self.is_active
+        }
+
     def __repr__(self):
         return f'<User {self.username}>'
\ No newline at end of file
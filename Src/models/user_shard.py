@@ -0,0 +1,16 @@
+from datetime import datetime
+from .base import db
+
+class UserShard(db.Model):
+    """
+    Which database shard holds a user's accounts, transactions, bills and
+    budgets. Lives on the primary with the users table; users without a row
+    are still on the primary. Read through utils/sharding.py's shard_map.
+    """
+    __tablename__ = 'user_shards'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    shard_key = db.Column(db.String(50))  # a shard_<n> bind, or null for the primary
+    # Set while `flask shards-move` copies the user; their requests get a 503 meanwhile
+    moving = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
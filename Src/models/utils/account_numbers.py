@@ -0,0 +1,107 @@
+import os
+import threading
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+from src.models.base import db
+from src.models.account_number_sequence import AccountNumberSequence
+
+ACCOUNT_NUMBER_PREFIX = 'RB'
+ACCOUNT_NUMBER_DIGITS = 9  # digits before the check digit
+MAX_ACCOUNT_SEQUENCE = 10 ** ACCOUNT_NUMBER_DIGITS - 1
+
+def luhn_check_digit(number):
+    """
+    Compute the Luhn check digit for a string of digits
+    """
+    total = 0
+    for position, char in enumerate(reversed(number)):
+        digit = int(char)
+        if position % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return str((10 - total % 10) % 10)
+
+def format_account_number(value):
+    """
+    Format a sequence value as RB + zero-padded digits + Luhn check digit
+    """
+    digits = f'{value:0{ACCOUNT_NUMBER_DIGITS}d}'
+    return f'{ACCOUNT_NUMBER_PREFIX}{digits}{luhn_check_digit(digits)}'
+
+def is_valid_account_number(account_number):
+    """
+    Check prefix, length and check digit of an allocated account number
+    """
+    if not account_number or not account_number.startswith(ACCOUNT_NUMBER_PREFIX):
+        return False
+    digits = account_number[len(ACCOUNT_NUMBER_PREFIX):]
+    if len(digits) != ACCOUNT_NUMBER_DIGITS + 1 or not digits.isdigit():
+        return False
+    return luhn_check_digit(digits[:-1]) == digits[-1]
+
+class AccountNumberAllocator:
+    """
+    Hands out account numbers from a block reserved in account_number_sequences.
+    Reserving a block is one short transaction; every number after that comes
+    from memory, so account creation never races on the unique constraint.
+    """
+    def __init__(self, sequence_name='accounts', block_size=100):
+        self.sequence_name = sequence_name
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def init_app(self, app):
+        self.block_size = app.config.get('ACCOUNT_NUMBER_BLOCK_SIZE', self.block_size)
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._next = 0
+        self._limit = 0
+
+    def allocate(self):
+        with self._lock:
+            # A forked worker must not reuse the block reserved by its parent
+            if self._pid != os.getpid():
+                self._reset()
+            if self._next >= self._limit:
+                self._next, self._limit = self._reserve_block()
+            value = self._next
+            self._next += 1
+        return format_account_number(value)
+
+    def _reserve_block(self):
+        table = AccountNumberSequence.__table__
+        for _ in range(2):
+            try:
+                with db.engine.begin() as connection:
+                    # The UPDATE takes the row lock, so concurrent workers get disjoint blocks
+                    result = connection.execute(
+                        update(table)
+                        .where(table.c.name == self.sequence_name)
+                        .values(next_value=table.c.next_value + self.block_size)
+                    )
+                    if result.rowcount:
+                        end = connection.execute(
+                            select(table.c.next_value).where(table.c.name == self.sequence_name)
+                        ).scalar_one()
+                    else:
+                        end = 1 + self.block_size
+                        connection.execute(
+                            insert(table).values(name=self.sequence_name, next_value=end)
+                        )
+            except IntegrityError:
+                # Another worker created the sequence row first; take the update path
+                continue
+
+            if end - 1 > MAX_ACCOUNT_SEQUENCE:
+                raise RuntimeError('Account number sequence exhausted')
+            return end - self.block_size, end
+
+        raise RuntimeError('Could not reserve an account number block')
+
+account_number_allocator = AccountNumberAllocator()
@@ -6,9 +6,7 @@ from flask import request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Handlers and format are configured once by the app (utils/logging_pipeline.py)
 logger = logging.getLogger(__name__)
 
 class Permissions:
@@ -144,7 +142,7 @@ def permission_required(*required_permissions):
             
             # Check if user has all required permissions
             if not all(perm in user_permissions for perm in required_permissions):
-                logger.warning(f"Insufficient permissions. Required: {required_permissions}")
+                logger.warning("Insufficient permissions. Required: %s", required_permissions)
                 return jsonify({
                     'message': 'Insufficient permissions',
                     'error': 'Forbidden'
@@ -190,7 +188,7 @@ def token_required(roles=None):
             
             # Check role-based access if roles are specified
             if roles and payload.get('role') not in roles:
-                logger.warning(f"Role {payload.get('role')} not in allowed roles: {roles}")
+                logger.warning("Role %s not in allowed roles: %s", payload.get('role'), roles)
                 return jsonify({
                     'message': 'Insufficient permissions',
                     'error': 'Forbidden'
@@ -0,0 +1,174 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from src.models.utils.replica_routing import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+class LocalCache:
+    """
+    In-process LRU cache with a per-entry TTL. Each worker has its own copy,
+    so the TTL bounds how stale another worker's entry can be.
+    """
+    def __init__(self, ttl=30, max_size=4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SharedCache:
+    """
+    Cache shared by every worker, backed by a redis-py compatible client
+    (get, set with ex=, delete). Values are stored as JSON. A failing backend
+    degrades to cache misses instead of failing the request.
+    """
+    def __init__(self, client, ttl=30, prefix='revobank:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning('Shared cache get failed: %s', e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+        except Exception as e:
+            logger.warning('Shared cache set failed: %s', e)
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        try:
+            self.client.delete(*[self.prefix + key for key in keys])
+        except Exception as e:
+            logger.warning('Shared cache delete failed: %s', e)
+
+    def clear(self):
+        # Shared entries belong to every worker; they expire on their own
+        pass
+
+def build_cache(config, prefix):
+    """
+    SharedCache when <prefix>_URL is set (requires the redis package),
+    LocalCache otherwise. Without a <prefix>_TTL the shared cache keeps
+    entries 30s and the local one caches nothing: invalidation only reaches
+    the worker that made the write.
+    """
+    url = config.get(f'{prefix}_URL')
+    ttl = config.get(f'{prefix}_TTL')
+    if ttl is None:
+        ttl = 30 if url else 0
+    if not url:
+        return LocalCache(ttl=ttl, max_size=config.get(f'{prefix}_MAX_SIZE', 4096))
+
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError(f'{prefix}_URL is set but the redis package is not installed') from e
+    return SharedCache(redis.Redis.from_url(url), ttl=ttl)
+
+class AccountCache:
+    """
+    Serialized account lists keyed by owner. Entries are dropped whenever a
+    session commits a change to one of the owner's Account rows.
+    """
+    def __init__(self):
+        self.backend = LocalCache()
+
+    def init_app(self, app):
+        self.backend = build_cache(app.config, 'ACCOUNT_CACHE')
+        self.backend.clear()
+
+    @staticmethod
+    def _key(user_id):
+        return f'accounts:user:{user_id}'
+
+    def get_accounts(self, user_id, loader):
+        """
+        Return the list of account dicts for user_id, calling loader(user_id) on a miss
+        """
+        accounts = self.backend.get(self._key(user_id))
+        if accounts is None:
+            accounts = loader(user_id)
+            self.backend.set(self._key(user_id), accounts)
+        return accounts
+
+    def get_account(self, user_id, account_id, loader):
+        for account in self.get_accounts(user_id, loader):
+            if account['id'] == account_id:
+                return account
+        return None
+
+    def invalidate(self, *user_ids):
+        self.backend.delete(*[self._key(user_id) for user_id in user_ids])
+
+account_cache = AccountCache()
+
+def mark_accounts_dirty(session, user_ids):
+    """
+    Invalidate these owners' cached accounts when the session commits; for
+    Core statements that bypass the unit of work
+    """
+    session.info.setdefault('dirty_account_users', set()).update(user_ids)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_account_owners(session, flush_context):
+    from src.models.account import Account
+    owners = {
+        instance.user_id
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, Account)
+    }
+    if owners:
+        mark_accounts_dirty(session, owners)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_accounts(session):
+    owners = session.info.pop('dirty_account_users', None)
+    if owners:
+        account_cache.invalidate(*owners)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_account_owners(session):
+    session.info.pop('dirty_account_users', None)
@@ -0,0 +1,112 @@
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional: the brotli extra
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/plain',
+    'text/csv',
+    'text/css',
+)
+
+# Server-sent events must reach the client chunk by chunk; never buffer them in a compressor
+NEVER_COMPRESS = ('text/event-stream',)
+
+class _GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        # wbits=31: a zlib stream with gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+class _BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def process(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+class Compression:
+    """
+    Compresses responses after the view returns. Negotiates br (when the
+    brotli package is installed) or gzip from Accept-Encoding, leaves small
+    bodies alone, and compresses streamed responses chunk by chunk.
+    """
+    def init_app(self, app):
+        if not app.config.get('COMPRESS_ENABLED', True):
+            return
+        app.after_request(self._compress_response)
+
+    @staticmethod
+    def _choose_encoding():
+        available = ['br', 'gzip'] if brotli is not None else ['gzip']
+        return request.accept_encodings.best_match(available)
+
+    @staticmethod
+    def _encoder(encoding):
+        if encoding == 'br':
+            return _BrotliEncoder(current_app.config.get('COMPRESS_BROTLI_QUALITY', 4))
+        return _GzipEncoder(current_app.config.get('COMPRESS_GZIP_LEVEL', 6))
+
+    def _compress_response(self, response):
+        if (response.mimetype in NEVER_COMPRESS
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or response.status_code < 200
+                or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.direct_passthrough
+                or request.method == 'HEAD'):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self._choose_encoding()
+        if encoding is None:
+            return response
+
+        encoder = self._encoder(encoding)
+
+        if response.is_streamed:
+            # Length unknown up front: compress as the body is produced, never buffer it
+            response.response = self._stream(response.response, encoder)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < current_app.config.get('COMPRESS_MIN_SIZE', 500):
+                return response
+            response.set_data(encoder.process(body) + encoder.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _stream(chunks, encoder):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                data = encoder.process(chunk)
+                if data:
+                    yield data
+            yield encoder.finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+compression = Compression()
@@ -0,0 +1,105 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from src.models.utils.metrics import Histogram
+
+class PoolMetrics:
+    """
+    Process-wide checkout statistics for the instrumented connection pools
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+        self.checkout_latency = Histogram()
+
+    def record_checkout(self, elapsed):
+        self.checkout_latency.observe(elapsed)
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += elapsed
+            if elapsed > self.max_wait:
+                self.max_wait = elapsed
+
+    def record_timeout(self, elapsed):
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait += elapsed
+
+    def snapshot(self):
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'total_wait_seconds': self.total_wait,
+                'max_wait_seconds': self.max_wait
+            }
+        latency = self.checkout_latency.snapshot()
+        stats['checkout_latency_seconds'] = {
+            'buckets': [{'le': str(upper_bound), 'count': count} for upper_bound, count in latency['buckets']],
+            'count': latency['count'],
+            'sum': latency['sum']
+        }
+        return stats
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout, including time spent waiting for a free slot
+    """
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout(time.perf_counter() - start)
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+def build_engine_options(config):
+    """
+    Translate the DB_POOL_* settings into SQLALCHEMY_ENGINE_OPTIONS
+    """
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE']
+    }
+
+    # SQLite uses single-connection pools that don't accept sizing arguments
+    if not config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=config['DB_POOL_SIZE'],
+            max_overflow=config['DB_MAX_OVERFLOW'],
+            pool_timeout=config['DB_POOL_TIMEOUT']
+        )
+
+    return options
+
+def pool_status(engine):
+    """
+    Current occupancy of an engine's pool
+    """
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout()
+        )
+
+    return status
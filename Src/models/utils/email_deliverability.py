@@ -0,0 +1,93 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from email_validator import EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+from src.models.utils.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+def lookup_domain(domain, timeout):
+    """
+    Whether domain accepts mail (MX, or the A/AAAA fallback). None when DNS
+    gave no answer in time, so a slow resolver is never mistaken for a verdict.
+    """
+    ascii_domain = domain.encode('idna').decode('ascii')
+    try:
+        info = validate_email_deliverability(ascii_domain, domain, timeout=timeout)
+    except EmailUndeliverableError:
+        return False
+    return None if 'unknown-deliverability' in info else True
+
+class DeliverabilityChecker:
+    """
+    Per-domain deliverability verdicts that never block a request. check()
+    answers from a TTL cache and, on a miss, queues the DNS lookup on a
+    background thread so a later registration for that domain gets the answer.
+
+        if email_deliverability.check('example.com') is False:
+            ...  # known not to accept mail; None means not known (yet)
+    """
+    def __init__(self, lookup=lookup_domain):
+        self.lookup = lookup
+        self.enabled = False
+        self.timeout = 5
+        self.results = LocalCache(ttl=3600, max_size=10000)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def init_app(self, app):
+        self.enabled = app.config.get('EMAIL_DELIVERABILITY_CHECK', False)
+        self.timeout = app.config.get('EMAIL_DNS_TIMEOUT', 5)
+        self.results = LocalCache(
+            ttl=app.config.get('EMAIL_DOMAIN_CACHE_TTL', 3600),
+            max_size=app.config.get('EMAIL_DOMAIN_CACHE_MAX_SIZE', 10000)
+        )
+
+    def check(self, domain):
+        if not self.enabled:
+            return None
+        domain = domain.lower()
+        verdict = self.results.get(domain)
+        if verdict is None:
+            self._schedule(domain)
+        return verdict
+
+    def wait(self, timeout=None):
+        """
+        Block until queued lookups finish; for tests and warm-up scripts
+        """
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+    def _get_executor(self):
+        # Threads don't survive fork, so each worker process builds its own pool
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email-dns')
+            self._executor_pid = os.getpid()
+            self._pending = {}
+        return self._executor
+
+    def _schedule(self, domain):
+        with self._lock:
+            executor = self._get_executor()
+            # One lookup per domain however many registrations arrive meanwhile
+            if domain not in self._pending:
+                self._pending[domain] = executor.submit(self._run, domain)
+
+    def _run(self, domain):
+        try:
+            verdict = self.lookup(domain, self.timeout)
+            if verdict is not None:
+                self.results.set(domain, verdict)
+        except Exception as e:
+            logger.warning('Email domain lookup failed for %s: %s', domain, e)
+        finally:
+            with self._lock:
+                self._pending.pop(domain, None)
+
+email_deliverability = DeliverabilityChecker()
@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, func, select
+from src.models.base import db
+from src.models.outbox import OutboxEvent
+from src.models.utils.outbox import OutboxCursor, record_event
+from src.models.utils.replica_routing import RoutingSession
+from src.models.utils.sharding import shard_map
+
+logger = logging.getLogger(__name__)
+
+OUTBOX = OutboxEvent.__table__
+
+def format_event(event_id, event_type, data):
+    """
+    One server-sent event, as sent on the wire
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
+
+HEARTBEAT = ': heartbeat\n\n'
+
+class Subscription:
+    """
+    One open stream's inbox. Publishers append and wake it; the stream drains
+    it. An inbox that fills up is marked overflowed rather than blocking the
+    publisher, and the stream tells its client to resync.
+    """
+    def __init__(self, user_id, max_pending):
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self.overflowed = False
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def put(self, event_id, data):
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.overflowed = True
+            else:
+                self._pending.append((event_id, data))
+        self._wakeup.set()
+
+    def wait(self, timeout):
+        """
+        Events published since the last call, waiting up to timeout for the first
+        """
+        self._wakeup.wait(timeout)
+        # Cleared before draining, so a put in between wakes the next wait
+        self._wakeup.clear()
+        with self._lock:
+            events = list(self._pending)
+            self._pending.clear()
+        return events
+
+class EventHub:
+    """
+    Fans committed transactions out to the open GET /transactions/stream
+    connections in this process. Writes made in this process are published
+    as their session commits; writes made by other workers reach it through
+    one outbox poller per process, started with the first subscriber.
+
+    Streams block on a threading.Event between events, so under gevent
+    (GUNICORN_WORKER_CLASS=gevent) an idle stream costs a greenlet, not a thread.
+    """
+    def __init__(self):
+        self.heartbeat_seconds = 15
+        self.retry_ms = 3000
+        self.max_pending = 1000
+        self.replay_limit = 500
+        self.poll_seconds = 1.0
+        self.gap_timeout = 300.0
+        self.app = None
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        # Ids this process published itself, so the outbox poller skips them
+        self._published = deque(maxlen=10000)
+        self._published_ids = set()
+        # OutboxCursor per database (None is the primary)
+        self._cursors = {}
+        self._poller_pid = None
+
+    def init_app(self, app):
+        self.app = app
+        self.heartbeat_seconds = app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+        self.retry_ms = app.config.get('SSE_RETRY_MS', 3000)
+        self.max_pending = app.config.get('SSE_MAX_PENDING', 1000)
+        self.replay_limit = app.config.get('SSE_REPLAY_LIMIT', 500)
+        self.poll_seconds = app.config.get('SSE_OUTBOX_POLL_SECONDS', 1.0)
+        self.gap_timeout = app.config.get('OUTBOX_GAP_TIMEOUT_SECONDS', 300.0)
+        # Streams and the poller belong to the previous app, which stops polling on its next tick
+        with self._lock:
+            self._subscribers = {}
+        self._cursors = {}
+        self._poller_pid = None
+
+    def can_stream(self, environ):
+        """
+        False under gunicorn's sync worker, where an open stream would hold
+        the whole worker until its timeout
+        """
+        if not environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+            return True
+        monkey = sys.modules.get('gevent.monkey')
+        return bool(environ.get('wsgi.multithread')) or (
+            monkey is not None and monkey.is_module_patched('threading')
+        )
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        self._ensure_poller()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def publish(self, user_id, event_id, data, local=True):
+        with self._lock:
+            if local:
+                if len(self._published) == self._published.maxlen:
+                    self._published_ids.discard(self._published[0])
+                self._published.append(event_id)
+                self._published_ids.add(event_id)
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event_id, data)
+
+    def stream(self, subscription, replay=(), truncated=False):
+        """
+        The response body for one subscription: replayed events first, then
+        live ones, with a comment line whenever heartbeat_seconds pass quietly
+        """
+        replayed = set()
+        try:
+            yield f'retry: {self.retry_ms}\n\n'
+            for event_id, data in replay:
+                replayed.add(event_id)
+                yield format_event(event_id, 'transaction', data)
+            if truncated:
+                yield format_event(None, 'resync', {'reason': 'replay limit reached'})
+            while True:
+                events = subscription.wait(self.heartbeat_seconds)
+                if subscription.overflowed:
+                    # Too far behind to catch up from memory; the client refetches
+                    yield format_event(None, 'resync', {'reason': 'stream fell behind'})
+                    return
+                if not events:
+                    yield HEARTBEAT
+                    continue
+                for event_id, data in events:
+                    # A write can be both replayed and published while the replay runs
+                    if event_id not in replayed:
+                        yield format_event(event_id, 'transaction', data)
+        finally:
+            self.unsubscribe(subscription)
+
+    def _ensure_poller(self):
+        if not self.poll_seconds or self.app is None or self._poller_pid == os.getpid():
+            return
+        with self._lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller_pid = os.getpid()
+        threading.Thread(target=self._poll_forever, args=(self.app,), name='event-hub-outbox', daemon=True).start()
+
+    def _poll_forever(self, app):
+        while self.app is app and self._poller_pid == os.getpid():
+            if self.subscriber_count():
+                try:
+                    with app.app_context():
+                        self.poll_outbox()
+                except Exception:
+                    logger.exception('Outbox poll for the event hub failed')
+            time.sleep(self.poll_seconds)
+
+    def poll_outbox(self, limit=1000):
+        """
+        Publish transaction events other processes committed since the last
+        poll, from the primary's outbox and every shard's. The first poll of
+        each only sets its cursor. Returns the number published.
+
+        As in OutboxRelay, ids passed before they committed are re-read until
+        they appear, so a lower id committed after a higher one isn't skipped.
+        """
+        return sum(self._poll_database(key, limit) for key in shard_map.all_keys())
+
+    def _poll_database(self, key, limit):
+        engine = db.engines[key]
+        bind = {'bind': engine}
+        if key not in self._cursors:
+            last_id = db.session.execute(
+                select(func.coalesce(func.max(OUTBOX.c.id), 0)), bind_arguments=bind
+            ).scalar()
+            self._cursors[key] = OutboxCursor(last_id, step=shard_map.id_step(engine), gap_timeout=self.gap_timeout)
+            return 0
+
+        # Every event type moves the cursor, or other events' ids would look like gaps
+        cursor = self._cursors[key]
+        rows = db.session.execute(
+            select(OUTBOX.c.id, OUTBOX.c.event_type, OUTBOX.c.aggregate_id, OUTBOX.c.payload)
+            .where(cursor.unread(OUTBOX.c.id))
+            .order_by(OUTBOX.c.id).limit(limit),
+            bind_arguments=bind
+        ).all()
+        cursor.advance([row.id for row in rows])
+        published = 0
+        for _, event_type, transaction_id, payload in rows:
+            if event_type != 'transaction.created' or transaction_id in self._published_ids:
+                continue
+            data = json.loads(payload)
+            self.publish(data['user_id'], transaction_id, data, local=False)
+            published += 1
+        return published
+
+event_hub = EventHub()
+
+def publish_transaction(transaction, user_id, balance):
+    """
+    Record a transaction.created outbox event and queue it for user_id's
+    streams; both happen only if the session commits
+    """
+    payload = {'transaction': transaction.to_dict(), 'user_id': user_id, 'balance': float(balance)}
+    record_event('transaction.created', 'transaction', transaction.id, payload)
+    db.session.info.setdefault('hub_events', []).append((user_id, transaction.id, payload))
+    return payload
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _publish_committed(session):
+    for user_id, event_id, payload in session.info.pop('hub_events', ()):
+        event_hub.publish(user_id, event_id, payload)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_uncommitted(session):
+    session.info.pop('hub_events', None)
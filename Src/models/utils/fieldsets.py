@@ -0,0 +1,103 @@
+from flask import request
+from sqlalchemy import Date, DateTime, Numeric, select
+from src.models.account import Account
+from src.models.balance_shard import pending_balance
+from src.models.transaction import Transaction
+from src.models.transaction_archive import TransactionArchive
+from src.models.bill import Bill
+from src.models.budget import Budget
+from src.models.transaction_category import TransactionCategory
+from src.models.user import User
+
+class UnknownFieldError(ValueError):
+    pass
+
+def _converter(column_type):
+    # Mirrors the conversions the models' to_dict methods apply
+    if isinstance(column_type, (Date, DateTime)):
+        return lambda value: value.isoformat() if value else None
+    if isinstance(column_type, Numeric):
+        return lambda value: float(value) if value is not None else None
+    return lambda value: value
+
+class Fieldset:
+    """
+    The public fields of a model (the keys of its to_dict) and how to fetch
+    and serialise any subset of them as plain columns, without loading
+    or hydrating ORM objects.
+
+        names = TRANSACTION_FIELDS.from_request()         # ?fields=id,amount
+        rows = db.session.execute(TRANSACTION_FIELDS.select(names).where(...))
+        return [TRANSACTION_FIELDS.serialize(row, names) for row in rows]
+    """
+    def __init__(self, model, names, resource, expressions=None):
+        self.model = model
+        self.names = tuple(names)
+        self.resource = resource
+        self._columns = {name: getattr(model, name) for name in self.names}
+        # Fields computed in SQL rather than read straight from their column
+        for name, expression in (expressions or {}).items():
+            self._columns[name] = expression.label(name)
+        self._converters = {name: _converter(model.__table__.c[name].type) for name in self.names}
+
+    def parse(self, raw):
+        """
+        Turn a comma-separated ?fields= value into field names; all fields when empty
+        """
+        requested = list(dict.fromkeys(name.strip() for name in (raw or '').split(',') if name.strip()))
+        unknown = [name for name in requested if name not in self._columns]
+        if unknown:
+            raise UnknownFieldError(
+                f"Unknown field(s) for {self.resource}: {', '.join(unknown)}. "
+                f"Available: {', '.join(self.names)}"
+            )
+        return tuple(requested) or self.names
+
+    def from_request(self):
+        return self.parse(request.args.get('fields'))
+
+    def select(self, names):
+        return select(*[self._columns[name] for name in names])
+
+    def serialize(self, row, names):
+        return {name: self._converters[name](value) for name, value in zip(names, row)}
+
+    def project(self, data, names):
+        """
+        Narrow an already serialised dict (e.g. a cached to_dict) to names
+        """
+        if names == self.names:
+            return data
+        return {name: data[name] for name in names}
+
+    def for_model(self, model):
+        """
+        The same public fields on a table with an identical layout
+        """
+        return Fieldset(model, self.names, self.resource)
+
+ACCOUNT_FIELDS = Fieldset(Account, [
+    'id', 'user_id', 'account_number', 'account_type', 'balance', 'is_active', 'created_at'
+], 'accounts', expressions={
+    # Hot accounts' credits sit in shard rows until folded; readers see them straight away
+    'balance': Account.balance + pending_balance(Account.id)
+})
+
+TRANSACTION_FIELDS = Fieldset(Transaction, [
+    'id', 'account_id', 'transaction_type', 'amount', 'description', 'category_id', 'created_at', 'updated_at'
+], 'transactions')
+ARCHIVED_TRANSACTION_FIELDS = TRANSACTION_FIELDS.for_model(TransactionArchive)
+
+BILL_FIELDS = Fieldset(Bill, [
+    'id', 'user_id', 'biller_name', 'due_date', 'amount', 'account_id', 'status', 'created_at', 'updated_at'
+], 'bills')
+
+BUDGET_FIELDS = Fieldset(Budget, [
+    'id', 'user_id', 'name', 'amount', 'start_date', 'end_date', 'created_at', 'updated_at'
+], 'budgets')
+
+CATEGORY_FIELDS = Fieldset(TransactionCategory, ['id', 'name'], 'categories')
+
+USER_FIELDS = Fieldset(User, [
+    'id', 'username', 'email', 'first_name', 'last_name', 'phone_number', 'is_active'
+], 'users')
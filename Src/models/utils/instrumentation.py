@@ -0,0 +1,123 @@
+import time
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from flask_restful.representations.json import output_json
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.models.utils.metrics import HistogramFamily, DEFAULT_COUNT_BUCKETS
+
+class RequestStats:
+    """Timings accumulated while one request is being served."""
+    __slots__ = ('start', 'sql_count', 'db_time', 'serialization_time')
+
+    def __init__(self, start):
+        self.start = start
+        self.sql_count = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+def _current_stats():
+    if has_request_context():
+        return g.get('_request_stats')
+    return None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.db_time += time.perf_counter() - context._query_started_at
+
+def _add_serialization_time(elapsed):
+    stats = _current_stats()
+    if stats is not None:
+        stats.serialization_time += elapsed
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that charges dumps() time to the current request."""
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            _add_serialization_time(time.perf_counter() - start)
+
+def timed_output_json(data, code, headers=None):
+    """Flask-RESTful JSON representation that records serialisation time."""
+    start = time.perf_counter()
+    try:
+        return output_json(data, code, headers)
+    finally:
+        _add_serialization_time(time.perf_counter() - start)
+
+class RequestMetrics:
+    """
+    Records wall time, SQL statement count, DB time and serialisation time
+    for every request, as a Server-Timing header and per-endpoint histograms
+    """
+    _sql_listeners_installed = False
+
+    def __init__(self):
+        self.request_duration = HistogramFamily(
+            'revobank_request_duration_seconds', 'Wall time spent handling a request')
+        self.db_duration = HistogramFamily(
+            'revobank_request_db_seconds', 'Time spent executing SQL during a request')
+        self.sql_statements = HistogramFamily(
+            'revobank_request_sql_statements', 'SQL statements executed during a request',
+            buckets=DEFAULT_COUNT_BUCKETS)
+        self.serialization_duration = HistogramFamily(
+            'revobank_request_serialization_seconds', 'Time spent serialising the response body')
+
+    def init_app(self, app, api=None):
+        if not app.config.get('REQUEST_METRICS_ENABLED', True):
+            return
+
+        self._install_sql_listeners()
+        app.json = TimedJSONProvider(app)
+        if api is not None:
+            api.representations['application/json'] = timed_output_json
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @classmethod
+    def _install_sql_listeners(cls):
+        # Listening on the Engine class covers the primary, replicas and any engine created later
+        if cls._sql_listeners_installed:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        cls._sql_listeners_installed = True
+
+    def _start_request(self):
+        g._request_stats = RequestStats(time.perf_counter())
+
+    def _finish_request(self, response):
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+
+        elapsed = time.perf_counter() - stats.start
+        response.headers['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.2f}, '
+            f'db;dur={stats.db_time * 1000:.2f};desc="{stats.sql_count} queries", '
+            f'ser;dur={stats.serialization_time * 1000:.2f}'
+        )
+
+        endpoint = request.endpoint or 'unmatched'
+        self.request_duration.labels(endpoint).observe(elapsed)
+        self.db_duration.labels(endpoint).observe(stats.db_time)
+        self.sql_statements.labels(endpoint).observe(stats.sql_count)
+        self.serialization_duration.labels(endpoint).observe(stats.serialization_time)
+        return response
+
+    def render(self):
+        lines = []
+        for family in (self.request_duration, self.db_duration,
+                       self.sql_statements, self.serialization_duration):
+            lines.extend(family.render())
+        return lines
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,337 @@
+import csv
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime, time as day_start, timedelta
+from sqlalchemy import and_, select, update
+from src.models.base import db
+from src.models.job import Job
+from src.models.utils.sharding import route_session, shard_map
+
+logger = logging.getLogger(__name__)
+
+JOBS = Job.__table__
+
+JobType = namedtuple('JobType', 'handler max_attempts')
+
+# Registered with @job_type; the ones users may queue through POST /jobs are
+# listed with their params' schema in schemas.JOB_PARAMS_SCHEMAS
+JOB_TYPES = {}
+
+def job_type(name, max_attempts=3):
+    """
+    Register handler(context, payload) as the runner for jobs of this type.
+    It returns the result file's path, or None, and raises to fail the attempt.
+    """
+    def register(handler):
+        JOB_TYPES[name] = JobType(handler, max_attempts)
+        return handler
+    return register
+
+def retry_delay(attempts, base, cap):
+    """
+    Seconds before retrying after the given number of failed attempts:
+    exponential, capped, and jittered so failed jobs don't retry in lockstep
+    """
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+class JobContext:
+    """
+    Handed to a job's handler alongside its payload: progress reporting and
+    where to write its result
+    """
+    def __init__(self, job_id, worker_id, user_id, results_dir):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.user_id = user_id
+        self.results_dir = results_dir
+
+    def progress(self, percent, message=None):
+        # Committed on its own connection straight away, so GET /jobs/<id>
+        # sees it while the handler's own transaction is still open
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(JOBS).where(JOBS.c.id == self.job_id, JOBS.c.locked_by == self.worker_id)
+                .values(progress=max(0, min(100, int(percent))), progress_message=message,
+                        locked_at=datetime.utcnow())
+            )
+
+    def result_path(self, filename):
+        directory = os.path.join(self.results_dir, str(self.job_id))
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+
+class JobQueue:
+    """
+    Jobs live in the `jobs` table. Workers claim them with
+    SELECT .. FOR UPDATE SKIP LOCKED plus a guarded UPDATE, so any number of
+    `flask jobs-worker` processes on any number of hosts can drain one queue
+    without running a job twice. A running job holds a lease (locked_at) its
+    worker keeps renewing; jobs whose lease runs out are retried.
+
+        enqueue('transactions_export', {'start_date': '2024-01-01'}, user_id=user.id)
+        db.session.commit()
+    """
+    def __init__(self):
+        self.concurrency = 4
+        self.poll_seconds = 1.0
+        self.lease_seconds = 300
+        self.retry_base_seconds = 10
+        self.retry_max_seconds = 3600
+        self.results_dir = None
+
+    def init_app(self, app):
+        self.concurrency = app.config.get('JOB_WORKER_CONCURRENCY', 4)
+        self.poll_seconds = app.config.get('JOB_POLL_SECONDS', 1.0)
+        self.lease_seconds = app.config.get('JOB_LEASE_SECONDS', 300)
+        self.retry_base_seconds = app.config.get('JOB_RETRY_BASE_SECONDS', 10)
+        self.retry_max_seconds = app.config.get('JOB_RETRY_MAX_SECONDS', 3600)
+        self.results_dir = app.config.get('JOB_RESULTS_DIR') or os.path.join(app.instance_path, 'jobs')
+
+    def enqueue(self, name, payload=None, user_id=None, priority=0):
+        """
+        Add a job to the session; it is queued when the caller commits
+        """
+        if name not in JOB_TYPES:
+            raise ValueError(f'Unknown job type: {name}')
+        job = Job(
+            job_type=name,
+            payload=json.dumps(payload or {}),
+            user_id=user_id,
+            priority=priority,
+            max_attempts=JOB_TYPES[name].max_attempts,
+            status='queued',
+            run_after=datetime.utcnow()
+        )
+        db.session.add(job)
+        return job
+
+    def claim(self, worker_id, limit):
+        """
+        Mark up to limit due jobs as running for worker_id; returns their ids
+        """
+        now = datetime.utcnow()
+        candidates = db.session.execute(
+            select(JOBS.c.id)
+            .where(JOBS.c.status == 'queued', JOBS.c.run_after <= now, JOBS.c.job_type.in_(list(JOB_TYPES)))
+            .order_by(JOBS.c.priority.desc(), JOBS.c.id)
+            .limit(limit)
+            # Rows other workers are claiming are skipped, not waited on (ignored by SQLite)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        claimed = []
+        for job_id in candidates:
+            # Guarded, so a backend without SKIP LOCKED still hands each job to one worker
+            result = db.session.execute(
+                update(JOBS).where(JOBS.c.id == job_id, JOBS.c.status == 'queued')
+                .values(status='running', locked_by=worker_id, locked_at=now, attempts=JOBS.c.attempts + 1)
+            )
+            if result.rowcount:
+                claimed.append(job_id)
+        db.session.commit()
+        return claimed
+
+    def renew(self, worker_id, job_ids):
+        if job_ids:
+            db.session.execute(
+                update(JOBS).where(JOBS.c.id.in_(job_ids), JOBS.c.locked_by == worker_id)
+                .values(locked_at=datetime.utcnow())
+            )
+            db.session.commit()
+
+    def reclaim_expired(self):
+        """
+        Fail, or queue for another attempt, running jobs whose worker stopped
+        renewing the lease (it crashed or lost its host). Returns how many.
+        """
+        now = datetime.utcnow()
+        expired = and_(JOBS.c.status == 'running', JOBS.c.locked_at < now - timedelta(seconds=self.lease_seconds))
+        error = 'Worker stopped renewing its lease'
+        failed = db.session.execute(
+            update(JOBS).where(expired, JOBS.c.attempts >= JOBS.c.max_attempts)
+            .values(status='failed', locked_by=None, error=error, finished_at=now)
+        ).rowcount
+        retried = db.session.execute(
+            update(JOBS).where(expired).values(status='queued', locked_by=None, error=error, run_after=now)
+        ).rowcount
+        db.session.commit()
+        return failed + retried
+
+    def run(self, job_id, worker_id):
+        """
+        Run one claimed job and record how it went. Returns the final status,
+        or None if the job is no longer this worker's.
+        """
+        job = db.session.get(Job, job_id)
+        if job is None or job.status != 'running' or job.locked_by != worker_id:
+            db.session.rollback()
+            return None
+        name, attempts, max_attempts = job.job_type, job.attempts, job.max_attempts
+        context = JobContext(job.id, worker_id, job.user_id, self.results_dir)
+        handler, payload = JOB_TYPES[name].handler, json.loads(job.payload)
+        db.session.commit()
+
+        owned = and_(JOBS.c.id == job_id, JOBS.c.locked_by == worker_id)
+        now = datetime.utcnow
+        try:
+            if context.user_id is not None and shard_map.enabled:
+                # A user's job reads that user's shard; a move in progress fails the attempt
+                route_session(db.session, shard_map.shard_for(context.user_id, db.session))
+            result_location = handler(context, payload)
+        except Exception as e:
+            db.session.rollback()
+            logger.exception('Job %s (%s) failed on attempt %s', job_id, name, attempts)
+            error = f'{type(e).__name__}: {e}'
+            if attempts >= max_attempts:
+                values = {'status': 'failed', 'finished_at': now()}
+            else:
+                delay = retry_delay(attempts, self.retry_base_seconds, self.retry_max_seconds)
+                values = {'status': 'queued', 'run_after': now() + timedelta(seconds=delay)}
+            db.session.execute(update(JOBS).where(owned).values(locked_by=None, error=error, **values))
+            db.session.commit()
+            return values['status']
+
+        db.session.execute(update(JOBS).where(owned).values(
+            status='succeeded', locked_by=None, progress=100, result_location=result_location,
+            error=None, finished_at=now()
+        ))
+        db.session.commit()
+        return 'succeeded'
+
+job_queue = JobQueue()
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+def _run_in_thread(app, job_id, claimed_by):
+    with app.app_context():
+        return job_queue.run(job_id, claimed_by)
+
+_process_app = None
+
+def _start_process():
+    # Each pool process builds its own app, and with it its own connection pool
+    global _process_app
+    from src.app import create_app
+    _process_app = create_app()
+
+def _run_in_process(job_id, claimed_by):
+    with _process_app.app_context():
+        return job_queue.run(job_id, claimed_by)
+
+class JobWorker:
+    """
+    Claims jobs for a pool of threads (I/O-bound work) or processes
+    (CPU-bound work) and keeps their leases alive while they run
+    """
+    def __init__(self, app, concurrency=None, mode='thread'):
+        self.app = app
+        self.concurrency = concurrency or job_queue.concurrency
+        self.mode = mode
+        self.id = worker_id()
+        self.stopping = threading.Event()
+
+    def _executor(self):
+        if self.mode == 'process':
+            return ProcessPoolExecutor(self.concurrency, initializer=_start_process)
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix='job')
+
+    def _submit(self, executor, job_id):
+        if self.mode == 'process':
+            return executor.submit(_run_in_process, job_id, self.id)
+        return executor.submit(_run_in_thread, self.app, job_id, self.id)
+
+    def run(self, once=False, echo=None):
+        """
+        Work until stop() (or, with once, until nothing is due). Returns
+        {status: count} for the jobs this worker finished.
+        """
+        echo = echo or (lambda message: None)
+        finished = {}
+        running = {}
+        last_renewal = time.monotonic()
+        with self._executor() as executor, self.app.app_context():
+            while not self.stopping.is_set():
+                job_queue.reclaim_expired()
+                claimed = job_queue.claim(self.id, self.concurrency - len(running)) if len(running) < self.concurrency else []
+                for job_id in claimed:
+                    running[self._submit(executor, job_id)] = job_id
+                    echo(f'Started job {job_id}')
+                if once and not running:
+                    break
+                if not running:
+                    self.stopping.wait(job_queue.poll_seconds)
+                    continue
+
+                done, _ = wait(running, timeout=job_queue.poll_seconds, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        status = future.result()
+                    except Exception:
+                        # The pool itself failed (e.g. a process died); the lease runs out and it's retried
+                        logger.exception('Job %s crashed its worker', job_id)
+                        status = 'crashed'
+                    finished[status] = finished.get(status, 0) + 1
+                    echo(f'Job {job_id}: {status}')
+
+                if time.monotonic() - last_renewal >= job_queue.lease_seconds / 3:
+                    job_queue.renew(self.id, list(running.values()))
+                    last_renewal = time.monotonic()
+        return finished
+
+    def stop(self):
+        self.stopping.set()
+
+def _parse_day(value):
+    return datetime.combine(date.fromisoformat(value), day_start.min) if value else None
+
+@job_type('transactions_export')
+def export_transactions(context, payload):
+    """
+    CSV of the user's hot and archived transactions, optionally between
+    start_date and end_date (inclusive ISO dates)
+    """
+    from src.models.account import Account
+    from src.models.utils.fieldsets import ARCHIVED_TRANSACTION_FIELDS, TRANSACTION_FIELDS
+
+    start, end = _parse_day(payload.get('start_date')), _parse_day(payload.get('end_date'))
+    path = context.result_path('transactions.csv')
+    names = TRANSACTION_FIELDS.names
+    fieldsets = (ARCHIVED_TRANSACTION_FIELDS, TRANSACTION_FIELDS)
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(names)
+        for index, fieldset in enumerate(fieldsets):
+            model = fieldset.model
+            query = fieldset.select(names).join(Account, model.account_id == Account.id).where(
+                Account.user_id == context.user_id
+            ).order_by(model.id)
+            if start is not None:
+                query = query.where(model.created_at >= start)
+            if end is not None:
+                query = query.where(model.created_at < end + timedelta(days=1))
+            for row in db.session.execute(query.execution_options(yield_per=1000)):
+                writer.writerow(fieldset.serialize(row, names).values())
+            context.progress((index + 1) * 100 // len(fieldsets), f'Exported {model.__tablename__}')
+    return path
+
+@job_type('reconcile', max_attempts=1)
+def run_reconciliation(context, payload):
+    """
+    flask reconcile, queued; payload may set incremental
+    """
+    from src.commands.reconcile import reconcile_balances
+    run = reconcile_balances(
+        incremental=payload.get('incremental', False),
+        report_path=context.result_path('reconciliation.csv')
+    )
+    return run.report_path
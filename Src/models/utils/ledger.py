@@ -0,0 +1,382 @@
+import random
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+from src.models.base import db
+from src.models.account import Account
+from src.models.balance_shard import BalanceShard, pending_balance
+from src.models.journal import JournalEntry, JournalLine
+from src.models.utils.cache import mark_accounts_dirty
+from src.models.utils.replica_routing import record_write
+
+DEBIT = 'debit'
+CREDIT = 'credit'
+
+# System ledgers on the other side of customer postings
+CASH = 'cash'
+EXTERNAL_TRANSFERS = 'external_transfers'
+BILL_SETTLEMENT = 'bill_settlement'
+OPENING_BALANCES = 'opening_balances'
+
+ACCOUNTS = Account.__table__
+ENTRIES = JournalEntry.__table__
+LINES = JournalLine.__table__
+SHARDS = BalanceShard.__table__
+
+# Read back after every balance change, to answer callers and refresh the session
+BALANCE_COLUMNS = (ACCOUNTS.c.id, ACCOUNTS.c.user_id, ACCOUNTS.c.balance, ACCOUNTS.c.updated_at)
+
+CENT = Decimal('0.01')
+
+class UnbalancedEntryError(ValueError):
+    pass
+
+class InsufficientFundsError(ValueError):
+    def __init__(self, account_id):
+        super().__init__(f'Insufficient funds in account {account_id}')
+        self.account_id = account_id
+
+def _money(amount):
+    return Decimal(str(amount)).quantize(CENT)
+
+def debit(amount, account_id=None, ledger_account=None):
+    return (DEBIT, _money(amount), account_id, ledger_account)
+
+def credit(amount, account_id=None, ledger_account=None):
+    return (CREDIT, _money(amount), account_id, ledger_account)
+
+class Posting:
+    """
+    A journal entry waiting to be written. Lines are (side, amount,
+    account_id, ledger_account) tuples from debit() and credit(); an
+    entry whose debits and credits differ is rejected here, before any SQL.
+    """
+    __slots__ = ('entry_type', 'lines', 'transaction_id', 'description', 'reference')
+
+    def __init__(self, entry_type, lines, transaction_id=None, description=None):
+        if len(lines) < 2:
+            raise UnbalancedEntryError('An entry needs at least one debit and one credit line')
+        for side, amount, account_id, ledger_account in lines:
+            if amount <= 0:
+                raise UnbalancedEntryError('Line amounts must be positive')
+            if (account_id is None) == (ledger_account is None):
+                raise UnbalancedEntryError('Each line posts to either an account or a system ledger')
+        debits = sum(amount for side, amount, _, _ in lines if side == DEBIT)
+        credits = sum(amount for side, amount, _, _ in lines if side == CREDIT)
+        if debits != credits:
+            raise UnbalancedEntryError(f'Debits ({debits}) and credits ({credits}) differ')
+
+        self.entry_type = entry_type
+        self.lines = lines
+        self.transaction_id = transaction_id
+        self.description = description
+        self.reference = uuid.uuid4().hex
+
+    def balance_changes(self):
+        """
+        (account_id, delta) for each customer account line; credits raise balances
+        """
+        for side, amount, account_id, _ in self.lines:
+            if account_id is not None:
+                yield account_id, amount if side == CREDIT else -amount
+
+def deposit(account_id, amount, transaction_id=None, description=None):
+    return Posting('deposit', [debit(amount, ledger_account=CASH), credit(amount, account_id=account_id)],
+                   transaction_id, description)
+
+def withdrawal(account_id, amount, transaction_id=None, description=None):
+    return Posting('withdrawal', [debit(amount, account_id=account_id), credit(amount, ledger_account=CASH)],
+                   transaction_id, description)
+
+def transfer(account_id, amount, to_account_id=None, transaction_id=None, description=None):
+    # Without a destination account the money leaves the bank through the clearing ledger
+    destination = credit(amount, account_id=to_account_id) if to_account_id else \
+        credit(amount, ledger_account=EXTERNAL_TRANSFERS)
+    return Posting('transfer', [debit(amount, account_id=account_id), destination], transaction_id, description)
+
+def bill_payment(account_id, amount, transaction_id=None, description=None):
+    return Posting('bill_payment', [debit(amount, account_id=account_id), credit(amount, ledger_account=BILL_SETTLEMENT)],
+                   transaction_id, description)
+
+def opening_balance(account_id, amount, description='Opening balance'):
+    return Posting('opening_balance', [debit(amount, ledger_account=OPENING_BALANCES),
+                                       credit(amount, account_id=account_id)], None, description)
+
+# Builders for the transaction types accepted by POST /transactions
+POSTINGS_BY_TRANSACTION_TYPE = {
+    'deposit': deposit,
+    'withdrawal': withdrawal,
+    'transfer': transfer
+}
+
+class PostingEngine:
+    """
+    Writes postings in batches: one multi-row INSERT for the entries, one for
+    their lines, and a single balance UPDATE per account per batch however
+    many postings touch it. Account.balance (plus, for hot accounts, its
+    BalanceShard rows) is a projection of the journal lines and is only ever
+    changed here (or rebuilt by `flask ledger-rebuild`).
+
+        balances = posting_engine.post([deposit(account.id, 25, transaction_id=t.id)])
+        db.session.commit()
+    """
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        # Accounts last seen sharded. Only a hint for which UPDATE to try
+        # first: a stale entry costs a statement, never a wrong balance
+        self.sharded_accounts = set()
+
+    def init_app(self, app):
+        self.batch_size = app.config.get('LEDGER_BATCH_SIZE', self.batch_size)
+        self.sharded_accounts = set()
+
+    def post(self, postings, session=None, project=True):
+        """
+        Write postings in the session's transaction; the caller commits, or
+        rolls back on error. A debit that would take an account below zero,
+        net of its batch, raises InsufficientFundsError. project=False records
+        entries for balances that are already stored (the backfill).
+        Returns {account_id: balance} for every customer account touched.
+        """
+        session = session or db.session
+        touched = {}
+        for start in range(0, len(postings), self.batch_size):
+            batch = postings[start:start + self.batch_size]
+            # Balances first: an overdraft fails the batch before anything is inserted
+            if project:
+                touched.update(self._apply_balance_changes(session, batch))
+            entry_ids = self._insert_entries(session, batch)
+            session.execute(insert(LINES), [
+                {'entry_id': entry_id, 'side': side, 'amount': amount,
+                 'account_id': account_id, 'ledger_account': ledger_account}
+                for entry_id, posting in zip(entry_ids, batch)
+                for side, amount, account_id, ledger_account in posting.lines
+            ])
+        record_write(session)
+        return self._refresh_balances(session, touched) if touched else {}
+
+    def _apply_balance_changes(self, session, batch):
+        """
+        One guarded UPDATE per account (a few more for sharded accounts);
+        returns {account_id: row} with the new balance, or None where it wasn't read back
+        """
+        changes = defaultdict(Decimal)
+        for posting in batch:
+            for account_id, delta in posting.balance_changes():
+                changes[account_id] += delta
+
+        returning = session.get_bind(clause=ACCOUNTS.update()).dialect.update_returning
+        # Fixed lock order, so concurrent batches over the same accounts can't deadlock
+        return {
+            account_id: _change_balance(session, account_id, changes[account_id], returning, self.sharded_accounts)
+            for account_id in sorted(changes)
+        }
+
+    @staticmethod
+    def _insert_entries(session, batch):
+        now = datetime.utcnow()
+        rows = [
+            {'reference': posting.reference, 'entry_type': posting.entry_type, 'transaction_id': posting.transaction_id,
+             'description': posting.description, 'created_at': now}
+            for posting in batch
+        ]
+        if len(rows) == 1:
+            return [session.execute(insert(ENTRIES).values(rows[0])).inserted_primary_key[0]]
+
+        # Rows come back keyed by reference, so RETURNING needn't preserve
+        # parameter order (which would cost SQLite one INSERT per row)
+        references = [row['reference'] for row in rows]
+        if session.get_bind(clause=ENTRIES.insert()).dialect.insert_executemany_returning:
+            ids = dict(session.execute(insert(ENTRIES).returning(ENTRIES.c.reference, ENTRIES.c.id), rows).all())
+        else:
+            # MySQL has no INSERT .. RETURNING: read the ids back
+            session.execute(insert(ENTRIES), rows)
+            ids = dict(session.execute(
+                select(ENTRIES.c.reference, ENTRIES.c.id).where(ENTRIES.c.reference.in_(references))
+            ).all())
+        return [ids[reference] for reference in references]
+
+    @staticmethod
+    def _refresh_balances(session, updated):
+        rows = [row for row in updated.values() if row is not None]
+        pending = {}
+        missing = [account_id for account_id, row in updated.items() if row is None]
+        if missing:
+            for row in session.execute(
+                select(*BALANCE_COLUMNS, pending_balance(ACCOUNTS.c.id).label('pending'))
+                .where(ACCOUNTS.c.id.in_(missing))
+            ):
+                rows.append(row)
+                pending[row.id] = row.pending
+        by_id = {row.id: row for row in rows}
+
+        # Keep Account objects already in the session in step without reloading them
+        for instance in session.identity_map.values():
+            row = by_id.get(instance.id) if isinstance(instance, Account) else None
+            if row is not None:
+                set_committed_value(instance, 'balance', row.balance)
+                set_committed_value(instance, 'updated_at', row.updated_at)
+        mark_accounts_dirty(session, {row.user_id for row in rows})
+        # Callers get the spendable balance, unfolded shard credits included
+        return {row.id: row.balance + pending.get(row.id, 0) for row in rows}
+
+posting_engine = PostingEngine()
+
+def _change_balance(session, account_id, delta, returning, sharded_accounts):
+    """
+    Apply one account's net change for a batch. Returns its BALANCE_COLUMNS
+    row, or None when it wasn't read back (no RETURNING, or a shard credit).
+    """
+    if account_id not in sharded_accounts:
+        # Matches unsharded accounts only; sharded and missing ones fall through
+        statement = (
+            update(ACCOUNTS).where(ACCOUNTS.c.id == account_id, ACCOUNTS.c.balance_shards == 0)
+            .values(balance=ACCOUNTS.c.balance + delta)
+        )
+        if delta < 0:
+            # Not below zero, give or take SQLite's float arithmetic on Numeric columns
+            statement = statement.where(ACCOUNTS.c.balance + delta > -0.005)
+        if returning:
+            row = session.execute(statement.returning(*BALANCE_COLUMNS)).first()
+            if row is not None:
+                return row
+        elif session.execute(statement).rowcount == 1:
+            return None
+
+    # Credits never lock the account row; debits hold it until commit
+    probe = select(ACCOUNTS.c.balance_shards).where(ACCOUNTS.c.id == account_id)
+    shard_count = session.execute(probe.with_for_update() if delta < 0 else probe).scalar()
+    if shard_count is None:
+        raise LookupError(f'Account {account_id} does not exist')
+    if shard_count:
+        sharded_accounts.add(account_id)
+    else:
+        sharded_accounts.discard(account_id)
+    if delta >= 0:
+        _credit_shard(session, account_id, delta, shard_count)
+        return None
+
+    # A debit spends the folded balance plus every pending credit
+    pending = _take_pending(session, account_id)
+    statement = (
+        update(ACCOUNTS).where(ACCOUNTS.c.id == account_id, ACCOUNTS.c.balance + pending + delta > -0.005)
+        .values(balance=ACCOUNTS.c.balance + pending + delta)
+    )
+    if returning:
+        row = session.execute(statement.returning(*BALANCE_COLUMNS)).first()
+        matched = row is not None
+    else:
+        row = None
+        matched = session.execute(statement).rowcount == 1
+    if not matched:
+        raise InsufficientFundsError(account_id)
+    return row
+
+def _credit_shard(session, account_id, amount, shard_count):
+    # A random shard, so concurrent credits rarely wait on the same row
+    credited = shard_count and session.execute(
+        update(SHARDS).where(SHARDS.c.account_id == account_id, SHARDS.c.shard == random.randrange(shard_count))
+        .values(balance=SHARDS.c.balance + amount)
+    ).rowcount
+    if not credited:
+        # Re-sharded since the probe: credit the account row itself
+        session.execute(update(ACCOUNTS).where(ACCOUNTS.c.id == account_id).values(balance=ACCOUNTS.c.balance + amount))
+
+def _take_pending(session, account_id):
+    """
+    Zero an account's shards and return what they held. Locks the shard rows
+    first, so a credit can't land between reading and zeroing them.
+    """
+    balances = session.execute(
+        select(SHARDS.c.balance).where(SHARDS.c.account_id == account_id).with_for_update()
+    ).scalars().all()
+    pending = sum(balances, Decimal(0))
+    if pending:
+        session.execute(update(SHARDS).where(SHARDS.c.account_id == account_id).values(balance=0))
+    return pending
+
+def fold_shards(account_id, session=None):
+    """
+    Move an account's pending shard credits into Account.balance under its
+    row lock; returns the amount moved. The caller commits.
+    """
+    session = session or db.session
+    locked = session.execute(
+        select(ACCOUNTS.c.id).where(ACCOUNTS.c.id == account_id).with_for_update()
+    ).scalar()
+    if locked is None:
+        raise LookupError(f'Account {account_id} does not exist')
+    pending = _take_pending(session, account_id)
+    if pending:
+        session.execute(update(ACCOUNTS).where(ACCOUNTS.c.id == account_id).values(balance=ACCOUNTS.c.balance + pending))
+        record_write(session)
+    return pending
+
+def set_balance_shards(account_id, shard_count, session=None):
+    """
+    Spread an account's credits over shard_count shards (0 turns sharding
+    off). Pending credits are folded first. The caller commits.
+    """
+    session = session or db.session
+    fold_shards(account_id, session)
+    session.execute(delete(SHARDS).where(SHARDS.c.account_id == account_id, SHARDS.c.shard >= shard_count))
+    existing = set(session.execute(select(SHARDS.c.shard).where(SHARDS.c.account_id == account_id)).scalars())
+    missing = [{'account_id': account_id, 'shard': shard, 'balance': 0}
+               for shard in range(shard_count) if shard not in existing]
+    if missing:
+        session.execute(insert(SHARDS), missing)
+    session.execute(update(ACCOUNTS).where(ACCOUNTS.c.id == account_id).values(balance_shards=shard_count))
+    record_write(session)
+
+def projected_balance():
+    """
+    An account's balance as its journal lines say it should be
+    """
+    return func.coalesce(func.sum(case((LINES.c.side == CREDIT, LINES.c.amount), else_=-LINES.c.amount)), 0)
+
+def balance_drift(session=None, account_ids=None):
+    """
+    [(account_id, stored, projected)] for accounts whose balance differs from their lines
+    """
+    session = session or db.session
+    projected = (
+        select(projected_balance()).where(LINES.c.account_id == ACCOUNTS.c.id).scalar_subquery()
+    )
+    # Unfolded shard credits are part of the stored balance
+    stored = func.coalesce(ACCOUNTS.c.balance, 0) + pending_balance(ACCOUNTS.c.id)
+    # Half a cent of slack: SQLite keeps Numeric columns as floats
+    query = select(ACCOUNTS.c.id, stored, projected).where(
+        func.abs(stored - projected) >= 0.005
+    ).order_by(ACCOUNTS.c.id)
+    if account_ids is not None:
+        query = query.where(ACCOUNTS.c.id.in_(account_ids))
+    return [(account_id, _money(stored), _money(value)) for account_id, stored, value in session.execute(query)]
+
+def rebuild_balances(session=None, account_ids=None):
+    """
+    Rewrite Account.balance from the journal for drifted accounts; returns them
+    """
+    session = session or db.session
+    drifted = balance_drift(session, account_ids)
+    for account_id, _, projected in drifted:
+        session.execute(update(SHARDS).where(SHARDS.c.account_id == account_id).values(balance=0))
+        session.execute(update(ACCOUNTS).where(ACCOUNTS.c.id == account_id).values(balance=projected))
+    if drifted:
+        owners = session.execute(
+            select(ACCOUNTS.c.user_id).where(ACCOUNTS.c.id.in_([row[0] for row in drifted]))
+        ).scalars()
+        mark_accounts_dirty(session, set(owners))
+    return drifted
+
+def trial_balance(session=None):
+    """
+    (total debits, total credits) over the whole journal; equal when every entry balanced
+    """
+    session = session or db.session
+    totals = dict(session.execute(
+        select(LINES.c.side, func.coalesce(func.sum(LINES.c.amount), 0)).group_by(LINES.c.side)
+    ).all())
+    return _money(totals.get(DEBIT, 0)), _money(totals.get(CREDIT, 0))
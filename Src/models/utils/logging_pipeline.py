@@ -0,0 +1,193 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Client-supplied ids are echoed into logs and headers, so keep them boring
+REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+# Attributes every LogRecord has; anything else was passed in extra= and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+def current_request_id():
+    if has_request_context():
+        return g.get('request_id')
+    return None
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message, request_id,
+    any extra= fields, and the formatted traceback when there is one
+    """
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None)
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets at most `burst` records per message template through every `interval`
+    seconds at WARNING and below, so a burst of e.g. "Invalid token" costs a
+    dict lookup per call instead of a log line. The first record of the next
+    window carries the number suppressed. Errors are never sampled.
+
+    Keys are the unformatted template, which is why log calls pass arguments
+    instead of f-strings.
+    """
+    max_keys = 1000
+
+    def __init__(self, burst=10, interval=60.0, max_level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_level = max_level
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level or self.burst <= 0:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                suppressed = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.burst:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the pipeline's bounded queue and returns. When the queue
+    is full the record is dropped and counted rather than making the request
+    wait; the next record that gets through carries the count.
+    """
+    def __init__(self, pipeline):
+        super().__init__(None)
+        self.pipeline = pipeline
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only the request id has to be captured on the request thread;
+        # interpolation, tracebacks and JSON encoding happen on the listener
+        record = copy.copy(record)
+        record.request_id = current_request_id()
+        return record
+
+    def enqueue(self, record):
+        dropped = self.dropped
+        if dropped:
+            record.dropped = dropped
+        try:
+            self.pipeline.queue_for_this_process().put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.dropped -= dropped
+
+class LogPipeline:
+    """
+    Root logging through a QueueHandler: request threads only enqueue, and a
+    QueueListener thread per process formats and writes. Installed once per
+    process however many apps are created; later init_app calls update the
+    level, format and sampling.
+    """
+    def __init__(self):
+        self.sampler = SamplingFilter()
+        self.output = logging.StreamHandler(sys.stderr)
+        self.handler = NonBlockingQueueHandler(self)
+        self.handler.addFilter(self.sampler)
+        self.queue_size = 10000
+        self.queue = None
+        self.listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        root = logging.getLogger()
+        root.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+        if self.handler not in root.handlers:
+            root.addHandler(self.handler)
+            atexit.register(self.stop)
+
+        self.queue_size = app.config.get('LOG_QUEUE_SIZE', 10000)
+        self.sampler.burst = app.config.get('LOG_SAMPLE_BURST', 10)
+        self.sampler.interval = app.config.get('LOG_SAMPLE_INTERVAL', 60)
+        if app.config.get('LOG_FORMAT', 'json') == 'json':
+            self.output.setFormatter(JSONFormatter())
+        else:
+            self.output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        app.before_request(_assign_request_id)
+        app.after_request(_echo_request_id)
+
+    def queue_for_this_process(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Started lazily, and again after a fork: the parent's listener
+                    # thread doesn't exist in the child
+                    self.queue = queue.Queue(self.queue_size)
+                    self.listener = QueueListener(self.queue, self.output, respect_handler_level=True)
+                    self.listener.start()
+                    self._pid = os.getpid()
+        return self.queue
+
+    def flush(self):
+        """
+        Wait until every queued record has been written
+        """
+        if self._pid == os.getpid():
+            self.queue.join()
+        self.output.flush()
+
+    def stop(self):
+        if self._pid == os.getpid() and self.listener is not None:
+            self.listener.stop()
+            self._pid = None
+
+def _assign_request_id():
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = incoming if REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+
+def _echo_request_id(response):
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+log_pipeline = LogPipeline()
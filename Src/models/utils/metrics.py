@@ -0,0 +1,95 @@
+import bisect
+import threading
+
+# Seconds; roughly log-spaced from 0.5ms to 10s
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+class Histogram:
+    """
+    Fixed-bucket histogram with Prometheus-style cumulative buckets
+    """
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            total = self._sum
+
+        cumulative = []
+        running = 0
+        for upper_bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative.append((upper_bound, running))
+        cumulative.append(('+Inf', count))
+
+        return {'buckets': cumulative, 'count': count, 'sum': total}
+
+# Statement counts per request
+DEFAULT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+class HistogramFamily:
+    """
+    A named set of histograms split by one label, e.g. one per endpoint
+    """
+    def __init__(self, name, documentation, label='endpoint', buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, value):
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(value, Histogram(self.buckets))
+        return child
+
+    def render(self):
+        """
+        Prometheus text exposition lines for every child histogram
+        """
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram'
+        ]
+        for value, histogram in sorted(self._children.items()):
+            snapshot = histogram.snapshot()
+            label = f'{self.label}="{_escape_label(value)}"'
+            for upper_bound, count in snapshot['buckets']:
+                lines.append(f'{self.name}_bucket{{{label},le="{upper_bound}"}} {count}')
+            lines.append(f'{self.name}_sum{{{label}}} {snapshot["sum"]}')
+            lines.append(f'{self.name}_count{{{label}}} {snapshot["count"]}')
+        return lines
+
+def render_gauge(name, documentation, samples, label=None):
+    """
+    Prometheus text exposition lines for a gauge; samples maps label value to number
+    """
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} gauge']
+    for value, number in sorted(samples.items()):
+        if label is None:
+            lines.append(f'{name} {number}')
+        else:
+            lines.append(f'{name}{{{label}="{_escape_label(value)}"}} {number}')
+    return lines
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
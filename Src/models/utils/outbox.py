@@ -0,0 +1,280 @@
+import datetime
+import json
+import logging
+import os
+import socket
+import time
+from urllib.parse import urlparse
+from sqlalchemy import delete, func, insert, or_, select, update
+from src.models.base import db
+from src.models.utils.sharding import shard_map
+from src.models.outbox import OutboxEvent, OutboxConsumerOffset
+
+logger = logging.getLogger(__name__)
+
+def record_event(event_type, aggregate_type, aggregate_id, payload):
+    """
+    Add an outbox row to the current session; it commits or rolls back with
+    the change it describes
+    """
+    event = OutboxEvent(
+        event_type=event_type,
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        payload=json.dumps(payload, default=str)
+    )
+    db.session.add(event)
+    return event
+
+class FileSink:
+    """
+    Appends one JSON document per line and fsyncs before acknowledging
+    """
+    def __init__(self, path):
+        self.path = path
+        self._handle = None
+
+    def send(self, events):
+        if self._handle is None:
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        self._handle.write(''.join(json.dumps(event) + '\n' for event in events))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+class SocketSink:
+    """
+    Streams newline-delimited JSON over a unix or TCP socket. After each batch
+    the receiver must answer with a line `OK`; anything else, or a timeout,
+    fails the batch so it is delivered again.
+    """
+    def __init__(self, family, address, timeout=10):
+        self.family = family
+        self.address = address
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+
+    def _connect(self):
+        self._socket = socket.socket(self.family, socket.SOCK_STREAM)
+        self._socket.settimeout(self.timeout)
+        self._socket.connect(self.address)
+        self._reader = self._socket.makefile('rb')
+
+    def send(self, events):
+        if self._socket is None:
+            self._connect()
+        try:
+            self._socket.sendall(''.join(json.dumps(event) + '\n' for event in events).encode())
+            ack = self._reader.readline().strip()
+        except OSError:
+            self.close()
+            raise
+        if ack != b'OK':
+            self.close()
+            raise ConnectionError(f'Sink did not acknowledge batch: {ack!r}')
+
+    def close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = None
+            self._reader = None
+
+def build_sink(url):
+    """
+    file:///path/events.jsonl, unix:///path/relay.sock or tcp://host:port
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == 'file':
+        return FileSink(parsed.path)
+    if parsed.scheme == 'unix':
+        return SocketSink(socket.AF_UNIX, parsed.path)
+    if parsed.scheme == 'tcp':
+        return SocketSink(socket.AF_INET, (parsed.hostname, parsed.port))
+    raise ValueError(f'Unsupported outbox sink: {url}')
+
+class OutboxCursor:
+    """
+    A reader's position in outbox_events. Ids are assigned at insert time but
+    become visible at commit, so a slower transaction can commit a lower id
+    after a higher one was read. Ids passed over that way are kept as gaps
+    and read again on every poll until they appear or gap_timeout seconds
+    pass; a rolled-back insert leaves a gap that never fills.
+    """
+    # A longer run of missing ids is the start of another database's id range
+    MAX_GAP_IDS = 500
+
+    def __init__(self, last_id=0, gaps=None, step=1, gap_timeout=300.0):
+        self.last_id = last_id
+        self.gaps = dict(gaps or {})  # id -> time.time() it was first missed
+        self.step = step
+        self.gap_timeout = gap_timeout
+
+    @classmethod
+    def load(cls, last_id, gaps_json, **kwargs):
+        gaps = {int(event_id): missed_at for event_id, missed_at in json.loads(gaps_json or '{}').items()}
+        return cls(last_id, gaps, **kwargs)
+
+    def dump_gaps(self):
+        return json.dumps({str(event_id): missed_at for event_id, missed_at in sorted(self.gaps.items())})
+
+    def unread(self, column):
+        """
+        Condition selecting the events past the cursor and the gaps below it
+        """
+        if not self.gaps:
+            return column > self.last_id
+        return or_(column > self.last_id, column.in_(sorted(self.gaps)))
+
+    def advance(self, ids, now=None):
+        """
+        Move past ids, read in ascending order with unread(); returns the
+        ones that filled a gap
+        """
+        now = time.time() if now is None else now
+        filled = []
+        for event_id in ids:
+            if event_id in self.gaps:
+                del self.gaps[event_id]
+                filled.append(event_id)
+                continue
+            # Below the first id read only a single-step sequence says where ids start
+            if (self.last_id or self.step == 1) and event_id - self.last_id <= self.MAX_GAP_IDS * self.step:
+                for missing in range(self.last_id + self.step, event_id, self.step):
+                    self.gaps.setdefault(missing, now)
+            self.last_id = max(self.last_id, event_id)
+        self.expire(now)
+        return filled
+
+    def expire(self, now=None):
+        """
+        Give up on gaps older than gap_timeout; returns whether any were dropped
+        """
+        now = time.time() if now is None else now
+        expired = [event_id for event_id, missed_at in self.gaps.items() if now - missed_at > self.gap_timeout]
+        for event_id in expired:
+            del self.gaps[event_id]
+        return bool(expired)
+
+class OutboxRelay:
+    """
+    Drains outbox_events to a sink in id order and records the consumer's
+    offset only after the sink accepted the batch (at-least-once delivery).
+    The offset keeps the consumer's OutboxCursor gaps, so an event that
+    commits after a higher id was delivered still goes out on a later poll.
+    """
+    def __init__(self, sink, consumer='default', batch_size=1000, gap_timeout=300.0):
+        self.sink = sink
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+
+    def offset(self, connection):
+        offsets = OutboxConsumerOffset.__table__
+        row = connection.execute(
+            select(offsets.c.last_event_id, offsets.c.gaps).where(offsets.c.consumer == self.consumer)
+        ).first()
+        if row is None:
+            connection.execute(insert(offsets).values(consumer=self.consumer, last_event_id=0))
+            row = (0, None)
+        return OutboxCursor.load(*row, step=shard_map.id_step(connection.engine), gap_timeout=self.gap_timeout)
+
+    def run_once(self):
+        """
+        Deliver one batch; returns the number of events delivered
+        """
+        events = OutboxEvent.__table__
+
+        # The primary, or the shard DATABASE_SHARD names; each has its own outbox
+        engine = db.session.get_bind(clause=events)
+        with engine.begin() as connection:
+            cursor = self.offset(connection)
+            rows = connection.execute(
+                select(events)
+                .where(cursor.unread(events.c.id))
+                .order_by(events.c.id)
+                .limit(self.batch_size)
+            ).all()
+        last_event_id = cursor.last_id
+        if not rows:
+            if cursor.expire():
+                self.save(engine, cursor, last_event_id)
+            return 0
+
+        # No transaction is held open while the sink is slow or unreachable
+        self.sink.send([
+            {
+                'id': row.id,
+                'event_type': row.event_type,
+                'aggregate_type': row.aggregate_type,
+                'aggregate_id': row.aggregate_id,
+                'payload': json.loads(row.payload),
+                'created_at': row.created_at.isoformat()
+            }
+            for row in rows
+        ])
+
+        # A crash before this commit redelivers the batch; consumers dedupe on id
+        cursor.advance([row.id for row in rows])
+        self.save(engine, cursor, last_event_id)
+        return len(rows)
+
+    def save(self, engine, cursor, read_at):
+        # Only if no other relay moved this consumer since read_at was read
+        offsets = OutboxConsumerOffset.__table__
+        with engine.begin() as connection:
+            connection.execute(
+                update(offsets)
+                .where(offsets.c.consumer == self.consumer, offsets.c.last_event_id == read_at)
+                .values(last_event_id=cursor.last_id, gaps=cursor.dump_gaps(),
+                        updated_at=datetime.datetime.utcnow())
+            )
+
+    def run(self, poll_interval=1.0, once=False, should_stop=lambda: False):
+        """
+        Drain continuously, polling when caught up. A failing sink is retried
+        with exponential backoff. Returns the total number of events delivered.
+        """
+        delivered = 0
+        backoff = poll_interval
+        while not should_stop():
+            try:
+                count = self.run_once()
+            except Exception as e:
+                if once:
+                    raise
+                logger.warning('Outbox relay %s failed, retrying in %.1fs: %s', self.consumer, backoff, e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+                continue
+
+            backoff = poll_interval
+            delivered += count
+            if count < self.batch_size:
+                if once:
+                    break
+                time.sleep(poll_interval)
+        return delivered
+
+def prune_outbox(keep_days=7):
+    """
+    Delete events every consumer has received and that are older than keep_days.
+    Nothing is pruned until at least one consumer has registered.
+    """
+    events = OutboxEvent.__table__
+    offsets = OutboxConsumerOffset.__table__
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=keep_days)
+
+    with db.session.get_bind(clause=events).begin() as connection:
+        delivered_to_all = connection.execute(select(func.min(offsets.c.last_event_id))).scalar()
+        if not delivered_to_all:
+            return 0
+        result = connection.execute(
+            delete(events).where(events.c.id <= delivered_to_all, events.c.created_at < cutoff)
+        )
+    return result.rowcount
@@ -0,0 +1,69 @@
+from collections import Counter
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryRecorder:
+    """
+    Context manager that records every SQL statement executed on any engine
+
+        with QueryRecorder() as queries:
+            client.get('/accounts', headers=headers)
+        assert queries.count <= 1
+    """
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(Engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(Engine, 'before_cursor_execute', self._record)
+        return False
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self):
+        """
+        Statements whose SQL text ran more than once; usually a per-entity (N+1) lookup
+        """
+        return {statement: times for statement, times in Counter(self.statements).items() if times > 1}
+
+    def assert_budget(self, max_queries, allow_repeats=False, label='block'):
+        problems = []
+        if self.count > max_queries:
+            problems.append(f'{label} ran {self.count} queries (budget {max_queries})')
+        if not allow_repeats:
+            for statement, times in self.repeated().items():
+                problems.append(f'{label} repeated a statement {times} times: {statement}')
+
+        if problems:
+            listing = '\n'.join(f'  {index + 1}. {statement}' for index, statement in enumerate(self.statements))
+            raise QueryBudgetExceeded('\n'.join(problems) + '\nStatements:\n' + listing)
+
+class query_budget:
+    """
+    Fail the enclosed block if it exceeds max_queries or repeats a statement
+    """
+    def __init__(self, max_queries, allow_repeats=False, label='block'):
+        self.max_queries = max_queries
+        self.allow_repeats = allow_repeats
+        self.label = label
+        self.recorder = QueryRecorder()
+
+    def __enter__(self):
+        return self.recorder.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.recorder.assert_budget(self.max_queries, self.allow_repeats, self.label)
+        return False
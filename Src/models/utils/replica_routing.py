@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from src.models.utils.sharding import is_sharded, shard_map
+
+READ_METHODS = ('GET', 'HEAD')
+STICKY_COOKIE = 'rw_sticky_until'
+
+def build_replica_binds(replica_urls):
+    """
+    Turn a comma-separated DATABASE_REPLICA_URLS value into SQLALCHEMY_BINDS entries
+    """
+    urls = [url.strip() for url in (replica_urls or '').split(',') if url.strip()]
+    return {f'replica_{index}': url for index, url in enumerate(urls)}
+
+def current_identity():
+    """
+    Identity of the caller without touching the database: the verified JWT
+    subject, or the flask-login user id stored in the session cookie
+    """
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+
+    if identity is None:
+        identity = flask_session.get('_user_id')
+    return str(identity) if identity is not None else None
+
+class ReplicaRouter:
+    """
+    Decides whether a read may go to a replica and remembers recent writers
+    so they read their own writes from the primary for a short window
+    """
+    def __init__(self, sticky_seconds=5, max_tracked_users=10000):
+        self.sticky_seconds = sticky_seconds
+        self.max_tracked_users = max_tracked_users
+        self._recent_writers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', self.sticky_seconds)
+        with self._lock:
+            self._recent_writers.clear()
+        app.after_request(self._set_sticky_cookie)
+
+    def replica_keys(self):
+        binds = current_app.config.get('SQLALCHEMY_BINDS') or {}
+        return [key for key in binds if key.startswith('replica_')]
+
+    def mark_write(self, identity):
+        until = time.time() + self.sticky_seconds
+        if has_request_context():
+            g.rw_sticky_until = until
+        if identity is None:
+            return
+        with self._lock:
+            self._recent_writers[identity] = until
+            self._recent_writers.move_to_end(identity)
+            while len(self._recent_writers) > self.max_tracked_users:
+                self._recent_writers.popitem(last=False)
+
+    def is_sticky(self, identity):
+        now = time.time()
+        if g.get('rw_sticky_until', 0) > now:
+            return True
+
+        # The cookie carries stickiness to other workers and hosts
+        try:
+            if float(request.cookies.get(STICKY_COOKIE, 0)) > now:
+                return True
+        except ValueError:
+            pass
+
+        if identity is None:
+            return False
+        with self._lock:
+            until = self._recent_writers.get(identity)
+            if until is not None and until <= now:
+                del self._recent_writers[identity]
+                until = None
+        return until is not None
+
+    def can_use_replica(self):
+        if not has_request_context() or request.method not in READ_METHODS:
+            return False
+        return not self.is_sticky(current_identity())
+
+    def _set_sticky_cookie(self, response):
+        until = g.get('rw_sticky_until')
+        if until:
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(until),
+                max_age=int(self.sticky_seconds) + 1,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+replica_router = ReplicaRouter()
+
+class RoutingSession(Session):
+    """
+    Session that sends statements on per-user tables to the caller's shard,
+    SELECTs issued while serving a GET to one replica, and everything else
+    (writes, reads in write requests, sticky users) to the primary
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and shard_map.enabled and is_sharded(mapper, clause):
+            key = self._shard_key()
+            if key is not None:
+                # Shards have no replicas of their own
+                return self._db.engines[key]
+        if bind is None and not self._flushing and not self.info.get('wrote'):
+            if getattr(clause, 'is_select', False):
+                engine = self._replica_engine()
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _shard_key(self):
+        # Decided once per session, from the caller's identity; sessions
+        # outside requests use DATABASE_SHARD unless routed with route_session
+        if 'shard_key' not in self.info:
+            identity = current_identity() if has_request_context() else None
+            if identity is None:
+                self.info['shard_key'] = shard_map.default_key
+            else:
+                self.info['shard_key'] = shard_map.shard_for(int(identity), self)
+        return self.info['shard_key']
+
+    def _replica_engine(self):
+        if not has_request_context():
+            return None
+
+        # Decided once per session so a request reads a single, consistent replica
+        if 'replica_key' not in self.info:
+            keys = replica_router.replica_keys()
+            use_replica = keys and replica_router.can_use_replica()
+            self.info['replica_key'] = random.choice(keys) if use_replica else None
+
+        key = self.info['replica_key']
+        return self._db.engines[key] if key else None
+
+def record_write(session):
+    """
+    Pin the session to the primary from here on; called on flush, and by
+    code that writes with Core statements the unit of work never sees
+    """
+    session.info['wrote'] = True
+    # Any further reads in this session must see the rows just written
+    session.info['replica_key'] = None
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _record_write(session, flush_context):
+    record_write(session)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _mark_sticky(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        replica_router.mark_write(current_identity())
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_write(session):
+    session.info.pop('wrote', None)
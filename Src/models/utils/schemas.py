@@ -0,0 +1,213 @@
+import re
+from datetime import datetime, time
+from decimal import Decimal
+from flask import request
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, post_load, validate, validates_schema
+from src.models.utils.email_deliverability import email_deliverability
+from src.models.utils.validators import DIGIT_RE, LOWERCASE_RE, UPPERCASE_RE, validate_email_address
+
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+TRANSACTION_TYPES = ['deposit', 'withdrawal', 'transfer']
+BILL_STATUSES = ['pending', 'paid', 'cancelled']
+
+DATE_FORMAT_ERROR = 'Invalid date format. Use YYYY-MM-DD'
+
+# Largest single amount; well inside accounts.balance's Numeric(10, 2)
+MAX_AMOUNT = Decimal('1000000.00')
+
+class RequestSchema(Schema):
+    """
+    Base for request bodies. Unknown keys are dropped rather than rejected,
+    as reqparse did, so clients sending extra fields keep working.
+    """
+    class Meta:
+        unknown = EXCLUDE
+
+def request_data():
+    """
+    The JSON body, or the form for clients posting form-encoded data
+    """
+    data = request.get_json(silent=True)
+    return request.form.to_dict() if data is None else data
+
+def load_request(schema, many=None):
+    """
+    Validate and deserialise the request body; a JSON array with many=True.
+    Raises marshmallow.ValidationError.
+    """
+    return schema.load(request_data(), many=many)
+
+def load_args(schema):
+    return schema.load(request.args)
+
+def error_message(error):
+    """
+    One line out of ValidationError.messages for the blueprints' {'error': ...}
+    responses, e.g. "due_date: Invalid date format. Use YYYY-MM-DD"
+    """
+    return '; '.join(_flatten(error.messages))
+
+def _flatten(messages, path=()):
+    if isinstance(messages, dict):
+        for key, value in messages.items():
+            # Whole-schema errors are keyed _schema and aren't about one field
+            yield from _flatten(value, path if key == '_schema' else path + (str(key),))
+    elif isinstance(messages, list):
+        for message in messages:
+            yield from _flatten(message, path)
+    else:
+        yield f"{'.'.join(path)}: {messages}" if path else messages
+
+class Money(fields.Decimal):
+    """
+    An amount in whole cents, loaded as a Decimal. Sub-cent values are
+    rejected rather than rounded, so what's stored is what the ledger posts.
+    """
+    default_error_messages = {'sub_cent': 'Amount cannot have more than two decimal places'}
+
+    def __init__(self, **kwargs):
+        super().__init__(places=2, **kwargs)
+
+    def _format_num(self, value):
+        num = super()._format_num(value)
+        if num.is_finite() and num != Decimal(str(value)):
+            raise self.make_error('sub_cent')
+        return num
+
+def _positive(message):
+    return validate.Range(min=0, min_inclusive=False, error=message)
+
+def _amount(message):
+    return [_positive(message), validate.Range(max=MAX_AMOUNT, error=f'Amount cannot exceed {MAX_AMOUNT}')]
+
+def _date(**kwargs):
+    return fields.Date(error_messages={'invalid': DATE_FORMAT_ERROR}, **kwargs)
+
+def _email_syntax(email):
+    valid, message = validate_email_address(email)
+    if not valid:
+        raise ValidationError(message)
+
+def _deliverable(email):
+    # Never waits on DNS: a cached verdict, or a lookup queued for next time
+    if email_deliverability.check(email.rpartition('@')[2]) is False:
+        raise ValidationError('The domain name of this email address does not accept email')
+
+def _auth_password(password):
+    if len(password) < 8 or not (UPPERCASE_RE.search(password) and LOWERCASE_RE.search(password)
+                                 and DIGIT_RE.search(password)):
+        raise ValidationError(
+            'Password must be at least 8 characters long and contain uppercase, lowercase, and numeric characters'
+        )
+
+class UserRegistrationSchema(RequestSchema):
+    username = fields.String(required=True, validate=validate.Length(min=1, max=50))
+    email = fields.String(required=True, validate=[validate.Length(max=120), _email_syntax, _deliverable])
+    password = fields.String(required=True, validate=validate.Length(min=1))
+    first_name = fields.String(allow_none=True, validate=validate.Length(max=50))
+    last_name = fields.String(allow_none=True, validate=validate.Length(max=50))
+    phone_number = fields.String(allow_none=True, validate=validate.Length(max=20))
+
+class AuthRegistrationSchema(RequestSchema):
+    username = fields.String(required=True, validate=validate.Length(min=1, max=50))
+    email = fields.String(required=True, validate=[
+        validate.Regexp(EMAIL_RE, error='Invalid email format'), _deliverable
+    ])
+    password = fields.String(required=True, validate=_auth_password)
+
+class LoginSchema(RequestSchema):
+    username = fields.String(required=True, validate=validate.Length(min=1))
+    password = fields.String(required=True, validate=validate.Length(min=1))
+
+class UserUpdateSchema(RequestSchema):
+    email = fields.String(allow_none=True, validate=[validate.Length(max=120), _email_syntax, _deliverable])
+    first_name = fields.String(allow_none=True, validate=validate.Length(max=50))
+    last_name = fields.String(allow_none=True, validate=validate.Length(max=50))
+    phone_number = fields.String(allow_none=True, validate=validate.Length(max=20))
+
+class AccountCreationSchema(RequestSchema):
+    account_type = fields.String(required=True, validate=validate.Length(min=1, max=50))
+    initial_balance = Money(load_default=Decimal('0.00'), validate=[
+        validate.Range(min=0, error='Initial balance cannot be negative'),
+        validate.Range(max=MAX_AMOUNT, error=f'Initial balance cannot exceed {MAX_AMOUNT}')
+    ])
+
+class AccountUpdateSchema(RequestSchema):
+    account_type = fields.String(allow_none=True, validate=validate.Length(max=50))
+    is_active = fields.Boolean(allow_none=True)
+
+class TransactionCreationSchema(RequestSchema):
+    account_id = fields.Integer(required=True)
+    transaction_type = fields.String(required=True, validate=validate.OneOf(
+        TRANSACTION_TYPES, error=f'Invalid transaction type. Must be one of {TRANSACTION_TYPES}'
+    ))
+    amount = Money(required=True, validate=_amount('Transaction amount must be positive'))
+    description = fields.String(allow_none=True, validate=validate.Length(max=255))
+
+class TransactionQuerySchema(RequestSchema):
+    start_date = _date()
+    end_date = _date()
+
+    @post_load
+    def midnight(self, data, **kwargs):
+        # Compared with DateTime columns, so start at midnight as reqparse's inputs.date did
+        return {name: datetime.combine(value, time.min) for name, value in data.items()}
+
+class BillSchema(RequestSchema):
+    biller_name = fields.String(required=True, validate=validate.Length(min=1, max=100))
+    due_date = _date(required=True)
+    amount = Money(required=True, validate=_amount('Bill amount must be positive'))
+    account_id = fields.Integer(required=True)
+    status = fields.String(validate=validate.OneOf(
+        BILL_STATUSES, error=f"Invalid status. Must be one of: {', '.join(BILL_STATUSES)}"
+    ))
+
+class BudgetSchema(RequestSchema):
+    name = fields.String(required=True, validate=validate.Length(min=1, max=100))
+    amount = fields.Float(required=True, validate=_positive('Budget amount must be positive'))
+    start_date = _date(required=True)
+    end_date = _date(required=True)
+
+    @validates_schema
+    def end_after_start(self, data, **kwargs):
+        # Partial updates carrying one date are checked against the stored row instead
+        if 'start_date' in data and 'end_date' in data and data['end_date'] <= data['start_date']:
+            raise ValidationError('End date must be after start date')
+
+# Job types users may queue through POST /jobs, with the schema of their params
+JOB_PARAMS_SCHEMAS = {
+    'transactions_export': TransactionQuerySchema()
+}
+
+class JobCreationSchema(RequestSchema):
+    job_type = fields.String(required=True, validate=validate.OneOf(
+        list(JOB_PARAMS_SCHEMAS), error=f'Invalid job type. Must be one of {list(JOB_PARAMS_SCHEMAS)}'
+    ))
+    params = fields.Dict(keys=fields.String(), load_default=dict)
+    priority = fields.Integer(load_default=0, validate=validate.Range(
+        min=-10, max=10, error='Priority must be between -10 and 10'
+    ))
+
+    @validates_schema
+    def valid_params(self, data, **kwargs):
+        schema = JOB_PARAMS_SCHEMAS.get(data.get('job_type'))
+        errors = schema.validate(data.get('params', {})) if schema else None
+        if errors:
+            raise ValidationError({'params': errors})
+
+# Built once at import: marshmallow resolves fields and validators when a
+# schema is instantiated, and a loaded instance is safe to share
+USER_REGISTRATION_SCHEMA = UserRegistrationSchema()
+AUTH_REGISTRATION_SCHEMA = AuthRegistrationSchema()
+LOGIN_SCHEMA = LoginSchema()
+USER_UPDATE_SCHEMA = UserUpdateSchema()
+ACCOUNT_CREATION_SCHEMA = AccountCreationSchema()
+ACCOUNT_UPDATE_SCHEMA = AccountUpdateSchema()
+TRANSACTION_CREATION_SCHEMA = TransactionCreationSchema()
+TRANSACTION_QUERY_SCHEMA = TransactionQuerySchema()
+BILL_CREATION_SCHEMA = BillSchema()
+BILL_UPDATE_SCHEMA = BillSchema(partial=True)
+BUDGET_CREATION_SCHEMA = BudgetSchema()
+BUDGET_UPDATE_SCHEMA = BudgetSchema(partial=True)
+JOB_CREATION_SCHEMA = JobCreationSchema()
@@ -0,0 +1,212 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from sqlalchemy import Table, event, inspect, select
+from sqlalchemy.sql.util import find_tables
+from werkzeug.exceptions import ServiceUnavailable
+
+SHARD_PREFIX = 'shard_'
+PRIMARY = 'primary'
+
+# Tables holding one user's data. They live on the user's shard; everything
+# else (users, the shard map, categories, account numbers, jobs) stays on the primary.
+SHARDED_TABLES = frozenset([
+    'accounts',
+    'account_balance_shards',
+    'transactions',
+    'transactions_archive',
+    'bills',
+    'budgets',
+    'journal_entries',
+    'journal_lines',
+    'outbox_events',
+    'outbox_consumer_offsets',
+    'reconciliation_runs'
+])
+
+class ShardMovingError(ServiceUnavailable):
+    """
+    The user's data is being copied to another shard. A 503 with
+    Retry-After, from resources and blueprints alike.
+    """
+    description = 'Your data is being moved, please retry shortly'
+
+    def __init__(self, user_id):
+        super().__init__(retry_after=5)
+        self.user_id = user_id
+
+def build_shard_binds(shard_urls):
+    """
+    Turn a comma-separated DATABASE_SHARD_URLS value into SQLALCHEMY_BINDS entries
+    """
+    urls = [url.strip() for url in (shard_urls or '').split(',') if url.strip()]
+    return {f'{SHARD_PREFIX}{index}': url for index, url in enumerate(urls)}
+
+def bind_key(name):
+    """
+    The bind key for a shard name as given on the command line or in
+    DATABASE_SHARD: 'primary' (or nothing) is the default bind
+    """
+    return None if name in (None, '', PRIMARY) else name
+
+def shard_name(key):
+    return key or PRIMARY
+
+def is_sharded(mapper=None, clause=None):
+    """
+    Whether a statement, or a flush of mapper's rows, touches a per-user table
+    """
+    if mapper is not None:
+        return inspect(mapper).local_table.name in SHARDED_TABLES
+    if isinstance(clause, Table):
+        return clause.name in SHARDED_TABLES
+    if clause is not None:
+        # Columns without a table (literals, labels) come back as None
+        return any(getattr(table, 'name', None) in SHARDED_TABLES for table in find_tables(
+            clause, check_columns=True, include_crud=True
+        ))
+    return False
+
+def _stride_ids(stride, offset, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'SET SESSION auto_increment_increment = {stride}, auto_increment_offset = {offset}')
+    cursor.close()
+
+def route_session(session, key):
+    """
+    Send the session's per-user statements to shard key from here on
+    (for sessions with no request identity: CLI commands, job workers)
+    """
+    session.info['shard_key'] = key
+
+class ShardMap:
+    """
+    Maps user ids to the shard bind holding their data. New users are spread
+    over the shard_<n> binds by id; `flask shards-move` moves one later. The
+    map lives in user_shards on the primary and is cached per process for
+    cache_ttl seconds, which is also how long a move waits before copying.
+
+    With no DATABASE_SHARD_URLS everything stays on the primary and the map
+    is never read.
+    """
+    def __init__(self, cache_ttl=30, max_size=100000):
+        self.keys = []
+        self.default_key = None
+        self.id_span = 100000000
+        self.id_stride = 16
+        self.cache_ttl = cache_ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        binds = app.config.get('SQLALCHEMY_BINDS') or {}
+        self.keys = sorted(
+            (key for key in binds if key.startswith(SHARD_PREFIX)),
+            key=lambda key: int(key[len(SHARD_PREFIX):])
+        )
+        self.default_key = bind_key(app.config.get('DATABASE_SHARD'))
+        if self.default_key is not None and self.default_key not in self.keys:
+            raise ValueError(f'DATABASE_SHARD {self.default_key} is not one of {self.keys}')
+        self.id_span = app.config.get('SHARD_ID_SPAN', self.id_span)
+        self.id_stride = app.config.get('SHARD_ID_STRIDE', self.id_stride)
+        self.cache_ttl = app.config.get('SHARD_MAP_CACHE_TTL', self.cache_ttl)
+        self.clear()
+        if self.enabled:
+            self._stride_mysql_ids(app)
+
+    def _stride_mysql_ids(self, app):
+        # Database n of the primary and shards only hands out ids = n (mod
+        # id_stride), so rows copied in by a move never meet the ids it
+        # generates later, whichever range they came from
+        from src.models.base import db
+        if len(self.all_keys()) > self.id_stride:
+            raise ValueError(f'SHARD_ID_STRIDE ({self.id_stride}) must cover the primary and every shard')
+        with app.app_context():
+            for index, key in enumerate(self.all_keys()):
+                engine = db.engines[key]
+                if engine.dialect.name == 'mysql':
+                    event.listen(engine, 'connect', partial(_stride_ids, self.id_stride, index + 1))
+
+    @property
+    def enabled(self):
+        return bool(self.keys)
+
+    def all_keys(self):
+        """
+        Every database holding per-user tables, the primary (None) first
+        """
+        return [None] + self.keys
+
+    def id_start(self, key):
+        """
+        First id of key's range. Each database hands out ids from its own
+        range, so rows keep their ids when a user moves between shards.
+        """
+        return self.all_keys().index(key) * self.id_span + 1
+
+    def id_step(self, engine):
+        """
+        Distance between consecutive ids engine hands out
+        """
+        return self.id_stride if self.enabled and engine.dialect.name == 'mysql' else 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def _remember(self, user_id, key):
+        with self._lock:
+            self._entries[user_id] = (key, time.monotonic() + self.cache_ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def assign(self, user_id, session):
+        """
+        Place a new user on a shard; the mapping is written when session
+        commits. Returns the bind key, None while sharding is off.
+        """
+        if not self.enabled:
+            return None
+        from src.models.user_shard import UserShard
+        key = self.keys[user_id % len(self.keys)]
+        session.add(UserShard(user_id=user_id, shard_key=key))
+        self._remember(user_id, key)
+        return key
+
+    def lookup(self, user_id, session):
+        """
+        (bind key, moving) from the map itself, read on the primary through
+        session's connection there
+        """
+        from src.models.user_shard import UserShard
+        shards = UserShard.__table__
+        connection = session.connection(bind_arguments={'bind': session._db.engines[None]})
+        row = connection.execute(
+            select(shards.c.shard_key, shards.c.moving).where(shards.c.user_id == user_id)
+        ).first()
+        return (row.shard_key, row.moving) if row is not None else (None, False)
+
+    def shard_for(self, user_id, session):
+        """
+        The bind key holding user_id's data. Raises ShardMovingError mid-move.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        key, moving = self.lookup(user_id, session)
+        if moving:
+            # Not cached, so the user is served again as soon as the move ends
+            raise ShardMovingError(user_id)
+        self._remember(user_id, key)
+        return key
+
+shard_map = ShardMap()
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin
+from sqlalchemy import event
+from werkzeug.security import check_password_hash
+from src.models.utils.replica_routing import RoutingSession
+
+
+class UserSnapshot(UserMixin):
+    """
+    Detached, read-only copy of a User row used to rebuild current_user
+    without a database round trip
+    """
+    __slots__ = ('id', 'username', 'email', 'password_hash', '_active')
+
+    def __init__(self, id, username, email, password_hash, active=True):
+        object.__setattr__(self, 'id', id)
+        object.__setattr__(self, 'username', username)
+        object.__setattr__(self, 'email', email)
+        object.__setattr__(self, 'password_hash', password_hash)
+        object.__setattr__(self, '_active', active)
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            password_hash=user.password_hash,
+            active=user.is_active if user.is_active is not None else True
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError('UserSnapshot is read-only; load the User row to modify it')
+
+    @property
+    def is_active(self):
+        return self._active
+
+    def check_password(self, password):
+        """Check hashed password."""
+        return check_password_hash(self.password_hash, password)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+
+class UserCache:
+    """
+    Short-TTL, size-bounded cache of UserSnapshot objects keyed by user id
+    """
+    def __init__(self, ttl=30, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.max_size = app.config.get('USER_CACHE_MAX_SIZE', self.max_size)
+        self.clear()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            snapshot, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def set(self, user_id, snapshot):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, user_id, loader):
+        """
+        Return the cached snapshot for user_id, calling loader(user_id) on a miss
+        """
+        snapshot = self.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        user = loader(user_id)
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot.from_user(user)
+        self.set(user_id, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+# Any commit that changed or deleted a User row drops its snapshot, whichever
+# route made the change
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    from src.models.user import User
+    changed = session.info.setdefault('changed_user_ids', set())
+    changed.update(
+        instance.id for instance in list(session.dirty) + list(session.deleted) if isinstance(instance, User)
+    )
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        user_cache.invalidate(user_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_changed_users(session):
+    session.info.pop('changed_user_ids', None)
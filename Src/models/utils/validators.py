@@ -1,22 +1,22 @@
 import re
 from email_validator import validate_email, EmailNotValidError
 
+# Compiled once at import instead of on every call
+UPPERCASE_RE = re.compile(r'[A-Z]')
+LOWERCASE_RE = re.compile(r'[a-z]')
+DIGIT_RE = re.compile(r'\d')
+SPECIAL_CHARACTER_RE = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+PHONE_RE = re.compile(r'^\+?1?\d{9,15}$')
+
 def validate_input(input_type, input_value):
     """
     Comprehensive input validator
     """
-    validators = {
-        'password': validate_password,
-        'email': validate_email_address,
-        'phone': validate_phone_number,
-        'account_number': validate_account_number,
-        'transaction_amount': validate_transaction_amount
-    }
-
-    if input_type not in validators:
+    validator = VALIDATORS.get(input_type)
+    if validator is None:
         return False, "Invalid input type"
 
-    return validators[input_type](input_value)
+    return validator(input_value)
 
 def validate_password(password):
     """
@@ -30,26 +30,28 @@ def validate_password(password):
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
     
-    if not re.search(r'[A-Z]', password):
+    if not UPPERCASE_RE.search(password):
         return False, "Password must contain at least one uppercase letter"
     
-    if not re.search(r'[a-z]', password):
+    if not LOWERCASE_RE.search(password):
         return False, "Password must contain at least one lowercase letter"
     
-    if not re.search(r'\d', password):
+    if not DIGIT_RE.search(password):
         return False, "Password must contain at least one number"
     
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+    if not SPECIAL_CHARACTER_RE.search(password):
         return False, "Password must contain at least one special character"
     
     return True, "Password is valid"
 
-def validate_email_address(email):
+def validate_email_address(email, check_deliverability=False):
     """
-    Validate email address using email-validator library
+    Validate email address using email-validator library. Syntax only by
+    default: the deliverability check resolves the domain's MX records inline,
+    so on the request path use email_deliverability.check instead
     """
     try:
-        validate_email(email)
+        validate_email(email, check_deliverability=check_deliverability)
         return True, "Email is valid"
     except EmailNotValidError as e:
         return False, str(e)
@@ -59,8 +61,7 @@ def validate_phone_number(phone):
     Validate phone number format
     Supports international phone numbers
     """
-    phone_regex = r'^\+?1?\d{9,15}$'
-    if re.match(phone_regex, phone):
+    if PHONE_RE.match(phone):
         return True, "Phone number is valid"
     return False, "Invalid phone number format"
 
@@ -94,4 +95,12 @@ def validate_transaction_amount(amount):
         
         return True, "Transaction amount is valid"
     except ValueError:
-        return False, "Invalid transaction amount"
\ No newline at end of file
+        return False, "Invalid transaction amount"
+
+VALIDATORS = {
+    'password': validate_password,
+    'email': validate_email_address,
+    'phone': validate_phone_number,
+    'account_number': validate_account_number,
+    'transaction_amount': validate_transaction_amount
+}
@@ -1,59 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from src.models.user import User, db
-from werkzeug.security import check_password_hash
-import re
+from src.models.utils.schemas import AUTH_REGISTRATION_SCHEMA, LOGIN_SCHEMA, error_message, load_request
+from src.models.utils.sharding import shard_map
+from marshmallow import ValidationError
 
 auth_bp = Blueprint('auth', __name__)
 
-def validate_email(email):
-    """Validate email format."""
-    email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(email_regex, email) is not None
-
-def validate_password(password):
-    """
-    Validate password strength:
-    - At least 8 characters long
-    - Contains at least one uppercase letter
-    - Contains at least one lowercase letter
-    - Contains at least one number
-    """
-    if len(password) < 8:
-        return False
-    if not re.search(r'[A-Z]', password):
-        return False
-    if not re.search(r'[a-z]', password):
-        return False
-    if not re.search(r'\d', password):
-        return False
-    return True
-
 @auth_bp.route('/register', methods=['POST'])
 def register():
-    data = request.get_json()
-    
-    # Validate input
-    if not data:
-        return jsonify({'message': 'No input data provided'}), 400
-    
-    username = data.get('username')
-    email = data.get('email')
-    password = data.get('password')
-    
-    # Check for missing fields
-    if not all([username, email, password]):
-        return jsonify({'message': 'Missing required fields'}), 400
-    
-    # Validate email
-    if not validate_email(email):
-        return jsonify({'message': 'Invalid email format'}), 400
+    # Email format and password strength are checked by the schema
+    try:
+        data = load_request(AUTH_REGISTRATION_SCHEMA)
+    except ValidationError as e:
+        return jsonify({'message': error_message(e)}), 400
     
-    # Validate password
-    if not validate_password(password):
-        return jsonify({
-            'message': 'Password must be at least 8 characters long and contain uppercase, lowercase, and numeric characters'
-        }), 400
+    username = data['username']
+    email = data['email']
+    password = data['password']
 
     # Check if user already exists
     if User.query.filter_by(username=username).first():
@@ -68,6 +32,8 @@ def register():
     
     try:
         db.session.add(new_user)
+        db.session.flush()
+        shard_map.assign(new_user.id, db.session)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
@@ -77,16 +43,13 @@ def register():
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
-    data = request.get_json()
-    
-    if not data:
-        return jsonify({'message': 'No input data provided'}), 400
-    
-    username = data.get('username')
-    password = data.get('password')
+    try:
+        data = load_request(LOGIN_SCHEMA)
+    except ValidationError as e:
+        return jsonify({'message': error_message(e)}), 400
     
-    if not all([username, password]):
-        return jsonify({'message': 'Missing username or password'}), 400
+    username = data['username']
+    password = data['password']
 
     user = User.query.filter_by(username=username).first()
     
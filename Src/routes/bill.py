@@ -1,32 +1,47 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
 from src.models.bill import Bill
 from src.models.account import Account
+from src.models.transaction import Transaction
+from src.models.base import db
+from src.models.utils.outbox import record_event
+from src.models.utils.event_hub import publish_transaction
+from src.models.utils.ledger import InsufficientFundsError, bill_payment, posting_engine
+from src.models.utils.fieldsets import BILL_FIELDS, UnknownFieldError
+from src.models.utils.schemas import BILL_CREATION_SCHEMA, BILL_UPDATE_SCHEMA, error_message, load_request
+from marshmallow import ValidationError
 
 bill_bp = Blueprint('bill', __name__)
 
+def pay_bill(bill):
+    """
+    Debit the bill's account through the ledger and record the payment as a
+    transaction; the caller commits. Raises InsufficientFundsError.
+    """
+    payment = Transaction(
+        account_id=bill.account_id,
+        transaction_type='bill_payment',
+        amount=bill.amount,
+        description=f'Bill payment: {bill.biller_name}'
+    )
+    db.session.add(payment)
+    db.session.flush()
+    balances = posting_engine.post([bill_payment(
+        bill.account_id, bill.amount, transaction_id=payment.id, description=payment.description
+    )])
+    publish_transaction(payment, bill.user_id, balances[bill.account_id])
+    return payment
+
 @bill_bp.route('/bills', methods=['POST'])
 @jwt_required()
 def create_bill():
     current_user_id = get_jwt_identity()
-    data = request.get_json()
-    
-    # Validate required fields
-    required_fields = ['biller_name', 'due_date', 'amount', 'account_id']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
     
-    # Validate amount is positive
-    if data['amount'] <= 0:
-        return jsonify({'error': 'Bill amount must be positive'}), 400
-    
-    # Parse date
+    # Required fields, a positive amount and an ISO due date
     try:
-        due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
-    except ValueError:
-        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        data = load_request(BILL_CREATION_SCHEMA)
+    except ValidationError as e:
+        return jsonify({'error': error_message(e)}), 400
     
     # Verify account exists and belongs to user
     account = Account.query.get(data['account_id'])
@@ -37,38 +52,48 @@ def create_bill():
         return jsonify({'error': 'Unauthorized access to account'}), 401
     
     # Verify sufficient balance
-    if account.balance < data['amount']:
+    if account.current_balance() < data['amount']:
         return jsonify({'error': 'Insufficient balance for bill payment'}), 400
     
     # Create new bill
     bill = Bill(
         user_id=current_user_id,
         biller_name=data['biller_name'],
-        due_date=due_date,
+        due_date=data['due_date'],
         amount=data['amount'],
         account_id=data['account_id']
     )
     
-    bill.save()
+    db.session.add(bill)
+    db.session.flush()
+    record_event('bill.created', 'bill', bill.id, bill.to_dict())
+    db.session.commit()
     return jsonify({'message': 'Bill scheduled successfully', 'bill': bill.to_dict()}), 201
 
 @bill_bp.route('/bills', methods=['GET'])
 @jwt_required()
 def get_bills():
     current_user_id = get_jwt_identity()
+    try:
+        fields = BILL_FIELDS.from_request()
+    except UnknownFieldError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Query bills for current user
-    bills = Bill.query.filter_by(user_id=current_user_id).all()
+    # Query only the requested columns of the current user's bills
+    rows = db.session.execute(BILL_FIELDS.select(fields).where(Bill.user_id == current_user_id))
     
     return jsonify({
-        'bills': [bill.to_dict() for bill in bills]
+        'bills': [BILL_FIELDS.serialize(row, fields) for row in rows]
     }), 200
 
 @bill_bp.route('/bills/<int:bill_id>', methods=['PUT'])
 @jwt_required()
 def update_bill(bill_id):
     current_user_id = get_jwt_identity()
-    data = request.get_json()
+    try:
+        data = load_request(BILL_UPDATE_SCHEMA)
+    except ValidationError as e:
+        return jsonify({'error': error_message(e)}), 400
     
     # Find the bill
     bill = Bill.query.get(bill_id)
@@ -86,14 +111,9 @@ def update_bill(bill_id):
         bill.biller_name = data['biller_name']
     
     if 'due_date' in data:
-        try:
-            bill.due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        bill.due_date = data['due_date']
     
     if 'amount' in data:
-        if data['amount'] <= 0:
-            return jsonify({'error': 'Bill amount must be positive'}), 400
         bill.amount = data['amount']
     
     if 'account_id' in data:
@@ -106,17 +126,24 @@ def update_bill(bill_id):
             return jsonify({'error': 'Unauthorized access to account'}), 401
         
         # Verify sufficient balance
-        if account.balance < bill.amount:
+        if account.current_balance() < bill.amount:
             return jsonify({'error': 'Insufficient balance for bill payment'}), 400
         
         bill.account_id = data['account_id']
     
-    if 'status' in data:
-        valid_statuses = ['pending', 'paid', 'cancelled']
-        if data['status'] not in valid_statuses:
-            return jsonify({'error': f'Invalid status. Must be one of: {", ".join(valid_statuses)}'}), 400
+    if 'status' in data and data['status'] != bill.status:
+        # A paid bill has moved money; it can't be reopened or cancelled
+        if bill.status == 'paid':
+            return jsonify({'error': 'Bill has already been paid'}), 400
         bill.status = data['status']
-    
+        if bill.status == 'paid':
+            try:
+                pay_bill(bill)
+            except InsufficientFundsError:
+                db.session.rollback()
+                return jsonify({'error': 'Insufficient balance for bill payment'}), 400
+    
+    record_event('bill.updated', 'bill', bill.id, bill.to_dict())
     bill.save()
     return jsonify({'message': 'Bill updated successfully', 'bill': bill.to_dict()}), 200
 
@@ -136,8 +163,12 @@ def delete_bill(bill_id):
     if bill.user_id != current_user_id:
         return jsonify({'error': 'Unauthorized access'}), 401
     
+    if bill.status == 'paid':
+        return jsonify({'error': 'Bill has already been paid'}), 400
+    
     # Soft delete - update status to cancelled
     bill.status = 'cancelled'
+    record_event('bill.cancelled', 'bill', bill.id, bill.to_dict())
     bill.save()
     
     return jsonify({'message': 'Bill cancelled successfully'}), 200
@@ -1,8 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
 from src.models.budget import Budget
 from src.models.user import User
+from src.models.base import db
+from src.models.utils.fieldsets import BUDGET_FIELDS, UnknownFieldError
+from src.models.utils.schemas import BUDGET_CREATION_SCHEMA, BUDGET_UPDATE_SCHEMA, error_message, load_request
+from marshmallow import ValidationError
 
 budget_bp = Blueprint('budget', __name__)
 
@@ -10,36 +13,20 @@ budget_bp = Blueprint('budget', __name__)
 @jwt_required()
 def create_budget():
     current_user_id = get_jwt_identity()
-    data = request.get_json()
     
-    # Validate required fields
-    required_fields = ['name', 'amount', 'start_date', 'end_date']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({'error': f'Missing required field: {field}'}), 400
-    
-    # Validate amount is positive
-    if data['amount'] <= 0:
-        return jsonify({'error': 'Budget amount must be positive'}), 400
-    
-    # Parse dates
+    # Required fields, a positive amount and an end date after the start date
     try:
-        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
-        end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
-    except ValueError:
-        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
-    
-    # Validate end date is after start date
-    if end_date <= start_date:
-        return jsonify({'error': 'End date must be after start date'}), 400
+        data = load_request(BUDGET_CREATION_SCHEMA)
+    except ValidationError as e:
+        return jsonify({'error': error_message(e)}), 400
     
     # Create new budget
     budget = Budget(
         user_id=current_user_id,
         name=data['name'],
         amount=data['amount'],
-        start_date=start_date,
-        end_date=end_date
+        start_date=data['start_date'],
+        end_date=data['end_date']
     )
     
     budget.save()
@@ -49,19 +36,26 @@ def create_budget():
 @jwt_required()
 def get_budgets():
     current_user_id = get_jwt_identity()
+    try:
+        fields = BUDGET_FIELDS.from_request()
+    except UnknownFieldError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Query budgets for current user
-    budgets = Budget.query.filter_by(user_id=current_user_id).all()
+    # Query only the requested columns of the current user's budgets
+    rows = db.session.execute(BUDGET_FIELDS.select(fields).where(Budget.user_id == current_user_id))
     
     return jsonify({
-        'budgets': [budget.to_dict() for budget in budgets]
+        'budgets': [BUDGET_FIELDS.serialize(row, fields) for row in rows]
     }), 200
 
 @budget_bp.route('/budgets/<int:budget_id>', methods=['PUT'])
 @jwt_required()
 def update_budget(budget_id):
     current_user_id = get_jwt_identity()
-    data = request.get_json()
+    try:
+        data = load_request(BUDGET_UPDATE_SCHEMA)
+    except ValidationError as e:
+        return jsonify({'error': error_message(e)}), 400
     
     # Find the budget
     budget = Budget.query.get(budget_id)
@@ -79,21 +73,13 @@ def update_budget(budget_id):
         budget.name = data['name']
     
     if 'amount' in data:
-        if data['amount'] <= 0:
-            return jsonify({'error': 'Budget amount must be positive'}), 400
         budget.amount = data['amount']
     
     if 'start_date' in data:
-        try:
-            budget.start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': 'Invalid start date format. Use YYYY-MM-DD'}), 400
+        budget.start_date = data['start_date']
     
     if 'end_date' in data:
-        try:
-            budget.end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': 'Invalid end date format. Use YYYY-MM-DD'}), 400
+        budget.end_date = data['end_date']
     
     # Validate end date is after start date
     if budget.end_date <= budget.start_date:
@@ -0,0 +1,137 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from src.models.base import db
+from src.models.account import Account
+from src.models.transaction import Transaction
+from src.models.bill import Bill
+from src.models.budget import Budget
+from src.models.resources.account_resources import load_account_dicts
+from src.models.utils.cache import account_cache
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+DEFAULT_RECENT_TRANSACTIONS = 10
+MAX_RECENT_TRANSACTIONS = 50
+UPCOMING_BILL_DAYS = 14
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    # Threads don't survive fork, so each worker process builds its own pool
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='dashboard')
+            _executor_pid = os.getpid()
+        return _executor
+
+def recent_transactions_query(user_id, limit):
+    return (
+        select(Transaction)
+        .join(Account, Transaction.account_id == Account.id)
+        .where(Account.user_id == user_id)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(limit)
+    )
+
+def upcoming_bills_query(user_id, today):
+    return (
+        select(Bill)
+        .where(
+            Bill.user_id == user_id,
+            Bill.due_date >= today,
+            Bill.due_date <= today + timedelta(days=UPCOMING_BILL_DAYS),
+            Bill.status == 'pending'
+        )
+        .order_by(Bill.due_date)
+    )
+
+def budget_utilisation_query(user_id, today):
+    """
+    Active budgets with the money spent (withdrawals and transfers from the
+    owner's accounts) inside each budget's period, in one grouped query
+    """
+    spent = func.coalesce(func.sum(Transaction.amount), 0).label('spent')
+    return (
+        select(Budget, spent)
+        .outerjoin(Account, Account.user_id == Budget.user_id)
+        .outerjoin(Transaction, and_(
+            Transaction.account_id == Account.id,
+            Transaction.transaction_type != 'deposit',
+            func.date(Transaction.created_at) >= Budget.start_date,
+            func.date(Transaction.created_at) <= Budget.end_date
+        ))
+        .where(Budget.user_id == user_id, Budget.start_date <= today, Budget.end_date >= today)
+        .group_by(Budget.id)
+        .order_by(Budget.end_date)
+    )
+
+def _budget_dict(budget, spent):
+    budget_dict = budget.to_dict()
+    budget_dict['spent'] = round(float(spent), 2)
+    budget_dict['remaining'] = round(budget.amount - float(spent), 2)
+    budget_dict['utilisation'] = round(float(spent) / budget.amount, 4) if budget.amount else None
+    return budget_dict
+
+def _parallel_enabled(engine):
+    # SQLite serialises connections anyway, and an in-memory database can't be shared across threads
+    return current_app.config['DASHBOARD_PARALLEL_QUERIES'] and engine.dialect.name != 'sqlite'
+
+def _load(engine, statement, serialize):
+    """
+    Run one dashboard query on its own session so it can execute on a worker thread
+    """
+    with Session(engine) as session:
+        return [serialize(row) for row in session.execute(statement)]
+
+@dashboard_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    current_user_id = get_jwt_identity()
+
+    try:
+        limit = int(request.args.get('transactions', DEFAULT_RECENT_TRANSACTIONS))
+    except ValueError:
+        return jsonify({'error': 'transactions must be an integer'}), 400
+    limit = max(1, min(limit, MAX_RECENT_TRANSACTIONS))
+    today = date.today()
+
+    queries = [
+        (recent_transactions_query(current_user_id, limit), lambda row: row.Transaction.to_dict()),
+        (upcoming_bills_query(current_user_id, today), lambda row: row.Bill.to_dict()),
+        (budget_utilisation_query(current_user_id, today), lambda row: _budget_dict(row.Budget, row.spent))
+    ]
+
+    # Resolved here so the replica choice for this request applies on every thread
+    engine = db.session.get_bind(clause=queries[0][0])
+    parallel = _parallel_enabled(engine)
+    if parallel:
+        futures = [_get_executor().submit(_load, engine, statement, serialize) for statement, serialize in queries]
+
+    # Usually a cache hit; otherwise one query on the request's own session
+    accounts = account_cache.get_accounts(current_user_id, load_account_dicts)
+
+    if parallel:
+        transactions, bills, budgets = [future.result() for future in futures]
+    else:
+        # Stay on the request's session
+        transactions, bills, budgets = [
+            [serialize(row) for row in db.session.execute(statement)]
+            for statement, serialize in queries
+        ]
+
+    return jsonify({
+        'accounts': accounts,
+        'total_balance': round(sum(account['balance'] for account in accounts), 2),
+        'recent_transactions': transactions,
+        'upcoming_bills': bills,
+        'budgets': budgets
+    }), 200
@@ -0,0 +1,54 @@
+import hmac
+import os
+from flask import Blueprint, Response, current_app, request, jsonify
+from src.models.base import db
+from src.models.utils.db_pool import pool_metrics, pool_status
+from src.models.utils.instrumentation import request_metrics
+from src.models.utils.metrics import render_gauge
+
+internal_bp = Blueprint('internal', __name__)
+
+@internal_bp.before_request
+def require_internal_token():
+    # Without INTERNAL_API_TOKEN only debug and test apps serve internal endpoints
+    expected = current_app.config.get('INTERNAL_API_TOKEN')
+    if not expected:
+        if current_app.debug or current_app.testing:
+            return None
+        return jsonify({'error': 'Unauthorized'}), 401
+    given = request.headers.get('X-Internal-Token', '')
+    if not hmac.compare_digest(given.encode(), expected.encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+@internal_bp.route('/internal/pool', methods=['GET'])
+def get_pool_metrics():
+    """
+    Connection pool occupancy and checkout latency for this worker process
+    """
+    pools = {
+        bind_key or 'default': pool_status(engine)
+        for bind_key, engine in db.engines.items()
+    }
+
+    return jsonify({
+        'pid': os.getpid(),
+        'pools': pools,
+        'checkout': pool_metrics.snapshot()
+    }), 200
+
+@internal_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Per-endpoint request histograms and pool gauges in Prometheus text format
+    """
+    pools = {bind_key or 'default': pool_status(engine) for bind_key, engine in db.engines.items()}
+
+    lines = request_metrics.render()
+    lines.extend(render_gauge(
+        'revobank_db_pool_checked_out', 'Connections currently checked out of the pool',
+        {bind: status.get('checked_out', 0) for bind, status in pools.items()}, label='bind'))
+    lines.extend(render_gauge(
+        'revobank_db_pool_overflow', 'Overflow connections currently open',
+        {bind: status.get('overflow', 0) for bind, status in pools.items()}, label='bind'))
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,65 @@
+import os
+from flask import Blueprint, jsonify, send_file, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import ValidationError
+from src.models.base import db
+from src.models.job import Job
+from src.models.utils.jobs import job_queue
+from src.models.utils.schemas import JOB_CREATION_SCHEMA, JOB_PARAMS_SCHEMAS, error_message, load_request
+
+job_bp = Blueprint('job', __name__)
+
+def job_response(job):
+    data = job.to_dict()
+    # Where the worker wrote the file is the server's business; clients download it here
+    data['result_location'] = (
+        url_for('job.download_job_result', job_id=job.id) if job.result_location else None
+    )
+    return data
+
+def own_job(job_id):
+    """
+    The current user's job, or None; other users' jobs look missing
+    """
+    job = db.session.get(Job, job_id)
+    if job is None or job.user_id != get_jwt_identity():
+        return None
+    return job
+
+@job_bp.route('/jobs', methods=['POST'])
+@jwt_required()
+def create_job():
+    try:
+        data = load_request(JOB_CREATION_SCHEMA)
+    except ValidationError as e:
+        return jsonify({'error': error_message(e)}), 400
+
+    # Only the params the job type knows about are kept
+    known = JOB_PARAMS_SCHEMAS[data['job_type']].fields
+    payload = {name: value for name, value in data['params'].items() if name in known}
+    job = job_queue.enqueue(data['job_type'], payload, user_id=get_jwt_identity(), priority=data['priority'])
+    db.session.commit()
+
+    response = jsonify({'message': 'Job queued', 'job': job_response(job)})
+    response.headers['Location'] = url_for('job.get_job', job_id=job.id)
+    return response, 202
+
+@job_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    job = own_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_response(job)), 200
+
+@job_bp.route('/jobs/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+def download_job_result(job_id):
+    job = own_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != 'succeeded' or not job.result_location:
+        return jsonify({'error': 'Job has no result yet'}), 409
+    if not os.path.isfile(job.result_location):
+        return jsonify({'error': 'Job result has expired'}), 410
+    return send_file(job.result_location, as_attachment=True)
@@ -1,15 +1,21 @@
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required
-from src.models.transaction_category import TransactionCategory
+from src.models.base import db
+from src.models.utils.fieldsets import CATEGORY_FIELDS, UnknownFieldError
 
 transaction_category_bp = Blueprint('transaction_category', __name__)
 
 @transaction_category_bp.route('/transactions/categories', methods=['GET'])
 @jwt_required()
 def get_transaction_categories():
+    try:
+        fields = CATEGORY_FIELDS.from_request()
+    except UnknownFieldError as e:
+        return jsonify({'error': str(e)}), 400
+
     # Get all transaction categories
-    categories = TransactionCategory.query.all()
+    rows = db.session.execute(CATEGORY_FIELDS.select(fields))
     
     return jsonify({
-        'categories': [category.to_dict() for category in categories]
+        'categories': [CATEGORY_FIELDS.serialize(row, fields) for row in rows]
     }), 200
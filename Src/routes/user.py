@@ -21,28 +21,33 @@ def update_profile():
     new_username = data.get('username')
     new_email = data.get('email')
     
+    # current_user is a cached read-only snapshot; modify the User row itself
+    user = User.query.get(current_user.id)
+    if not user:
+        return jsonify({'message': 'User not found'}), 404
+    
     # Check if the new username is already taken
-    if new_username and new_username != current_user.username:
+    if new_username and new_username != user.username:
         existing_user = User.query.filter_by(username=new_username).first()
         if existing_user:
             return jsonify({'message': 'Username already exists'}), 400
-        current_user.username = new_username
+        user.username = new_username
     
     # Check if the new email is already taken
-    if new_email and new_email != current_user.email:
+    if new_email and new_email != user.email:
         existing_email = User.query.filter_by(email=new_email).first()
         if existing_email:
             return jsonify({'message': 'Email already exists'}), 400
-        current_user.email = new_email
+        user.email = new_email
     
     try:
         db.session.commit()
         return jsonify({
             'message': 'Profile updated successfully',
             'user': {
-                'id': current_user.id,
-                'username': current_user.username,
-                'email': current_user.email
+                'id': user.id,
+                'username': user.username,
+                'email': user.email
             }
         }), 200
     except Exception as e:
@@ -67,12 +72,16 @@ def change_password():
     if not all([current_password, new_password]):
         return jsonify({'message': 'Missing current or new password'}), 400
     
+    user = User.query.get(current_user.id)
+    if not user:
+        return jsonify({'message': 'User not found'}), 404
+    
     # Verify current password
-    if not current_user.check_password(current_password):
+    if not user.check_password(current_password):
         return jsonify({'message': 'Current password is incorrect'}), 400
     
     # Set new password
-    current_user.set_password(new_password)
+    user.set_password(new_password)
     
     try:
         db.session.commit()
@@ -98,12 +107,16 @@ def delete_account():
     if not password:
         return jsonify({'message': 'Password confirmation required'}), 400
     
+    user = User.query.get(current_user.id)
+    if not user:
+        return jsonify({'message': 'User not found'}), 404
+    
     # Verify password
-    if not current_user.check_password(password):
+    if not user.check_password(password):
         return jsonify({'message': 'Incorrect password'}), 400
     
     try:
-        db.session.delete(current_user)
+        db.session.delete(user)
         db.session.commit()
         return jsonify({'message': 'Account deleted successfully'}), 200
     except Exception as e:
@@ -0,0 +1,129 @@
+import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.models.base import db
+from src.models.user import User
+from src.models.account import Account
+from src.models.transaction import Transaction
+from src.models.transaction_category import TransactionCategory
+from src.models.bill import Bill
+from src.models.budget import Budget
+from src.models.job import Job
+from src.models.utils.query_recorder import QueryRecorder
+from src.models.utils.sharding import build_shard_binds
+
+@pytest.fixture
+def app():
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'TESTING': True,
+        # Tests call event_hub.poll_outbox() themselves instead of a poller thread
+        'SSE_OUTBOX_POLL_SECONDS': 0
+    })
+
+    # Contexts are pushed only around setup and teardown so each test request
+    # gets its own app context and session, as it would in production
+    # bind_key=None: db is shared across apps, and apps built by other tests
+    # may have registered metadata for binds this one doesn't configure
+    with app.app_context():
+        db.create_all(bind_key=None)
+
+    yield app
+
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def sharded_app(tmp_path):
+    """
+    An app with two local SQLite shards besides the primary. Database files
+    rather than sqlite://, so each bind is its own database.
+    """
+    shard_urls = ','.join(f"sqlite:///{tmp_path / f'shard_{index}.db'}" for index in range(2))
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_BINDS': build_shard_binds(shard_urls),
+        'TESTING': True,
+        'SSE_OUTBOX_POLL_SECONDS': 0
+    })
+
+    from src.commands.shards import create_shard_schemas, drop_shard_schemas
+    with app.app_context():
+        db.create_all(bind_key=None)
+        create_shard_schemas()
+
+    yield app
+
+    with app.app_context():
+        drop_shard_schemas()
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def seeded(app):
+    """
+    One user with two funded accounts, an empty one, a few transactions,
+    a bill, a budget and a queued export job
+    """
+    with app.app_context():
+        user = User(username='testuser', email='test@example.com')
+        user.set_password('Test1234!')
+        db.session.add(user)
+        db.session.flush()
+
+        accounts = [
+            Account(user_id=user.id, account_number='1234567890', account_type='savings', balance=5000),
+            Account(user_id=user.id, account_number='1234567891', account_type='checking', balance=1000)
+        ]
+        db.session.add_all(accounts)
+        db.session.flush()
+
+        transactions = [
+            Transaction(account_id=account.id, transaction_type='deposit', amount=amount)
+            for account in accounts
+            for amount in (10, 20, 30)
+        ]
+        db.session.add_all(transactions)
+
+        empty_account = Account(user_id=user.id, account_number='1234567892', account_type='savings', balance=0)
+        db.session.add(empty_account)
+
+        bill = Bill(
+            user_id=user.id,
+            biller_name='Electricity Company',
+            due_date=datetime.date.today() + datetime.timedelta(days=7),
+            amount=150,
+            account_id=accounts[0].id
+        )
+        budget = Budget(
+            user_id=user.id,
+            name='Monthly Food',
+            amount=500,
+            start_date=datetime.date.today(),
+            end_date=datetime.date.today() + datetime.timedelta(days=30)
+        )
+        job = Job(user_id=user.id, job_type='transactions_export')
+        db.session.add_all([TransactionCategory(name='Food'), TransactionCategory(name='Housing'), bill, budget, job])
+        db.session.commit()
+
+        return {
+            'user_id': user.id,
+            'account_id': accounts[0].id,
+            'empty_account_id': empty_account.id,
+            'transaction_id': transactions[0].id,
+            'bill_id': bill.id,
+            'budget_id': budget.id,
+            'job_id': job.id,
+            'headers': {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+        }
+
+@pytest.fixture
+def query_recorder():
+    """
+    Record the statements executed inside a `with query_recorder() as queries:` block
+    """
+    return QueryRecorder
@@ -0,0 +1,110 @@
+import time
+from src.models.utils.cache import LocalCache, SharedCache, build_cache
+
+class FakeRedis:
+    """
+    The subset of the redis-py client SharedCache uses, with expiry
+    """
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        value, expires_at = self.store.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.store[key] = (value.encode(), time.monotonic() + ex if ex else None)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+class BrokenRedis:
+    def get(self, key):
+        raise ConnectionError('down')
+
+    def set(self, key, value, ex=None):
+        raise ConnectionError('down')
+
+    def delete(self, *keys):
+        raise ConnectionError('down')
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(ttl=60, max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+def test_local_cache_expires_entries():
+    cache = LocalCache(ttl=0.01, max_size=10)
+    cache.set('a', 1)
+    time.sleep(0.02)
+
+    assert cache.get('a') is None
+
+def test_shared_cache_round_trips_json_with_prefix():
+    client = FakeRedis()
+    cache = SharedCache(client, ttl=60, prefix='test:')
+    cache.set('accounts:user:1', [{'id': 1, 'balance': 10.5}])
+
+    assert list(client.store) == ['test:accounts:user:1']
+    assert cache.get('accounts:user:1') == [{'id': 1, 'balance': 10.5}]
+
+    cache.delete('accounts:user:1')
+    assert cache.get('accounts:user:1') is None
+
+def test_shared_cache_failures_are_misses():
+    cache = SharedCache(BrokenRedis(), ttl=60)
+    cache.set('key', 1)
+    cache.delete('key')
+
+    assert cache.get('key') is None
+
+def test_per_worker_caching_is_off_unless_configured():
+    assert build_cache({}, 'ACCOUNT_CACHE').ttl == 0
+    assert build_cache({'ACCOUNT_CACHE_TTL': 2}, 'ACCOUNT_CACHE').ttl == 2
+
+def test_account_reads_are_cached_until_a_write_commits(app, client, seeded, query_recorder):
+    from src.models.utils.cache import account_cache
+    account_cache.backend = LocalCache(ttl=60)
+    headers = seeded['headers']
+    account_id = seeded['account_id']
+
+    client.get('/accounts', headers=headers)
+    with query_recorder() as recorder:
+        cached = client.get(f'/accounts/{account_id}', headers=headers).get_json()
+    assert recorder.count == 0
+    assert cached['balance'] == 5000
+
+    response = client.post('/transactions', json={
+        'account_id': account_id,
+        'transaction_type': 'withdrawal',
+        'amount': 100
+    }, headers=headers)
+    assert response.status_code == 201
+
+    accounts = client.get('/accounts', headers=headers).get_json()
+    assert {account['id']: account['balance'] for account in accounts}[account_id] == 4900
+
+def test_shared_backend_is_invalidated_by_session_events(app, client, seeded):
+    from src.models.utils.cache import account_cache
+    account_cache.backend = SharedCache(FakeRedis(), ttl=60)
+    headers = seeded['headers']
+    account_id = seeded['account_id']
+
+    client.get('/accounts', headers=headers)
+    assert account_cache.backend.get(f"accounts:user:{seeded['user_id']}") is not None
+
+    client.put(f'/accounts/{account_id}', json={'account_type': 'checking'}, headers=headers)
+
+    assert account_cache.backend.get(f"accounts:user:{seeded['user_id']}") is None
+    account = client.get(f'/accounts/{account_id}', headers=headers).get_json()
+    assert account['account_type'] == 'checking'
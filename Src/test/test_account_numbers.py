@@ -0,0 +1,35 @@
+from flask import Flask
+from src.models.base import db
+from src.models.utils.account_numbers import (
+    AccountNumberAllocator,
+    format_account_number,
+    is_valid_account_number,
+    luhn_check_digit
+)
+
+def make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def test_luhn_check_digit():
+    assert luhn_check_digit('7992739871') == '3'
+    assert format_account_number(1) == 'RB0000000018'
+    assert is_valid_account_number(format_account_number(123456))
+    assert not is_valid_account_number('RB0000000019')
+
+def test_allocator_reserves_disjoint_blocks():
+    app = make_app()
+
+    with app.app_context():
+        db.create_all()
+        first = AccountNumberAllocator(block_size=10)
+        second = AccountNumberAllocator(block_size=10)
+
+        numbers = [first.allocate() for _ in range(15)] + [second.allocate() for _ in range(15)]
+
+        assert len(set(numbers)) == len(numbers)
+        assert all(is_valid_account_number(number) for number in numbers)
+        db.drop_all()
@@ -0,0 +1,61 @@
+import gzip
+import json
+import pytest
+from flask import Response, stream_with_context
+
+@pytest.fixture
+def routes(app):
+    @app.route('/test/stream')
+    def stream():
+        def rows():
+            yield '['
+            for index in range(2000):
+                yield ('' if index == 0 else ',') + json.dumps({'id': index, 'description': 'coffee'})
+            yield ']'
+        return Response(stream_with_context(rows()), mimetype='application/json')
+
+    @app.route('/test/events')
+    def events():
+        return Response(iter(['data: {}\n\n'] * 100), mimetype='text/event-stream')
+
+    return app
+
+def test_gzip_round_trip_with_vary(client, seeded):
+    response = client.get('/transactions', headers={**seeded['headers'], 'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert int(response.headers['Content-Length']) == len(response.data)
+    assert len(json.loads(gzip.decompress(response.data))) == 6
+
+def test_small_bodies_and_plain_clients_are_left_alone(client, seeded):
+    small = client.get(f"/accounts/{seeded['account_id']}?fields=balance",
+                       headers={**seeded['headers'], 'Accept-Encoding': 'gzip'})
+    plain = client.get('/transactions', headers=seeded['headers'])
+
+    assert 'Content-Encoding' not in small.headers
+    assert small.get_json() == {'balance': 5000.0}
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.get_json()) == 6
+
+def test_brotli_preferred_when_installed(client, seeded):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/transactions', headers={**seeded['headers'], 'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert len(json.loads(brotli.decompress(response.data))) == 6
+
+def test_streamed_responses_are_compressed_incrementally(routes):
+    response = routes.test_client().get('/test/stream', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    chunks = list(response.response)
+    assert len(chunks) > 1
+    assert len(json.loads(gzip.decompress(b''.join(chunks)))) == 2000
+
+def test_event_streams_are_never_compressed(routes):
+    response = routes.test_client().get('/test/events', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.data.startswith(b'data: {}')
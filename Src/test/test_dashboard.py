@@ -0,0 +1,46 @@
+import pytest
+from src.app import create_app
+from src.models.base import db
+from src.routes import dashboard
+
+@pytest.fixture
+def app(tmp_path):
+    # A file database, so the parallel path can use one connection per thread
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'dashboard.db'}", 'TESTING': True})
+    with app.app_context():
+        db.create_all(bind_key=None)
+    return app
+
+def test_dashboard_summarises_the_home_screen(client, seeded):
+    headers = seeded['headers']
+    client.post('/transactions', json={
+        'account_id': seeded['account_id'],
+        'transaction_type': 'withdrawal',
+        'amount': 120.5
+    }, headers=headers)
+
+    response = client.get('/dashboard?transactions=2', headers=headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['accounts']) == 3
+    assert body['total_balance'] == 5000 + 1000 - 120.5
+    assert [transaction['amount'] for transaction in body['recent_transactions']][0] == 120.5
+    assert len(body['recent_transactions']) == 2
+    assert [bill['id'] for bill in body['upcoming_bills']] == [seeded['bill_id']]
+    assert body['budgets'][0]['spent'] == 120.5
+    assert body['budgets'][0]['remaining'] == 379.5
+    assert body['budgets'][0]['utilisation'] == 0.241
+
+def test_parallel_queries_return_the_same_summary(client, seeded, monkeypatch):
+    sequential = client.get('/dashboard', headers=seeded['headers']).get_json()
+
+    monkeypatch.setattr(dashboard, '_parallel_enabled', lambda engine: True)
+    parallel = client.get('/dashboard', headers=seeded['headers']).get_json()
+
+    assert parallel == sequential
+
+def test_rejects_a_non_numeric_limit(client, seeded):
+    response = client.get('/dashboard?transactions=many', headers=seeded['headers'])
+
+    assert response.status_code == 400
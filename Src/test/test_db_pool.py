@@ -0,0 +1,83 @@
+import pytest
+from src.app import create_app
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from src.models.utils.db_pool import InstrumentedQueuePool, build_engine_options, pool_metrics, pool_status
+
+POOL_CONFIG = {
+    'DB_POOL_PRE_PING': True,
+    'DB_POOL_RECYCLE': 1800,
+    'DB_POOL_SIZE': 10,
+    'DB_MAX_OVERFLOW': 20,
+    'DB_POOL_TIMEOUT': 5
+}
+
+@pytest.fixture
+def metrics():
+    pool_metrics.reset()
+    yield pool_metrics
+    pool_metrics.reset()
+
+def test_sqlite_keeps_its_own_pool():
+    options = build_engine_options({**POOL_CONFIG, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+
+    assert options == {'pool_pre_ping': True, 'pool_recycle': 1800}
+
+def test_server_databases_get_a_sized_instrumented_pool():
+    options = build_engine_options({**POOL_CONFIG, 'SQLALCHEMY_DATABASE_URI': 'mysql://user@localhost/revobank'})
+
+    assert options == {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 5
+    }
+
+def test_checkouts_and_timeouts_are_counted(tmp_path, metrics):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+    with engine.connect():
+        assert pool_status(engine)['checked_out'] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    with engine.connect():
+        pass
+    engine.dispose()
+
+    snapshot = metrics.snapshot()
+    assert (snapshot['checkouts'], snapshot['timeouts']) == (2, 1)
+    # The timed-out wait counts towards the total but not the checkout histogram
+    assert snapshot['total_wait_seconds'] >= 0.05
+    assert snapshot['checkout_latency_seconds']['count'] == 2
+    assert snapshot['checkout_latency_seconds']['buckets'][-1] == {'le': '+Inf', 'count': 2}
+
+def test_pool_endpoint_reports_every_bind(client, metrics):
+    response = client.get('/internal/pool')
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert set(body) == {'pid', 'pools', 'checkout'}
+    assert body['pools']['default']['pool_class']
+    assert set(body['checkout']) == {
+        'checkouts', 'timeouts', 'total_wait_seconds', 'max_wait_seconds', 'checkout_latency_seconds'
+    }
+    assert set(body['checkout']['checkout_latency_seconds']) == {'buckets', 'count', 'sum'}
+
+def test_pool_endpoint_needs_the_internal_token(app, client):
+    app.config['INTERNAL_API_TOKEN'] = 'secret'
+
+    assert client.get('/internal/pool').status_code == 401
+    assert client.get('/internal/pool', headers={'X-Internal-Token': 'secret'}).status_code == 200
+
+def test_internal_endpoints_are_closed_without_a_token_outside_debug(app, client):
+    app.testing = False
+
+    assert client.get('/internal/pool').status_code == 401
+    assert client.get('/metrics').status_code == 401
+
+def test_production_needs_an_internal_token():
+    with pytest.raises(ValueError, match='INTERNAL_API_TOKEN'):
+        create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'FLASK_ENV': 'production', 'INTERNAL_API_TOKEN': None})
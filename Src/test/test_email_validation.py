@@ -0,0 +1,90 @@
+import threading
+import dns.resolver
+import pytest
+from src.app import create_app
+from src.models.base import db
+from src.models.utils.email_deliverability import DeliverabilityChecker, email_deliverability
+from src.models.utils.validators import validate_email_address
+
+@pytest.fixture
+def no_dns(monkeypatch):
+    def resolve(*args, **kwargs):
+        raise AssertionError('DNS lookup on the request path')
+    monkeypatch.setattr(dns.resolver.Resolver, 'resolve', resolve)
+
+class FakeLookup:
+    def __init__(self, verdicts):
+        self.verdicts = verdicts
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, domain, timeout):
+        self.release.wait(5)
+        self.calls.append(domain)
+        return self.verdicts.get(domain)
+
+def test_validation_is_syntax_only_by_default(no_dns):
+    assert validate_email_address('someone@example.com') == (True, 'Email is valid')
+    valid, message = validate_email_address('someone@@example.com')
+    assert not valid and message
+
+def test_checker_answers_from_cache_and_looks_up_each_domain_once():
+    lookup = FakeLookup({'dead-domain.com': False, 'mail.com': True})
+    checker = DeliverabilityChecker(lookup=lookup)
+    checker.enabled = True
+    lookup.release.clear()
+
+    # Unknown until the background lookup lands; concurrent misses share it
+    assert [checker.check('Dead-Domain.com') for _ in range(3)] == [None] * 3
+    lookup.release.set()
+    checker.wait(5)
+
+    assert checker.check('dead-domain.com') is False
+    assert lookup.calls == ['dead-domain.com']
+
+def test_timeouts_are_not_cached():
+    lookup = FakeLookup({})
+    checker = DeliverabilityChecker(lookup=lookup)
+    checker.enabled = True
+
+    checker.check('slow.com')
+    checker.wait(5)
+    checker.check('slow.com')
+    checker.wait(5)
+
+    assert lookup.calls == ['slow.com', 'slow.com']
+
+def test_disabled_checker_never_looks_up():
+    lookup = FakeLookup({'dead-domain.com': False})
+    checker = DeliverabilityChecker(lookup=lookup)
+
+    assert checker.check('dead-domain.com') is None
+    assert lookup.calls == []
+
+def test_registration_rejects_known_dead_domains_without_waiting(monkeypatch, no_dns):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True, 'EMAIL_DELIVERABILITY_CHECK': True})
+    lookup = FakeLookup({'dead-domain.com': False})
+    monkeypatch.setattr(email_deliverability, 'lookup', lookup)
+    with app.app_context():
+        db.create_all(bind_key=None)
+    client = app.test_client()
+
+    def register(username):
+        return client.post('/users', json={
+            'username': username, 'email': f'{username}@dead-domain.com', 'password': 'Test1234!'
+        })
+
+    # First sight of the domain: accepted, lookup queued in the background
+    assert register('first').status_code == 201
+    email_deliverability.wait(5)
+    rejected = register('second')
+
+    assert rejected.status_code == 400
+    assert rejected.get_json()['message'] == {
+        'email': ['The domain name of this email address does not accept email']
+    }
+    assert lookup.calls == ['dead-domain.com']
+
+    with app.app_context():
+        db.drop_all(bind_key=None)
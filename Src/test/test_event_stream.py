@@ -0,0 +1,172 @@
+import datetime
+import json
+import pytest
+from sqlalchemy import func, insert, select
+from src.models.base import db
+from src.models.outbox import OutboxEvent
+from src.models.utils.event_hub import event_hub
+from src.models.utils.outbox import record_event
+
+def parse(chunk):
+    """
+    A server-sent event chunk as a dict of its fields, data decoded
+    """
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    event = {}
+    for line in chunk.strip().splitlines():
+        name, _, value = line.partition(': ')
+        event[name] = json.loads(value) if name == 'data' else value
+    return event
+
+@pytest.fixture
+def open_stream(client):
+    streams = []
+
+    def connect(path='/transactions/stream', **kwargs):
+        response = client.get(path, **kwargs)
+        streams.append(response)
+        return response, iter(response.response)
+
+    yield connect
+    for response in streams:
+        response.close()
+
+def post_transaction(client, seeded, amount, transaction_type='deposit', account_key='account_id'):
+    return client.post('/transactions', headers=seeded['headers'], json={
+        'account_id': seeded[account_key], 'transaction_type': transaction_type, 'amount': amount
+    })
+
+def test_new_transactions_are_pushed_with_the_balance(client, seeded, open_stream):
+    response, chunks = open_stream(headers=seeded['headers'])
+    assert response.mimetype == 'text/event-stream'
+    assert 'Content-Encoding' not in response.headers
+
+    created = post_transaction(client, seeded, 25).get_json()
+
+    assert next(chunks) == b'retry: 3000\n\n'
+    event = parse(next(chunks))
+    assert (event['id'], event['event']) == (str(created['id']), 'transaction')
+    assert event['data']['transaction']['amount'] == 25
+    assert event['data']['balance'] == 5025
+    assert event_hub.subscriber_count() == 1
+
+    response.close()
+    assert event_hub.subscriber_count() == 0
+
+def test_the_token_can_come_from_the_query_string(client, seeded, open_stream):
+    token = seeded['headers']['Authorization'].split()[1]
+
+    response, _ = open_stream(f'/transactions/stream?jwt={token}')
+    unauthenticated = client.get('/transactions/stream')
+
+    assert response.status_code == 200
+    assert unauthenticated.status_code == 401
+
+def test_reconnects_replay_missed_transactions(seeded, open_stream):
+    # Seeded transactions are ids 1-6, three per funded account
+    response, chunks = open_stream(headers={**seeded['headers'], 'Last-Event-ID': '3'})
+    next(chunks)
+
+    replayed = [parse(next(chunks)) for _ in range(3)]
+
+    assert [event['id'] for event in replayed] == ['4', '5', '6']
+    assert replayed[0]['data']['balance'] == 1000
+
+def test_a_long_gap_asks_the_client_to_resync(seeded, open_stream, monkeypatch):
+    monkeypatch.setattr(event_hub, 'replay_limit', 2)
+
+    _, chunks = open_stream(headers={**seeded['headers'], 'Last-Event-ID': '0'})
+    events = [parse(next(chunks)) for _ in range(4)][1:]
+
+    assert [event['event'] for event in events] == ['transaction', 'transaction', 'resync']
+
+def test_bad_last_event_ids_are_rejected(client, seeded):
+    response = client.get('/transactions/stream', headers={**seeded['headers'], 'Last-Event-ID': 'abc'})
+
+    assert response.status_code == 400
+
+def test_sync_gunicorn_workers_refuse_streams(client, seeded):
+    sync = {'SERVER_SOFTWARE': 'gunicorn/20.1.0', 'wsgi.multithread': False}
+    threaded = {'SERVER_SOFTWARE': 'gunicorn/20.1.0', 'wsgi.multithread': True}
+
+    refused = client.get('/transactions/stream', headers=seeded['headers'], environ_overrides=sync)
+
+    assert refused.status_code == 503
+    assert event_hub.subscriber_count() == 0
+    assert event_hub.can_stream(threaded)
+
+def test_quiet_streams_send_heartbeats(seeded, open_stream, monkeypatch):
+    monkeypatch.setattr(event_hub, 'heartbeat_seconds', 0.01)
+
+    _, chunks = open_stream(headers=seeded['headers'])
+    next(chunks)
+
+    assert next(chunks) == b': heartbeat\n\n'
+
+def test_failed_writes_publish_nothing(client, seeded):
+    subscription = event_hub.subscribe(seeded['user_id'])
+
+    response = post_transaction(client, seeded, 1, 'withdrawal', 'empty_account_id')
+
+    assert response.status_code == 400
+    assert subscription.wait(0) == []
+    event_hub.unsubscribe(subscription)
+
+def test_a_stream_that_falls_behind_is_told_to_resync(monkeypatch):
+    monkeypatch.setattr(event_hub, 'max_pending', 2)
+    mine, theirs = event_hub.subscribe(1), event_hub.subscribe(2)
+    chunks = event_hub.stream(mine)
+    next(chunks)
+
+    for event_id in range(3):
+        event_hub.publish(1, event_id, {})
+
+    assert parse(next(chunks))['event'] == 'resync'
+    assert list(chunks) == []
+    assert theirs.wait(0) == []
+    event_hub.unsubscribe(theirs)
+
+def test_the_outbox_poller_relays_other_workers_transactions(app, client, seeded):
+    subscription = event_hub.subscribe(seeded['user_id'])
+    with app.app_context():
+        event_hub.poll_outbox()
+
+        # Committed here, so published directly; the poller must not repeat it
+        post_transaction(client, seeded, 10)
+        # Written by another worker: only the outbox knows about it
+        record_event('transaction.created', 'transaction', 999, {
+            'transaction': {'id': 999}, 'user_id': seeded['user_id'], 'balance': 1
+        })
+        db.session.commit()
+
+        assert event_hub.poll_outbox() == 1
+
+    assert [event_id for event_id, _ in subscription.wait(0)] == [7, 999]
+    event_hub.unsubscribe(subscription)
+
+def test_the_outbox_poller_publishes_slow_commits_late(app, seeded):
+    outbox = OutboxEvent.__table__
+
+    def other_worker_commits(event_id, transaction_id):
+        payload = json.dumps({'transaction': {'id': transaction_id}, 'user_id': seeded['user_id'], 'balance': 1})
+        db.session.execute(insert(outbox).values(
+            id=event_id, event_type='transaction.created', aggregate_type='transaction',
+            aggregate_id=transaction_id, payload=payload, created_at=datetime.datetime.utcnow()
+        ))
+        db.session.commit()
+
+    subscription = event_hub.subscribe(seeded['user_id'])
+    with app.app_context():
+        event_hub.poll_outbox()
+        last_id = db.session.execute(select(func.max(outbox.c.id))).scalar() or 0
+
+        # last_id + 1 was allocated first but commits after last_id + 2 was polled
+        other_worker_commits(last_id + 2, 1001)
+        assert event_hub.poll_outbox() == 1
+        other_worker_commits(last_id + 1, 1000)
+        assert event_hub.poll_outbox() == 1
+        assert event_hub.poll_outbox() == 0
+
+    assert [event_id for event_id, _ in subscription.wait(0)] == [1001, 1000]
+    event_hub.unsubscribe(subscription)
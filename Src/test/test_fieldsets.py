@@ -0,0 +1,59 @@
+import pytest
+from src.models.base import db
+from src.models.transaction import Transaction
+from src.models.utils.fieldsets import TRANSACTION_FIELDS, UnknownFieldError
+
+def test_parse_keeps_order_and_drops_duplicates():
+    assert TRANSACTION_FIELDS.parse(' amount, id,amount ,') == ('amount', 'id')
+    assert TRANSACTION_FIELDS.parse(None) == TRANSACTION_FIELDS.names
+
+    with pytest.raises(UnknownFieldError, match='Unknown field\\(s\\) for transactions: secret'):
+        TRANSACTION_FIELDS.parse('id,secret')
+
+def test_full_fieldset_matches_to_dict(app, client, seeded):
+    response = client.get(f"/transactions/{seeded['transaction_id']}", headers=seeded['headers'])
+
+    with app.app_context():
+        expected = db.session.get(Transaction, seeded['transaction_id']).to_dict()
+    assert response.get_json() == expected
+
+def test_only_requested_columns_are_selected(client, seeded, query_recorder):
+    with query_recorder() as queries:
+        response = client.get('/transactions?fields=id,amount,created_at', headers=seeded['headers'])
+
+    assert response.status_code == 200
+    assert all(set(transaction) == {'id', 'amount', 'created_at'} for transaction in response.get_json())
+    select_list = queries.statements[0].split(' FROM ')[0]
+    assert 'description' not in select_list and 'transaction_type' not in select_list
+
+@pytest.mark.parametrize('path,key,fields', [
+    ('/accounts', None, {'id', 'balance'}),
+    ('/bills', 'bills', {'id', 'due_date'}),
+    ('/budgets', 'budgets', {'name'}),
+    ('/transactions/categories', 'categories', {'name'}),
+])
+def test_list_routes_accept_fields(client, seeded, path, key, fields):
+    response = client.get(f"{path}?fields={','.join(sorted(fields))}", headers=seeded['headers'])
+
+    items = response.get_json() if key is None else response.get_json()[key]
+    assert items and all(set(item) == fields for item in items)
+
+def test_detail_routes_accept_fields(client, seeded):
+    account = client.get(f"/accounts/{seeded['account_id']}?fields=balance", headers=seeded['headers'])
+    user = client.get('/users/me?fields=username', headers=seeded['headers'])
+
+    assert account.get_json() == {'balance': 5000.0}
+    assert user.get_json() == {'username': 'testuser'}
+
+@pytest.mark.parametrize('path,message_key', [
+    ('/transactions?fields=id,password_hash', 'message'),
+    ('/accounts?fields=owner', 'message'),
+    ('/bills?fields=nope', 'error'),
+])
+def test_unknown_fields_are_rejected_up_front(client, seeded, query_recorder, path, message_key):
+    with query_recorder() as queries:
+        response = client.get(path, headers=seeded['headers'])
+
+    assert response.status_code == 400
+    assert 'Available: id,' in response.get_json()[message_key]
+    assert queries.count == 0
@@ -0,0 +1,91 @@
+import re
+import time
+import pytest
+from src.app import create_app
+from src.models.utils import instrumentation
+from src.models.utils.instrumentation import request_metrics
+
+SERVER_TIMING = re.compile(
+    r'^app;dur=(?P<app>\d+\.\d{2}), db;dur=(?P<db>\d+\.\d{2});desc="(?P<queries>\d+) queries", '
+    r'ser;dur=(?P<ser>\d+\.\d{2})$'
+)
+
+def server_timing(response):
+    match = SERVER_TIMING.match(response.headers['Server-Timing'])
+    assert match, response.headers['Server-Timing']
+    return {name: float(value) for name, value in match.groupdict().items()}
+
+def samples(lines, name, endpoint):
+    """
+    {le or 'count': value} of one endpoint's series in rendered exposition lines
+    """
+    found = {}
+    for line in lines:
+        series, _, value = line.rpartition(' ')
+        if series.startswith(f'{name}_bucket{{endpoint="{endpoint}",'):
+            found[series.split('le="')[1].rstrip('"}')] = float(value)
+        elif series == f'{name}_count{{endpoint="{endpoint}"}}':
+            found['count'] = float(value)
+    return found
+
+def test_server_timing_splits_sql_and_app_time(client, seeded):
+    response = client.get('/accounts', headers=seeded['headers'])
+    health = client.get('/')
+
+    timing = server_timing(response)
+    assert timing['queries'] == 1
+    assert timing['app'] >= timing['db'] + timing['ser']
+    assert server_timing(health)['queries'] == 0
+
+def test_serialisation_is_charged_to_the_request(client, seeded, monkeypatch):
+    def slow_output_json(data, code, headers=None):
+        time.sleep(0.005)
+        return output_json(data, code, headers)
+    output_json = instrumentation.output_json
+    monkeypatch.setattr(instrumentation, 'output_json', slow_output_json)
+
+    resource = client.get('/accounts', headers=seeded['headers'])
+    monkeypatch.setattr(instrumentation.DefaultJSONProvider, 'dumps',
+                        lambda self, obj, **kwargs: time.sleep(0.005) or '{}')
+    blueprint = client.get('/bills', headers=seeded['headers'])
+
+    assert server_timing(resource)['ser'] >= 5
+    assert server_timing(blueprint)['ser'] >= 5
+
+def test_histograms_count_requests_per_endpoint(client, seeded):
+    name = 'revobank_request_sql_statements'
+    before = samples(request_metrics.render(), name, 'accountlistresource')
+
+    for _ in range(2):
+        client.get('/accounts', headers=seeded['headers'])
+    after = samples(request_metrics.render(), name, 'accountlistresource')
+
+    assert after['count'] - before.get('count', 0) == 2
+    # One statement each: the le="1" bucket grows, le="0" doesn't
+    assert after['1'] - before.get('1', 0) == 2
+    assert after['0'] == before.get('0', 0)
+
+def test_metrics_endpoint_renders_histograms_and_pool_gauges(client, seeded):
+    client.get('/accounts', headers=seeded['headers'])
+
+    response = client.get('/metrics')
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    for family in ('request_duration_seconds', 'request_db_seconds', 'request_sql_statements',
+                   'request_serialization_seconds'):
+        assert f'# TYPE revobank_{family} histogram' in body
+        assert f'revobank_{family}_count{{endpoint="accountlistresource"}}' in body
+    assert 'revobank_db_pool_checked_out{bind="default"}' in body
+
+@pytest.fixture
+def unmetered_app():
+    return create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True,
+                       'SSE_OUTBOX_POLL_SECONDS': 0, 'REQUEST_METRICS_ENABLED': False})
+
+def test_metrics_can_be_turned_off(unmetered_app):
+    response = unmetered_app.test_client().get('/')
+
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
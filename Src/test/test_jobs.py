@@ -0,0 +1,115 @@
+import csv
+from datetime import datetime, timedelta
+import pytest
+from src.app import create_app
+from src.models.base import db
+from src.models.utils.jobs import JOB_TYPES, JobType, JobWorker, job_queue
+
+@pytest.fixture
+def app(tmp_path):
+    # A database file rather than sqlite://, whose single shared connection
+    # would commit a job's progress and its handler's work together
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'jobs.db'}",
+        'TESTING': True,
+        'SSE_OUTBOX_POLL_SECONDS': 0,
+        'JOB_RESULTS_DIR': str(tmp_path / 'results')
+    })
+    with app.app_context():
+        db.create_all(bind_key=None)
+
+    yield app
+
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+def queue_job(client, seeded, **body):
+    return client.post('/jobs', headers=seeded['headers'], json={'job_type': 'transactions_export', **body})
+
+def test_queued_jobs_report_their_status(client, seeded):
+    response = queue_job(client, seeded, params={'start_date': '2024-01-01', 'unknown': 1}, priority=5)
+
+    assert response.status_code == 202
+    job = response.get_json()['job']
+    assert response.headers['Location'].endswith(f"/jobs/{job['id']}")
+    assert (job['status'], job['priority'], job['payload']) == ('queued', 5, {'start_date': '2024-01-01'})
+
+    fetched = client.get(f"/jobs/{job['id']}", headers=seeded['headers']).get_json()
+    assert (fetched['status'], fetched['progress'], fetched['result_location']) == ('queued', 0, None)
+
+@pytest.mark.parametrize('body', [
+    {'job_type': 'reconcile'},
+    {'job_type': 'transactions_export', 'params': {'start_date': 'yesterday'}},
+    {'job_type': 'transactions_export', 'priority': 11}
+])
+def test_invalid_jobs_are_rejected(client, seeded, body):
+    response = client.post('/jobs', headers=seeded['headers'], json=body)
+
+    assert response.status_code == 400
+
+def test_other_users_jobs_look_missing(app, client, seeded):
+    with app.app_context():
+        job = job_queue.enqueue('reconcile')
+        db.session.commit()
+        job_id = job.id
+
+    assert client.get(f'/jobs/{job_id}', headers=seeded['headers']).status_code == 404
+
+def test_a_worker_runs_exports_and_serves_the_result(app, client, seeded):
+    job_id = queue_job(client, seeded).get_json()['job']['id']
+
+    finished = JobWorker(app, concurrency=2).run(once=True)
+
+    assert finished == {'succeeded': 2}
+    job = client.get(f'/jobs/{job_id}', headers=seeded['headers']).get_json()
+    assert (job['status'], job['progress']) == ('succeeded', 100)
+
+    response = client.get(job['result_location'], headers=seeded['headers'])
+    rows = list(csv.reader(response.get_data(as_text=True).splitlines()))
+    assert response.status_code == 200
+    assert rows[0][0] == 'id' and len(rows) == 7
+
+def test_claims_go_highest_priority_first_and_to_one_worker(app):
+    with app.app_context():
+        low, high = job_queue.enqueue('reconcile', priority=-1), job_queue.enqueue('reconcile', priority=3)
+        db.session.commit()
+
+        assert job_queue.claim('host-a:1', 1) == [high.id]
+        assert job_queue.claim('host-b:1', 5) == [low.id]
+        assert job_queue.claim('host-c:1', 5) == []
+
+def test_failed_attempts_back_off_then_fail(app, monkeypatch):
+    def explode(context, payload):
+        raise RuntimeError('boom')
+    monkeypatch.setitem(JOB_TYPES, 'explode', JobType(explode, 2))
+
+    with app.app_context():
+        job = job_queue.enqueue('explode')
+        db.session.commit()
+        job_id = job.id
+        job_queue.claim('host-a:1', 1)
+
+        assert job_queue.run(job_id, 'host-a:1') == 'queued'
+        assert job.error == 'RuntimeError: boom'
+        assert job.run_after > datetime.utcnow() + timedelta(seconds=job_queue.retry_base_seconds / 2 - 1)
+        assert job_queue.claim('host-a:1', 1) == []
+
+        job.run_after = datetime.utcnow()
+        db.session.commit()
+        job_queue.claim('host-a:1', 1)
+
+        assert job_queue.run(job_id, 'host-a:1') == 'failed'
+
+def test_jobs_of_silent_workers_are_retried(app):
+    with app.app_context():
+        job = job_queue.enqueue('reconcile')
+        job.max_attempts = 2
+        db.session.commit()
+        job_queue.claim('host-a:1', 1)
+        job.locked_at = datetime.utcnow() - timedelta(seconds=job_queue.lease_seconds + 1)
+        db.session.commit()
+
+        assert job_queue.reclaim_expired() == 1
+        assert job.status == 'queued'
+        # The crashed worker can no longer record an outcome for it
+        assert job_queue.run(job.id, 'host-a:1') is None
@@ -0,0 +1,244 @@
+from decimal import Decimal
+import pytest
+from sqlalchemy import func, select, update
+from src.commands.ledger import backfill_opening_entries, fold_all_shards
+from src.models.base import db
+from src.models.account import Account
+from src.models.balance_shard import BalanceShard
+from src.models.bill import Bill
+from src.models.journal import JournalEntry, JournalLine
+from src.models.transaction import Transaction
+from src.models.utils.ledger import (
+    CASH, InsufficientFundsError, Posting, UnbalancedEntryError, balance_drift, credit, debit, deposit,
+    posting_engine, rebuild_balances, set_balance_shards, transfer, trial_balance, withdrawal
+)
+
+@pytest.fixture
+def journaled(app, seeded):
+    """
+    Seeded accounts with their stored balances journaled as opening entries
+    """
+    with app.app_context():
+        backfill_opening_entries()
+    return seeded
+
+@pytest.fixture
+def hot_account(app, journaled):
+    """
+    The empty account, sharded four ways
+    """
+    with app.app_context():
+        set_balance_shards(journaled['empty_account_id'], 4)
+        db.session.commit()
+    return journaled['empty_account_id']
+
+def balance(account_id):
+    return db.session.get(Account, account_id).balance
+
+def shard_balances(account_id):
+    return db.session.scalars(
+        select(BalanceShard.balance).where(BalanceShard.account_id == account_id).order_by(BalanceShard.shard)
+    ).all()
+
+def test_unbalanced_entries_are_rejected_before_any_sql():
+    with pytest.raises(UnbalancedEntryError):
+        Posting('deposit', [debit(10, ledger_account=CASH), credit(9.99, account_id=1)])
+    with pytest.raises(UnbalancedEntryError):
+        Posting('deposit', [debit(10, ledger_account=CASH), credit(10, account_id=1, ledger_account=CASH)])
+
+@pytest.mark.parametrize('returning', [True, False])
+def test_a_batch_updates_each_account_once(app, journaled, query_recorder, monkeypatch, returning):
+    account_id = journaled['account_id']
+    with app.app_context():
+        # Without RETURNING (MySQL) entry ids and balances are selected back
+        dialect = db.engine.dialect
+        monkeypatch.setattr(dialect, 'insert_executemany_returning', returning)
+        monkeypatch.setattr(dialect, 'update_returning', returning)
+        postings = [deposit(account_id, 10) for _ in range(50)] + [withdrawal(account_id, 5) for _ in range(50)]
+
+        with query_recorder() as queries:
+            balances = posting_engine.post(postings)
+        db.session.commit()
+
+        assert balances == {account_id: Decimal('5250.00')}
+        # One balance UPDATE, one entries INSERT and one lines INSERT, plus two selects without RETURNING
+        assert queries.count == (3 if returning else 5)
+        assert db.session.scalar(select(func.count()).select_from(JournalEntry)) == 102
+        assert trial_balance()[0] == trial_balance()[1]
+        assert balance_drift() == []
+
+def test_transfers_move_money_between_accounts(app, journaled):
+    source, destination = journaled['account_id'], journaled['empty_account_id']
+    with app.app_context():
+        posting_engine.post([transfer(source, 125, to_account_id=destination)])
+        db.session.commit()
+
+        assert (balance(source), balance(destination)) == (Decimal('4875.00'), Decimal('125.00'))
+        assert balance_drift() == []
+
+def test_an_overdraft_fails_the_whole_batch(app, journaled):
+    account_id, empty_id = journaled['account_id'], journaled['empty_account_id']
+    with app.app_context():
+        with pytest.raises(InsufficientFundsError) as raised:
+            posting_engine.post([deposit(account_id, 10), withdrawal(empty_id, 1)])
+        db.session.rollback()
+
+        assert raised.value.account_id == empty_id
+        assert balance(account_id) == Decimal('5000.00')
+        assert db.session.scalar(select(func.count()).select_from(JournalLine).where(
+            JournalLine.account_id == account_id
+        )) == 1
+
+def test_overdraft_is_checked_against_the_net_of_the_batch(app, journaled):
+    empty_id = journaled['empty_account_id']
+    with app.app_context():
+        balances = posting_engine.post([deposit(empty_id, 20), withdrawal(empty_id, 20)])
+        db.session.commit()
+
+        assert balances == {empty_id: Decimal('0.00')}
+
+def test_transactions_post_through_the_journal(client, journaled):
+    response = client.post('/transactions', headers=journaled['headers'], json={
+        'account_id': journaled['account_id'], 'transaction_type': 'withdrawal', 'amount': 40
+    })
+
+    assert response.status_code == 201
+    with client.application.app_context():
+        entry = db.session.scalars(select(JournalEntry).order_by(JournalEntry.id.desc())).first()
+        assert entry.transaction_id == response.get_json()['id']
+        assert [(line.side, line.account_id, line.ledger_account) for line in entry.lines] == [
+            ('debit', journaled['account_id'], None), ('credit', None, CASH)
+        ]
+        assert balance(journaled['account_id']) == Decimal('4960.00')
+
+def test_stored_amounts_match_the_journal(client, journaled):
+    response = client.post('/transactions', headers=journaled['headers'], json={
+        'account_id': journaled['empty_account_id'], 'transaction_type': 'deposit', 'amount': 10.01
+    })
+
+    assert response.status_code == 201
+    assert response.get_json()['amount'] == 10.01
+    with client.application.app_context():
+        stored = db.session.get(Transaction, response.get_json()['id']).amount
+        posted = db.session.scalar(select(JournalLine.amount).join(JournalEntry).where(
+            JournalEntry.transaction_id == response.get_json()['id'], JournalLine.account_id.isnot(None)
+        ))
+        assert Decimal(str(stored)) == posted == balance(journaled['empty_account_id']) == Decimal('10.01')
+
+def test_bulk_transactions_are_posted_together(client, journaled):
+    response = client.post('/transactions', headers=journaled['headers'], json=[
+        {'account_id': journaled['empty_account_id'], 'transaction_type': 'deposit', 'amount': 30},
+        {'account_id': journaled['empty_account_id'], 'transaction_type': 'withdrawal', 'amount': 25}
+    ])
+
+    assert response.status_code == 201
+    assert [item['amount'] for item in response.get_json()] == [30, 25]
+    with client.application.app_context():
+        assert balance(journaled['empty_account_id']) == Decimal('5.00')
+
+def test_insufficient_funds_leaves_no_transaction(client, journaled):
+    response = client.post('/transactions', headers=journaled['headers'], json={
+        'account_id': journaled['empty_account_id'], 'transaction_type': 'transfer', 'amount': 1
+    })
+
+    assert response.status_code == 400
+    assert response.get_json() == {'message': 'Insufficient funds'}
+    with client.application.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Transaction).where(
+            Transaction.account_id == journaled['empty_account_id']
+        )) == 0
+
+def test_paying_a_bill_debits_its_account_once(client, journaled):
+    path = f"/bills/{journaled['bill_id']}"
+
+    assert client.put(path, headers=journaled['headers'], json={'status': 'paid'}).status_code == 200
+    again = client.put(path, headers=journaled['headers'], json={'status': 'pending'})
+    cancel = client.delete(path, headers=journaled['headers'])
+
+    assert (again.status_code, cancel.status_code) == (400, 400)
+    with client.application.app_context():
+        assert balance(journaled['account_id']) == Decimal('4850.00')
+        assert db.session.get(Bill, journaled['bill_id']).status == 'paid'
+        assert balance_drift() == []
+
+def test_rebuild_restores_drifted_balances(app, journaled):
+    account_id = journaled['account_id']
+    with app.app_context():
+        db.session.execute(update(Account).where(Account.id == account_id).values(balance=1))
+        db.session.commit()
+
+        assert rebuild_balances() == [(account_id, Decimal('1.00'), Decimal('5000.00'))]
+        db.session.commit()
+        assert balance(account_id) == Decimal('5000.00')
+
+def test_credits_to_a_hot_account_skip_its_row(app, client, hot_account, journaled, query_recorder):
+    with app.app_context():
+        assert posting_engine.post([deposit(hot_account, 10)]) == {hot_account: Decimal('10.00')}
+        # Known to be sharded from here on, so credits go straight to a shard
+        with query_recorder() as queries:
+            for _ in range(19):
+                posting_engine.post([deposit(hot_account, 10)])
+        db.session.commit()
+
+        assert not [statement for statement in queries.statements if statement.startswith('UPDATE accounts')]
+        assert balance(hot_account) == 0
+        assert sum(shard_balances(hot_account)) == 200
+        assert len([value for value in shard_balances(hot_account) if value]) > 1
+        assert balance_drift() == []
+
+    # Readers see unfolded credits
+    response = client.get(f'/accounts/{hot_account}', headers=journaled['headers'])
+    assert response.get_json()['balance'] == 200
+
+def test_bills_and_account_updates_count_pending_credits(app, client, hot_account, journaled):
+    with app.app_context():
+        posting_engine.post([deposit(hot_account, 50)])
+        db.session.commit()
+        assert balance(hot_account) == 0
+
+    bill = client.post('/bills', headers=journaled['headers'], json={
+        'biller_name': 'Power Co', 'due_date': '2030-01-01', 'amount': 40, 'account_id': hot_account
+    })
+    updated = client.put(f'/accounts/{hot_account}', headers=journaled['headers'], json={'account_type': 'savings'})
+
+    assert bill.status_code == 201
+    assert updated.get_json()['balance'] == 50
+
+def test_debits_from_a_hot_account_spend_its_shards(app, hot_account):
+    with app.app_context():
+        posting_engine.post([deposit(hot_account, 30), deposit(hot_account, 20)])
+        db.session.commit()
+
+        assert posting_engine.post([withdrawal(hot_account, 45)]) == {hot_account: Decimal('5.00')}
+        db.session.commit()
+        assert (balance(hot_account), sum(shard_balances(hot_account))) == (Decimal('5.00'), 0)
+
+        with pytest.raises(InsufficientFundsError):
+            posting_engine.post([withdrawal(hot_account, 6)])
+        db.session.rollback()
+
+def test_folding_moves_pending_credits_into_the_balance(app, hot_account):
+    with app.app_context():
+        posting_engine.post([deposit(hot_account, 30), deposit(hot_account, 12.5)])
+        db.session.commit()
+
+        assert fold_all_shards() == {hot_account: Decimal('42.50')}
+        assert (balance(hot_account), shard_balances(hot_account)) == (Decimal('42.50'), [0, 0, 0, 0])
+        assert fold_all_shards() == {}
+
+def test_unsharding_folds_and_drops_the_shards(app, hot_account):
+    with app.app_context():
+        posting_engine.post([deposit(hot_account, 30)])
+        set_balance_shards(hot_account, 0)
+        db.session.commit()
+
+        assert (balance(hot_account), shard_balances(hot_account)) == (Decimal('30.00'), [])
+        assert posting_engine.post([deposit(hot_account, 1)]) == {hot_account: Decimal('31.00')}
+
+def test_a_stale_shard_hint_still_debits_correctly(app, journaled):
+    account_id = journaled['account_id']
+    with app.app_context():
+        posting_engine.sharded_accounts.add(account_id)
+
+        assert posting_engine.post([withdrawal(account_id, 100)]) == {account_id: Decimal('4900.00')}
+        assert account_id not in posting_engine.sharded_accounts
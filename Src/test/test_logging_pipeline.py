@@ -0,0 +1,95 @@
+import io
+import json
+import logging
+import threading
+import time
+import pytest
+from src.models.utils import logging_pipeline
+from src.models.utils.logging_pipeline import LogPipeline, SamplingFilter, log_pipeline
+
+def make_record(message, level=logging.WARNING, args=()):
+    return logging.LogRecord('src.test', level, __file__, 1, message, args, None)
+
+@pytest.fixture
+def log_lines(app):
+    stream = io.StringIO()
+    previous = log_pipeline.output.setStream(stream)
+
+    def lines():
+        log_pipeline.flush()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield lines
+    log_pipeline.output.setStream(previous)
+
+def test_records_are_json_with_the_request_id(client, log_lines):
+    response = client.get('/no-such-route', headers={'X-Request-ID': 'req-123'})
+
+    assert response.headers['X-Request-ID'] == 'req-123'
+    record = next(line for line in log_lines() if line['logger'] == 'src.app')
+    assert record['level'] == 'WARNING'
+    assert record['request_id'] == 'req-123'
+    assert record['message'].startswith('404 error: ')
+
+def test_unusable_request_ids_are_replaced(client):
+    response = client.get('/', headers={'X-Request-ID': 'x' * 65})
+
+    assert len(response.headers['X-Request-ID']) == 32
+
+def test_extra_fields_and_tracebacks_are_emitted(app, log_lines):
+    logger = logging.getLogger('src.test')
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.error('Transfer %s failed', 42, exc_info=True, extra={'account_id': 7})
+
+    record = next(line for line in log_lines() if line['logger'] == 'src.test')
+    assert record['message'] == 'Transfer 42 failed'
+    assert record['account_id'] == 7
+    assert 'ZeroDivisionError' in record['exception']
+
+def test_noisy_warnings_are_sampled_per_template(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logging_pipeline.time, 'monotonic', lambda: now[0])
+    sampler = SamplingFilter(burst=2, interval=60)
+
+    passed = [sampler.filter(make_record('Invalid token')) for _ in range(5)]
+    other = sampler.filter(make_record('Token has expired'))
+    error = sampler.filter(make_record('Invalid token', level=logging.ERROR))
+
+    assert passed == [True, True, False, False, False]
+    assert other and error
+
+    now[0] += 60
+    record = make_record('Invalid token')
+    assert sampler.filter(record) and record.suppressed == 3
+
+def test_a_full_queue_drops_instead_of_blocking():
+    writing = threading.Event()
+    written = []
+
+    class SlowOutput(logging.Handler):
+        def emit(self, record):
+            writing.wait(5)
+            written.append(record)
+
+    pipeline = LogPipeline()
+    pipeline.output = SlowOutput()
+    pipeline.queue_size = 5
+
+    start = time.perf_counter()
+    for index in range(1000):
+        pipeline.handler.handle(make_record('Error %s', logging.ERROR, (index,)))
+    elapsed = time.perf_counter() - start
+
+    writing.set()
+    pipeline.flush()
+    pipeline.handler.handle(make_record('After the flood', logging.ERROR))
+    pipeline.stop()
+
+    assert elapsed < 0.5
+    flood = [record for record in written if record.msg == 'Error %s']
+    assert len(flood) < 50
+    # Every dropped record is accounted for by the ones written after it
+    assert len(flood) + sum(getattr(record, 'dropped', 0) for record in written) == 1000
+    assert written[-1].msg == 'After the flood'
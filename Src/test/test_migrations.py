@@ -0,0 +1,70 @@
+import datetime
+import os
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade, downgrade
+from sqlalchemy import select
+from src.app import create_app
+from src.models.base import db
+from src.models.account import Account
+from src.models.transaction import Transaction
+from src.models.transaction_archive import TransactionArchive
+from src.models.bill import Bill
+from src.models.budget import Budget
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'migrations')
+
+# The queries behind the list and ownership checks, with the table each must reach by index
+HOT_QUERIES = {
+    'accounts by owner': select(Account).where(Account.user_id == 1),
+    'account ownership check': select(Account).where(Account.id == 1, Account.user_id == 1),
+    'transactions by owner': select(Transaction).join(Account).where(Account.user_id == 1),
+    'account history, newest first': (
+        select(Transaction).where(Transaction.account_id == 1).order_by(Transaction.created_at.desc())
+    ),
+    'archived account history': select(TransactionArchive).where(
+        TransactionArchive.account_id == 1, TransactionArchive.created_at >= datetime.datetime(2024, 1, 1)
+    ),
+    'archival walk, oldest first': (
+        select(Transaction.id).where(Transaction.created_at < datetime.datetime(2024, 1, 1))
+        .order_by(Transaction.created_at, Transaction.id).limit(1000)
+    ),
+    'bills by owner': select(Bill).where(Bill.user_id == 1),
+    'upcoming bills': select(Bill).where(
+        Bill.user_id == 1, Bill.due_date >= datetime.date(2024, 1, 1)
+    ).order_by(Bill.due_date),
+    'budgets by owner': select(Budget).where(Budget.user_id == 1),
+}
+
+@pytest.fixture
+def migrated_app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'migrated.db'}"})
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        yield app
+
+def query_plan(statement):
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    with db.engine.connect() as connection:
+        return [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+def test_migrations_match_the_models(migrated_app):
+    with db.engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        assert compare_metadata(context, db.metadata) == []
+
+def test_migrations_downgrade_cleanly(migrated_app):
+    downgrade(directory=MIGRATIONS, revision='base')
+
+    with db.engine.connect() as connection:
+        tables = connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'").scalars().all()
+    assert tables == ['alembic_version']
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_an_index(migrated_app, name):
+    plan = query_plan(HOT_QUERIES[name])
+
+    # SEARCH is an index or primary key lookup; SCAN is a full table walk and
+    # USE TEMP B-TREE a sort the index should have served
+    assert plan and all(step.startswith('SEARCH') for step in plan), plan
@@ -0,0 +1,156 @@
+import datetime
+import json
+import socket
+import threading
+import pytest
+from sqlalchemy import insert
+from src.models.base import db
+from src.models.outbox import OutboxEvent, OutboxConsumerOffset
+from src.models.utils.outbox import OutboxCursor, OutboxRelay, FileSink, build_sink, prune_outbox
+
+class ListSink:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def send(self, events):
+        if self.fail:
+            raise ConnectionError('sink down')
+        self.batches.append(events)
+
+    def close(self):
+        pass
+
+def create_transaction(client, seeded, amount=25, transaction_type='deposit'):
+    return client.post('/transactions', json={
+        'account_id': seeded['account_id'],
+        'transaction_type': transaction_type,
+        'amount': amount
+    }, headers=seeded['headers'])
+
+def test_writes_record_an_event_in_the_same_transaction(app, client, seeded):
+    assert create_transaction(client, seeded).status_code == 201
+    # Rejected writes leave no event behind
+    assert create_transaction(client, seeded, amount=10 ** 6, transaction_type='withdrawal').status_code == 400
+    client.put(f"/bills/{seeded['bill_id']}", json={'amount': 175}, headers=seeded['headers'])
+
+    with app.app_context():
+        events = [event.to_dict() for event in OutboxEvent.query.order_by(OutboxEvent.id)]
+
+    assert [event['event_type'] for event in events] == ['transaction.created', 'bill.updated']
+    assert events[0]['payload']['transaction']['amount'] == 25
+    assert events[0]['payload']['balance'] == 5025
+    assert events[1]['aggregate_id'] == seeded['bill_id']
+
+def test_relay_delivers_in_batches_and_stores_the_offset(app, client, seeded, tmp_path):
+    for amount in (1, 2, 3):
+        create_transaction(client, seeded, amount=amount)
+
+    path = tmp_path / 'events.jsonl'
+    with app.app_context():
+        relay = OutboxRelay(FileSink(str(path)), consumer='warehouse', batch_size=2)
+        assert relay.run(once=True) == 3
+        assert relay.run_once() == 0
+        relay.sink.close()
+
+        assert db.session.get(OutboxConsumerOffset, 'warehouse').last_event_id == OutboxEvent.query.count()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line['payload']['transaction']['amount'] for line in lines] == [1, 2, 3]
+
+def test_failed_delivery_is_retried_from_the_same_offset(app, client, seeded):
+    create_transaction(client, seeded)
+
+    with app.app_context():
+        with pytest.raises(ConnectionError):
+            OutboxRelay(ListSink(fail=True), consumer='fraud').run(once=True)
+
+        sink = ListSink()
+        assert OutboxRelay(sink, consumer='fraud').run_once() == 1
+        assert sink.batches[0][0]['event_type'] == 'transaction.created'
+
+def commit_event(event_id):
+    db.session.execute(insert(OutboxEvent.__table__).values(
+        id=event_id, event_type='bill.updated', aggregate_type='bill', aggregate_id=1,
+        payload='{}', created_at=datetime.datetime.utcnow()
+    ))
+    db.session.commit()
+
+def test_a_lower_id_committed_late_is_still_delivered(app, client, seeded):
+    create_transaction(client, seeded)
+
+    with app.app_context():
+        first = OutboxEvent.query.count()
+        sink = ListSink()
+        relay = OutboxRelay(sink)
+
+        # first + 1 was allocated first but its transaction commits last
+        commit_event(first + 2)
+        assert relay.run_once() == 2
+        assert relay.run_once() == 0
+        commit_event(first + 1)
+        assert relay.run_once() == 1
+
+        offset = db.session.get(OutboxConsumerOffset, 'default')
+        assert (offset.last_event_id, json.loads(offset.gaps)) == (first + 2, {})
+
+    assert [[event['id'] for event in batch] for batch in sink.batches] == [[first, first + 2], [first + 1]]
+
+def test_gaps_are_given_up_after_the_timeout(app, client, seeded):
+    create_transaction(client, seeded)
+
+    with app.app_context():
+        # A rolled-back insert leaves a gap that never fills
+        commit_event(OutboxEvent.query.count() + 2)
+        relay = OutboxRelay(ListSink(), gap_timeout=-1)
+        assert relay.run_once() == 2
+
+        assert json.loads(db.session.get(OutboxConsumerOffset, 'default').gaps) == {}
+
+def test_cursor_follows_the_id_stride_and_skips_range_jumps():
+    cursor = OutboxCursor(last_id=1, step=16)
+
+    assert cursor.advance([49, 100000001], now=0) == []
+    assert sorted(cursor.gaps) == [17, 33]
+    assert cursor.advance([33], now=1) == [33]
+    assert (cursor.last_id, sorted(cursor.gaps)) == (100000001, [17])
+
+def test_socket_sink_waits_for_acknowledgement(app, client, seeded, tmp_path):
+    create_transaction(client, seeded)
+    address = str(tmp_path / 'relay.sock')
+    received = []
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen(1)
+
+    def serve():
+        connection, _ = server.accept()
+        with connection, connection.makefile('rb') as reader:
+            received.append(json.loads(reader.readline()))
+            connection.sendall(b'OK\n')
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+
+    sink = build_sink(f'unix://{address}')
+    with app.app_context():
+        assert OutboxRelay(sink).run_once() == 1
+    sink.close()
+    thread.join(timeout=5)
+    server.close()
+
+    assert received[0]['event_type'] == 'transaction.created'
+
+def test_prune_keeps_events_a_consumer_has_not_received(app, client, seeded):
+    create_transaction(client, seeded)
+    create_transaction(client, seeded)
+
+    with app.app_context():
+        assert prune_outbox(keep_days=0) == 0
+
+        OutboxRelay(ListSink(), consumer='fast', batch_size=1).run_once()
+        OutboxRelay(ListSink(), consumer='slow', batch_size=2).run_once()
+
+        assert prune_outbox(keep_days=0) == 1
+        assert OutboxEvent.query.count() == 1
@@ -0,0 +1,141 @@
+import datetime
+import pytest
+
+TODAY = datetime.date.today()
+
+# Baseline statement budget for every (method, rule) registered in create_app.
+# A new route needs an entry here; raising a number should be a conscious decision.
+QUERY_BUDGETS = {
+    ('GET', '/'): 0,
+    ('POST', '/users'): 4,
+    ('POST', '/login'): 1,
+    ('GET', '/users/me'): 1,
+    ('PUT', '/users/me'): 3,
+    ('GET', '/accounts'): 1,
+    ('POST', '/accounts'): 9,
+    ('GET', '/accounts/<int:account_id>'): 1,
+    ('PUT', '/accounts/<int:account_id>'): 4,
+    ('DELETE', '/accounts/<int:account_id>'): 4,
+    ('GET', '/transactions'): 2,
+    ('POST', '/transactions'): 7,
+    ('GET', '/transactions/<int:transaction_id>'): 1,
+    ('GET', '/transactions/stream'): 0,
+    ('GET', '/budgets'): 1,
+    ('POST', '/budgets'): 2,
+    ('PUT', '/budgets/<int:budget_id>'): 3,
+    ('GET', '/transactions/categories'): 1,
+    ('GET', '/bills'): 1,
+    ('POST', '/bills'): 4,
+    ('PUT', '/bills/<int:bill_id>'): 4,
+    ('DELETE', '/bills/<int:bill_id>'): 3,
+    ('POST', '/auth/register'): 3,
+    ('POST', '/auth/login'): 1,
+    ('POST', '/auth/logout'): 1,
+    ('GET', '/auth/profile'): 1,
+    ('GET', '/dashboard'): 4,
+    ('POST', '/jobs'): 2,
+    ('GET', '/jobs/<int:job_id>'): 1,
+    ('GET', '/jobs/<int:job_id>/result'): 1,
+    ('GET', '/internal/pool'): 0,
+    ('GET', '/metrics'): 0,
+}
+
+# Write routes that fetch a row by primary key and then serialise it after
+# commit, which re-reads the expired row with the same statement
+RELOADED_AFTER_COMMIT = {
+    ('PUT', '/users/me'),
+    ('PUT', '/budgets/<int:budget_id>'),
+    ('PUT', '/bills/<int:bill_id>'),
+}
+
+def route_calls(seeded):
+    """
+    One representative request per budgeted route: (method, rule, path, json body,
+    auth, expected status)
+    """
+    return [
+        ('GET', '/', '/', None, None, 200),
+        ('POST', '/users', '/users',
+         {'username': 'newuser', 'email': 'new@example.com', 'password': 'Test1234!'}, None, 201),
+        ('POST', '/login', '/login', {'username': 'testuser', 'password': 'Test1234!'}, None, 200),
+        ('GET', '/users/me', '/users/me', None, 'jwt', 200),
+        ('PUT', '/users/me', '/users/me', {'first_name': 'Test'}, 'jwt', 200),
+        ('GET', '/accounts', '/accounts', None, 'jwt', 200),
+        ('POST', '/accounts', '/accounts', {'account_type': 'savings', 'initial_balance': 10}, 'jwt', 201),
+        ('GET', '/accounts/<int:account_id>', f"/accounts/{seeded['account_id']}", None, 'jwt', 200),
+        ('PUT', '/accounts/<int:account_id>', f"/accounts/{seeded['account_id']}",
+         {'account_type': 'checking'}, 'jwt', 200),
+        ('DELETE', '/accounts/<int:account_id>', f"/accounts/{seeded['empty_account_id']}", None, 'jwt', 200),
+        ('GET', '/transactions', '/transactions', None, 'jwt', 200),
+        ('POST', '/transactions', '/transactions',
+         {'account_id': seeded['account_id'], 'transaction_type': 'deposit', 'amount': 25}, 'jwt', 201),
+        ('GET', '/transactions/<int:transaction_id>', f"/transactions/{seeded['transaction_id']}", None, 'jwt', 200),
+        ('GET', '/transactions/stream', '/transactions/stream', None, 'jwt', 200),
+        ('GET', '/budgets', '/budgets', None, 'jwt', 200),
+        ('POST', '/budgets', '/budgets', {
+            'name': 'Travel',
+            'amount': 300,
+            'start_date': TODAY.isoformat(),
+            'end_date': (TODAY + datetime.timedelta(days=30)).isoformat()
+        }, 'jwt', 201),
+        ('PUT', '/budgets/<int:budget_id>', f"/budgets/{seeded['budget_id']}", {'amount': 600}, 'jwt', 200),
+        ('GET', '/transactions/categories', '/transactions/categories', None, 'jwt', 200),
+        ('GET', '/bills', '/bills', None, 'jwt', 200),
+        ('POST', '/bills', '/bills', {
+            'biller_name': 'Water Company',
+            'due_date': (TODAY + datetime.timedelta(days=10)).isoformat(),
+            'amount': 40,
+            'account_id': seeded['account_id']
+        }, 'jwt', 201),
+        ('PUT', '/bills/<int:bill_id>', f"/bills/{seeded['bill_id']}", {'amount': 160}, 'jwt', 200),
+        ('DELETE', '/bills/<int:bill_id>', f"/bills/{seeded['bill_id']}", None, 'jwt', 200),
+        ('POST', '/auth/register', '/auth/register',
+         {'username': 'another', 'email': 'another@example.com', 'password': 'Test1234!'}, None, 201),
+        ('POST', '/auth/login', '/auth/login', {'username': 'testuser', 'password': 'Test1234!'}, None, 200),
+        ('POST', '/auth/logout', '/auth/logout', None, 'session', 200),
+        ('GET', '/auth/profile', '/auth/profile', None, 'session', 200),
+        ('GET', '/dashboard', '/dashboard', None, 'jwt', 200),
+        ('POST', '/jobs', '/jobs', {'job_type': 'transactions_export', 'params': {'start_date': '2024-01-01'}}, 'jwt', 202),
+        ('GET', '/jobs/<int:job_id>', f"/jobs/{seeded['job_id']}", None, 'jwt', 200),
+        # The seeded job is still queued, so its result isn't ready
+        ('GET', '/jobs/<int:job_id>/result', f"/jobs/{seeded['job_id']}/result", None, 'jwt', 409),
+        ('GET', '/internal/pool', '/internal/pool', None, None, 200),
+        ('GET', '/metrics', '/metrics', None, None, 200),
+    ]
+
+def registered_routes(app):
+    ignored_methods = {'HEAD', 'OPTIONS'}
+    return {
+        (method, rule.rule)
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint != 'static'
+        for method in rule.methods - ignored_methods
+    }
+
+def test_every_registered_route_has_a_query_budget(app):
+    missing = registered_routes(app) - set(QUERY_BUDGETS)
+    assert not missing, f'Add a QUERY_BUDGETS entry for: {sorted(missing)}'
+
+def test_route_calls_cover_every_budget(seeded):
+    exercised = {(method, rule) for method, rule, _, _, _, _ in route_calls(seeded)}
+    assert exercised == set(QUERY_BUDGETS)
+
+@pytest.mark.parametrize('method,rule', sorted(QUERY_BUDGETS))
+def test_route_stays_within_query_budget(app, client, seeded, query_recorder, method, rule):
+    call = next(call for call in route_calls(seeded) if call[:2] == (method, rule))
+    _, _, path, body, auth, status = call
+
+    headers = seeded['headers'] if auth == 'jwt' else {}
+    if auth == 'session':
+        client.post('/auth/login', json={'username': 'testuser', 'password': 'Test1234!'})
+
+    with query_recorder() as queries:
+        response = client.open(path, method=method, json=body, headers=headers)
+
+    # A route failing early (401, 404) would meet its budget without doing its work
+    assert response.status_code == status, response.get_data(as_text=True)
+    queries.assert_budget(
+        QUERY_BUDGETS[(method, rule)],
+        allow_repeats=(method, rule) in RELOADED_AFTER_COMMIT,
+        label=f'{method} {rule}'
+    )
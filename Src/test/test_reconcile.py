@@ -0,0 +1,61 @@
+import csv
+import pytest
+from sqlalchemy import update
+from src.commands.reconcile import reconcile_balances
+from src.models.base import db
+from src.models.account import Account
+
+@pytest.fixture
+def balanced(app, seeded):
+    """
+    Seeded accounts with stored balances equal to their transactions (3 x 60, 0)
+    """
+    with app.app_context():
+        db.session.execute(update(Account).where(Account.id != seeded['empty_account_id']).values(balance=60))
+        db.session.commit()
+    return seeded
+
+def read_report(path):
+    with open(path, newline='') as handle:
+        return list(csv.DictReader(handle))
+
+@pytest.mark.parametrize('chunk_size,workers', [(10000, 1), (1, 3)])
+def test_full_run_reports_only_drifted_accounts(app, balanced, tmp_path, chunk_size, workers):
+    with app.app_context():
+        db.session.execute(update(Account).where(Account.id == balanced['account_id']).values(balance=75.5))
+        db.session.commit()
+
+        run = reconcile_balances(chunk_size=chunk_size, workers=workers, report_path=str(tmp_path / 'report.csv'))
+
+        assert (run.mode, run.accounts_checked, run.discrepancies) == ('full', 3, 1)
+        assert run.finished_at is not None
+
+    assert read_report(tmp_path / 'report.csv') == [{
+        'account_id': str(balanced['account_id']),
+        'stored_balance': '75.50',
+        'computed_balance': '60.00',
+        'difference': '15.50'
+    }]
+
+def test_incremental_run_checks_only_touched_accounts(app, client, balanced, tmp_path):
+    with app.app_context():
+        assert reconcile_balances(incremental=True, report_path=str(tmp_path / 'first.csv')).mode == 'full'
+
+    client.post('/transactions', json={
+        'account_id': balanced['account_id'],
+        'transaction_type': 'withdrawal',
+        'amount': 10
+    }, headers=balanced['headers'])
+
+    with app.app_context():
+        run = reconcile_balances(incremental=True, report_path=str(tmp_path / 'second.csv'))
+        assert (run.mode, run.accounts_checked, run.discrepancies) == ('incremental', 1, 0)
+
+def test_new_accounts_post_their_opening_balance(app, client, balanced, tmp_path):
+    response = client.post('/accounts', json={'account_type': 'savings', 'initial_balance': 250},
+                           headers=balanced['headers'])
+    assert response.status_code == 201
+
+    with app.app_context():
+        run = reconcile_balances(report_path=str(tmp_path / 'report.csv'))
+        assert (run.accounts_checked, run.discrepancies) == (4, 0)
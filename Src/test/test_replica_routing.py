@@ -0,0 +1,63 @@
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.models.base import db
+from src.models.transaction_category import TransactionCategory
+from src.models.budget import Budget
+from src.models.user import User
+
+def make_app(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_BINDS': {'replica_0': f"sqlite:///{tmp_path / 'replica.db'}"},
+        'REPLICA_STICKY_SECONDS': 60
+    })
+
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica_0'])
+
+        user = User(username='testuser', email='test@example.com')
+        user.set_password('Test1234!')
+        db.session.add(user)
+        # Only the primary knows about this category; the replica is "lagging"
+        db.session.add(TransactionCategory(name='Primary'))
+        db.session.commit()
+
+        with db.engines['replica_0'].begin() as connection:
+            connection.execute(TransactionCategory.__table__.insert().values(name='Replica'))
+
+        token = create_access_token(identity=user.id)
+
+    return app, {'Authorization': f'Bearer {token}'}
+
+def test_get_requests_read_from_replica(tmp_path):
+    app, headers = make_app(tmp_path)
+    client = app.test_client()
+
+    response = client.get('/transactions/categories', headers=headers)
+
+    assert response.status_code == 200
+    assert [category['name'] for category in response.get_json()['categories']] == ['Replica']
+
+def test_writes_go_to_primary_and_make_reads_sticky(tmp_path):
+    app, headers = make_app(tmp_path)
+    client = app.test_client()
+
+    response = client.post('/budgets', json={
+        'name': 'Groceries',
+        'amount': 200,
+        'start_date': '2024-01-01',
+        'end_date': '2024-01-31'
+    }, headers=headers)
+    assert response.status_code == 201
+
+    with app.app_context():
+        with db.engines['replica_0'].connect() as connection:
+            assert connection.execute(Budget.__table__.select()).fetchall() == []
+
+    # The writer reads its own write from the primary during the sticky window
+    response = client.get('/budgets', headers=headers)
+    assert [budget['name'] for budget in response.get_json()['budgets']] == ['Groceries']
+
+    response = client.get('/transactions/categories', headers=headers)
+    assert [category['name'] for category in response.get_json()['categories']] == ['Primary']
@@ -0,0 +1,88 @@
+import datetime
+import pytest
+from marshmallow import ValidationError
+from src.models.utils.schemas import (
+    BUDGET_UPDATE_SCHEMA, TRANSACTION_CREATION_SCHEMA, error_message, load_request
+)
+
+TODAY = datetime.date.today()
+
+def test_bulk_bodies_are_validated_as_a_whole(app):
+    valid = {'account_id': '1', 'transaction_type': 'deposit', 'amount': '12.5'}
+    invalid = {'account_id': 1, 'transaction_type': 'refund', 'amount': -3}
+
+    with app.test_request_context('/transactions', method='POST', json=[valid, valid]):
+        assert load_request(TRANSACTION_CREATION_SCHEMA, many=True) == [
+            {'account_id': 1, 'transaction_type': 'deposit', 'amount': 12.5}
+        ] * 2
+
+    with app.test_request_context('/transactions', method='POST', json=[valid, invalid]):
+        with pytest.raises(ValidationError) as error:
+            load_request(TRANSACTION_CREATION_SCHEMA, many=True)
+
+    # Every item is checked and errors are keyed by position
+    assert set(error.value.messages) == {1}
+    assert set(error.value.messages[1]) == {'transaction_type', 'amount'}
+    assert error_message(error.value).startswith('1.transaction_type: Invalid transaction type')
+
+def test_partial_schema_checks_dates_only_when_both_are_sent():
+    assert BUDGET_UPDATE_SCHEMA.load({'end_date': '2024-01-01'}) == {'end_date': datetime.date(2024, 1, 1)}
+
+    with pytest.raises(ValidationError) as error:
+        BUDGET_UPDATE_SCHEMA.load({'start_date': '2024-02-01', 'end_date': '2024-01-01'})
+    assert error_message(error.value) == 'End date must be after start date'
+
+@pytest.mark.parametrize('path,body,field', [
+    ('/transactions', {'account_id': 1, 'transaction_type': 'refund', 'amount': 5}, 'transaction_type'),
+    ('/transactions', {'account_id': 1, 'transaction_type': 'deposit', 'amount': -5}, 'amount'),
+    # Sub-cent amounts would be rounded, or zeroed, by the ledger
+    ('/transactions', {'account_id': 1, 'transaction_type': 'deposit', 'amount': 0.001}, 'amount'),
+    ('/transactions', {'account_id': 1, 'transaction_type': 'deposit', 'amount': 10.005}, 'amount'),
+    ('/transactions', {'account_id': 1, 'transaction_type': 'deposit', 'amount': 1e12}, 'amount'),
+    ('/accounts', {'account_type': 'savings', 'initial_balance': 0.5e9}, 'initial_balance'),
+    ('/accounts', {'initial_balance': 10}, 'account_type'),
+])
+def test_resources_reject_invalid_bodies_before_querying(client, seeded, query_recorder, path, body, field):
+    with query_recorder() as queries:
+        response = client.post(path, json=body, headers=seeded['headers'])
+
+    assert response.status_code == 400
+    assert list(response.get_json()['message']) == [field]
+    assert queries.count == 0
+
+@pytest.mark.parametrize('path,body,error', [
+    ('/bills', {'biller_name': 'Water', 'due_date': '01/02/2024', 'amount': 40, 'account_id': 1},
+     'due_date: Invalid date format. Use YYYY-MM-DD'),
+    ('/bills', {'biller_name': 'Water', 'due_date': TODAY.isoformat(), 'amount': 0, 'account_id': 1},
+     'amount: Bill amount must be positive'),
+    ('/bills', {'biller_name': 'Water', 'due_date': TODAY.isoformat(), 'amount': '40.001', 'account_id': 1},
+     'amount: Amount cannot have more than two decimal places'),
+    ('/bills', {'biller_name': 'Water', 'due_date': TODAY.isoformat(), 'amount': 2000000, 'account_id': 1},
+     'amount: Amount cannot exceed 1000000.00'),
+    ('/budgets', {'name': 'Trip', 'amount': 100, 'start_date': TODAY.isoformat(),
+                  'end_date': TODAY.isoformat()}, 'End date must be after start date'),
+])
+def test_blueprints_report_one_line_errors(client, seeded, path, body, error):
+    response = client.post(path, json=body, headers=seeded['headers'])
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+
+def test_unknown_keys_are_ignored_and_strings_coerced(client, seeded):
+    response = client.post('/transactions', json={
+        'account_id': str(seeded['account_id']),
+        'transaction_type': 'deposit',
+        'amount': '25',
+        'client_reference': 'abc'
+    }, headers=seeded['headers'])
+
+    assert response.status_code == 201
+    assert response.get_json()['amount'] == 25.0
+
+def test_auth_register_checks_email_and_password(client):
+    weak = client.post('/auth/register', json={'username': 'a', 'email': 'a@example.com', 'password': 'short'})
+    email = client.post('/auth/register', json={'username': 'a', 'email': 'nope', 'password': 'Test1234'})
+
+    assert weak.status_code == email.status_code == 400
+    assert weak.get_json()['message'].startswith('password: Password must be at least 8 characters')
+    assert email.get_json()['message'] == 'email: Invalid email format'
@@ -0,0 +1,48 @@
+import datetime
+from sqlalchemy import case, func, select
+from src.app import create_app
+from src.commands.seed import seed_database
+from src.models.base import db
+from src.models.account import Account
+from src.models.bill import Bill
+from src.models.budget import Budget
+from src.models.transaction import Transaction
+from src.models.user import User
+
+SEEDED_MODELS = (User, Account, Transaction, Bill, Budget)
+
+def seeded_rows():
+    """
+    Every seeded row of a fresh database, less the salted password hashes
+    """
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True, 'SSE_OUTBOX_POLL_SECONDS': 0})
+    with app.app_context():
+        db.create_all(bind_key=None)
+        seed_database(users=20, transactions=500, seed=7, end_date=datetime.date(2024, 1, 1))
+        rows = {}
+        for model in SEEDED_MODELS:
+            table = model.__table__
+            columns = [column for column in table.c if column.name != 'password_hash']
+            rows[table.name] = db.session.execute(select(*columns).order_by(*table.primary_key)).all()
+        db.drop_all(bind_key=None)
+    return rows
+
+def test_hot_accounts_stop_growing_at_the_balance_cap(app):
+    with app.app_context():
+        seed_database(users=2, transactions=5000, zipf_exponent=3, end_date=datetime.date(2024, 1, 1),
+                      max_balance=20000)
+        balances = db.session.execute(select(Account.id, Account.balance)).all()
+        signed = case((Transaction.transaction_type == 'deposit', Transaction.amount), else_=-Transaction.amount)
+        nets = dict(db.session.execute(
+            select(Transaction.account_id, func.sum(signed)).group_by(Transaction.account_id)
+        ).all())
+
+    assert max(balance for _, balance in balances) <= 20000
+    # Capped deposits are still written as they were applied
+    assert all(abs(float(balance) - nets[account_id]) < 0.01 for account_id, balance in balances)
+
+def test_the_same_seed_writes_the_same_rows():
+    first, second = seeded_rows(), seeded_rows()
+
+    assert all(first[table] for table in ('users', 'accounts', 'transactions', 'bills'))
+    assert first == second
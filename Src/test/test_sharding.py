@@ -0,0 +1,135 @@
+import pytest
+from sqlalchemy import func, select
+from src.commands.shards import move_user, user_counts
+from src.models.base import db
+from src.models.account import Account
+from src.models.transaction import Transaction
+from src.models.user_shard import UserShard
+from src.models.utils.event_hub import event_hub
+from src.models.utils.outbox import record_event
+from src.models.utils.sharding import route_session, shard_map
+
+@pytest.fixture
+def app(sharded_app):
+    return sharded_app
+
+def register(client, name):
+    response = client.post('/users', json={
+        'username': name, 'email': f'{name}@example.com', 'password': 'Test1234!'
+    })
+    return response.get_json()['user']['id'], {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+def account_rows(key):
+    with db.engines[key].connect() as connection:
+        return connection.execute(select(Account.__table__.c.id, Account.__table__.c.user_id)).all()
+
+def test_new_users_are_spread_over_the_shards(app, client):
+    first, _ = register(client, 'first')
+    second, _ = register(client, 'second')
+
+    with app.app_context():
+        assert {row.user_id: row.shard_key for row in UserShard.query} == {
+            first: f'shard_{first % 2}', second: f'shard_{second % 2}'
+        }
+
+def test_per_user_rows_live_on_the_users_shard(app, client):
+    user_id, headers = register(client, 'sharded')
+    account = client.post('/accounts', headers=headers, json={'account_type': 'savings', 'initial_balance': 50})
+    deposit = client.post('/transactions', headers=headers, json={
+        'account_id': account.get_json()['id'], 'transaction_type': 'deposit', 'amount': 25
+    })
+
+    assert (account.status_code, deposit.status_code) == (201, 201)
+    with app.app_context():
+        key = shard_map.shard_for(user_id, db.session)
+        other = next(other for other in shard_map.all_keys() if other != key)
+        assert [row.user_id for row in account_rows(key)] == [user_id]
+        assert account_rows(other) == []
+        # Ids come from the shard's own range
+        assert account_rows(key)[0].id >= shard_map.id_start(key)
+
+    accounts = client.get('/accounts', headers=headers).get_json()
+    assert [account['balance'] for account in accounts] == [75]
+    assert client.get('/dashboard', headers=headers).status_code == 200
+
+def test_users_without_a_mapping_stay_on_the_primary(app, client, seeded):
+    response = client.get(f"/transactions/{seeded['transaction_id']}", headers=seeded['headers'])
+
+    assert response.status_code == 200
+    assert response.get_json()['id'] == seeded['transaction_id']
+    with app.app_context():
+        assert [row.user_id for row in account_rows(None)] == [seeded['user_id']] * 3
+
+def test_moving_a_user_keeps_their_ids(app, client, seeded):
+    before = client.get('/transactions', headers=seeded['headers']).get_json()
+
+    with app.app_context():
+        copied = move_user(seeded['user_id'], 'shard_0', settle_seconds=0)
+        assert copied['accounts'] == 3 and copied['transactions'] == 6
+        assert account_rows(None) == []
+        assert user_counts() == {None: 0, 'shard_0': 1, 'shard_1': 0}
+
+    assert client.get('/transactions', headers=seeded['headers']).get_json() == before
+    created = client.post('/transactions', headers=seeded['headers'], json={
+        'account_id': seeded['account_id'], 'transaction_type': 'withdrawal', 'amount': 100
+    }).get_json()
+    assert created['id'] >= shard_map.id_start('shard_0')
+    balance = client.get(f"/accounts/{seeded['account_id']}", headers=seeded['headers']).get_json()['balance']
+    assert balance == 4900
+
+def test_moves_that_would_leave_the_id_range_are_refused(app, client, seeded):
+    with app.app_context():
+        move_user(seeded['user_id'], 'shard_1', settle_seconds=0)
+        client.post('/transactions', headers=seeded['headers'], json={
+            'account_id': seeded['account_id'], 'transaction_type': 'deposit', 'amount': 1
+        })
+
+        with pytest.raises(ValueError, match='id range'):
+            move_user(seeded['user_id'], 'shard_0', settle_seconds=0)
+
+        assert db.session.get(UserShard, seeded['user_id']).moving is False
+        assert account_rows('shard_0') == []
+
+    assert client.get('/accounts', headers=seeded['headers']).status_code == 200
+
+def test_users_being_moved_are_asked_to_retry(app, client, seeded):
+    with app.app_context():
+        db.session.add(UserShard(user_id=seeded['user_id'], shard_key=None, moving=True))
+        db.session.commit()
+    shard_map.forget(seeded['user_id'])
+
+    resource = client.get('/accounts', headers=seeded['headers'])
+    blueprint = client.get('/bills', headers=seeded['headers'])
+
+    assert (resource.status_code, blueprint.status_code) == (503, 503)
+    assert resource.headers['Retry-After'] == '5'
+    assert client.get('/users/me', headers=seeded['headers']).status_code == 200
+
+def test_the_outbox_poller_reads_every_shard(app, client, seeded):
+    subscription = event_hub.subscribe(seeded['user_id'])
+    with app.app_context():
+        event_hub.poll_outbox()
+
+        route_session(db.session, 'shard_1')
+        record_event('transaction.created', 'transaction', 999, {
+            'transaction': {'id': 999}, 'user_id': seeded['user_id'], 'balance': 1
+        })
+        db.session.commit()
+        stored = db.session.execute(select(func.count()).select_from(Transaction.__table__)).scalar()
+
+        assert event_hub.poll_outbox() == 1
+        assert stored == 0
+
+    assert [event_id for event_id, _ in subscription.wait(0)] == [999]
+    event_hub.unsubscribe(subscription)
+
+def test_shard_commands(app, seeded):
+    runner = app.test_cli_runner()
+
+    moved = runner.invoke(args=['shards-move', str(seeded['user_id']), 'shard_1', '--settle', '0'])
+    status = runner.invoke(args=['shards-status'])
+    again = runner.invoke(args=['shards-move', str(seeded['user_id']), 'shard_1', '--settle', '0'])
+
+    assert moved.exit_code == 0 and 'accounts: 3 rows' in moved.output
+    assert 'shard_1: 1 users' in status.output
+    assert again.exit_code != 0 and 'already on shard_1' in again.output
@@ -0,0 +1,79 @@
+import datetime
+import pytest
+from src.commands.archive import archive_transactions
+from src.models.base import db
+from src.models.transaction import Transaction
+from src.models.transaction_archive import TransactionArchive
+
+@pytest.fixture
+def history(app, seeded):
+    """
+    Backdate two of the seeded transactions past the 90 day hot horizon
+    """
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=200)
+    with app.app_context():
+        ids = [transaction.id for transaction in Transaction.query.order_by(Transaction.id).limit(2)]
+        Transaction.query.filter(Transaction.id.in_(ids)).update(
+            {'created_at': old}, synchronize_session=False
+        )
+        db.session.commit()
+    return ids
+
+def test_archive_moves_old_rows_in_batches(app, history):
+    with app.app_context():
+        total = Transaction.query.count()
+        messages = []
+
+        moved = archive_transactions(batch_size=1, echo=messages.append)
+
+        assert moved == 2
+        assert messages == ['Archived 1 transactions', 'Archived 2 transactions']
+        assert Transaction.query.count() == total - 2
+        assert sorted(row.id for row in TransactionArchive.query) == history
+        assert all(row.archived_at is not None for row in TransactionArchive.query)
+
+        # Nothing left to move
+        assert archive_transactions() == 0
+
+def test_reads_skip_the_archive_unless_the_range_reaches_back(app, client, seeded, history, query_recorder):
+    with app.app_context():
+        archive_transactions()
+    headers = seeded['headers']
+
+    recent_start = (datetime.date.today() - datetime.timedelta(days=30)).isoformat()
+    with query_recorder() as queries:
+        recent = client.get(f'/transactions?start_date={recent_start}', headers=headers).get_json()
+    assert queries.count == 1
+    assert not {transaction['id'] for transaction in recent} & set(history)
+
+    start = (datetime.date.today() - datetime.timedelta(days=365)).isoformat()
+    with query_recorder() as queries:
+        everything = client.get(f'/transactions?start_date={start}', headers=headers).get_json()
+    assert queries.count == 2
+    assert set(history) <= {transaction['id'] for transaction in everything}
+    assert len(everything) == len(recent) + 2
+
+    end = (datetime.date.today() - datetime.timedelta(days=100)).isoformat()
+    archived_only = client.get(f'/transactions?start_date={start}&end_date={end}', headers=headers).get_json()
+    assert sorted(transaction['id'] for transaction in archived_only) == history
+
+def test_ranges_without_a_start_include_the_archive(app, client, seeded, history):
+    with app.app_context():
+        archive_transactions()
+    headers = seeded['headers']
+
+    end = (datetime.date.today() - datetime.timedelta(days=100)).isoformat()
+    old = client.get(f'/transactions?end_date={end}', headers=headers).get_json()
+    everything = client.get('/transactions', headers=headers).get_json()
+
+    assert sorted(transaction['id'] for transaction in old) == history
+    assert set(history) <= {transaction['id'] for transaction in everything}
+
+def test_archived_transaction_keeps_its_url(app, client, seeded, history):
+    with app.app_context():
+        archive_transactions()
+
+    response = client.get(f'/transactions/{history[0]}', headers=seeded['headers'])
+
+    assert response.status_code == 200
+    assert response.get_json()['id'] == history[0]
@@ -0,0 +1,76 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from src.models.utils.user_cache import UserCache, UserSnapshot
+
+class FakeUser:
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+        self.email = f'{username}@example.com'
+        self.password_hash = generate_password_hash('Test1234!')
+        self.is_active = True
+
+def test_user_loader_hits_database_once_per_ttl():
+    cache = UserCache(ttl=60, max_size=10)
+    calls = []
+
+    def loader(user_id):
+        calls.append(user_id)
+        return FakeUser(user_id, 'testuser')
+
+    first = cache.get_or_load(1, loader)
+    second = cache.get_or_load(1, loader)
+
+    assert calls == [1]
+    assert first is second
+    assert second.username == 'testuser'
+    assert second.get_id() == '1'
+    assert second.check_password('Test1234!')
+
+def test_snapshot_is_read_only():
+    snapshot = UserSnapshot.from_user(FakeUser(1, 'testuser'))
+
+    with pytest.raises(AttributeError):
+        snapshot.username = 'changed'
+
+def test_invalidate_forces_reload():
+    cache = UserCache(ttl=60, max_size=10)
+    cache.get_or_load(1, lambda user_id: FakeUser(user_id, 'before'))
+
+    cache.invalidate(1)
+    reloaded = cache.get_or_load(1, lambda user_id: FakeUser(user_id, 'after'))
+
+    assert reloaded.username == 'after'
+
+def test_cache_is_size_bounded():
+    cache = UserCache(ttl=60, max_size=2)
+    for user_id in (1, 2, 3):
+        cache.get_or_load(user_id, lambda uid: FakeUser(uid, f'user{uid}'))
+
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+    assert cache.get(3) is not None
+
+def test_expired_entries_are_reloaded():
+    cache = UserCache(ttl=0, max_size=10)
+    calls = []
+
+    def loader(user_id):
+        calls.append(user_id)
+        return FakeUser(user_id, 'testuser')
+
+    cache.get_or_load(1, loader)
+    cache.get_or_load(1, loader)
+
+    assert calls == [1, 1]
+
+def test_profile_updates_reach_the_user_loader(app, client, seeded):
+    load_user = app.login_manager._user_callback
+    with app.test_request_context():
+        assert load_user(str(seeded['user_id'])).email != 'renamed@example.com'
+
+    response = client.put('/users/me', headers=seeded['headers'], json={'email': 'renamed@example.com'})
+
+    assert response.status_code == 200
+    with app.test_request_context():
+        assert load_user(str(seeded['user_id'])).email == 'renamed@example.com'
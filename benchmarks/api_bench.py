@@ -0,0 +1,190 @@
+"""
+Load benchmark for the API read endpoints.
+
+Boots create_app against a seeded SQLite file per data scale, drives the
+real routes through the WSGI stack from several client threads, and writes
+p50/p95/p99 latency and requests per second as JSON so runs can be compared
+across commits.
+
+    python benchmarks/api_bench.py --scales 1000,100000 --concurrency 1,8 --output bench.json
+    python benchmarks/api_bench.py --compare bench_main.json --output bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ENDPOINTS = ['/accounts', '/transactions', '/bills', '/budgets', '/transactions/categories']
+# Fixed so the seeded data is identical on every machine and commit
+SEED_END_DATE = datetime.date(2024, 1, 1)
+DEFAULT_SCALES = '1000,100000,1000000'
+DEFAULT_CONCURRENCY = '1,4,16'
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def build_app(scale, db_dir, reuse):
+    from flask_jwt_extended import create_access_token
+    from src.app import create_app
+    from src.commands.seed import seed_database
+    from src.models.base import db
+
+    path = os.path.join(db_dir, f'bench_{scale}.db')
+    fresh = not (reuse and os.path.exists(path))
+    if fresh and os.path.exists(path):
+        os.remove(path)
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'REQUEST_METRICS_ENABLED': False
+    })
+    with app.app_context():
+        if fresh:
+            started = time.perf_counter()
+            db.create_all()
+            seed_database(users=max(10, scale // 1000), transactions=scale, end_date=SEED_END_DATE)
+            print(f'Seeded {scale} transactions in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        token = create_access_token(identity=1)
+
+    return app, {'Authorization': f'Bearer {token}'}
+
+def drive(app, headers, endpoint, concurrency, requests_per_client):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def client_loop():
+        client = app.test_client()
+        local_latencies = []
+        local_errors = 0
+        barrier.wait()
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            response = client.get(endpoint, headers=headers)
+            response.get_data()
+            local_latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'rps': len(latencies) / elapsed if elapsed else None,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous, current, max_regression):
+    """
+    Print p95 changes against a previous run; return the keys that regressed
+    """
+    def key(result):
+        return (result['endpoint'], result['scale'], result['concurrency'])
+
+    baseline = {key(result): result for result in previous['results']}
+    regressions = []
+    for result in current['results']:
+        old = baseline.get(key(result))
+        if old is None:
+            continue
+        change = (result['p95_ms'] - old['p95_ms']) / old['p95_ms'] if old['p95_ms'] else 0
+        print(f"{result['endpoint']:<28} scale={result['scale']:<8} c={result['concurrency']:<3} "
+              f"p95 {old['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms ({change:+.0%})", file=sys.stderr)
+        if change > max_regression:
+            regressions.append(key(result))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help='Comma-separated transaction counts')
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY, help='Comma-separated client thread counts')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per client thread')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--db-dir', default=os.path.join(ROOT, 'instance'))
+    parser.add_argument('--reuse', action='store_true', help='Reuse seeded database files from a previous run')
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', help='Previous JSON report to compare p95 latency against')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='Allowed p95 increase before failing')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.db_dir, exist_ok=True)
+    scales = [int(value) for value in args.scales.split(',')]
+    levels = [int(value) for value in args.concurrency.split(',')]
+    endpoints = [value for value in args.endpoints.split(',') if value]
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'requests_per_client': args.requests,
+        'results': []
+    }
+
+    for scale in scales:
+        app, headers = build_app(scale, args.db_dir, args.reuse)
+        for endpoint in endpoints:
+            # Warm caches and connection pools before measuring
+            drive(app, headers, endpoint, 1, 5)
+            for concurrency in levels:
+                result = drive(app, headers, endpoint, concurrency, args.requests)
+                result['scale'] = scale
+                report['results'].append(result)
+                print(f"{endpoint:<28} scale={scale:<8} c={concurrency:<3} "
+                      f"p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+                      f"p99={result['p99_ms']:.2f}ms rps={result['rps']:.0f}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(json.load(handle), report, args.max_regression)
+        if regressions:
+            print(f'p95 regressed by more than {args.max_regression:.0%} for: {regressions}', file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
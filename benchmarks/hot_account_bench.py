@@ -0,0 +1,107 @@
+"""
+Deposit throughput into a single hot account, with and without balance shards.
+
+Runs concurrent workers that each post deposits to the same account, one
+per commit as POST /transactions does, first with the account unsharded and
+then with it spread over each shard count, and reports deposits per second.
+
+    python benchmarks/hot_account_bench.py --database-url postgresql://localhost/revobank_bench --shards 0,4,16
+
+Scaling with the shard count only shows on a database with row locks
+(PostgreSQL, MySQL). The default SQLite file serialises every writer on one
+database lock, so there it measures the overhead of the shard path instead.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def deposits_per_second(app, account_id, workers, deposits):
+    from src.models.base import db
+    from src.models.utils.ledger import deposit, posting_engine
+
+    per_worker = deposits // workers
+    start = threading.Barrier(workers + 1)
+
+    def work():
+        with app.app_context():
+            start.wait()
+            for _ in range(per_worker):
+                posting_engine.post([deposit(account_id, 1)])
+                db.session.commit()
+
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return per_worker * workers / (time.perf_counter() - started)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Defaults to a temporary SQLite file')
+    parser.add_argument('--shards', default='0,4,16', help='Shard counts to compare; 0 is unsharded')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--deposits', type=int, default=2000)
+    parser.add_argument('--output', help='Write the JSON result to this file as well')
+    args = parser.parse_args(argv)
+    shard_counts = [int(count) for count in args.shards.split(',')]
+
+    from src.app import create_app
+    from src.commands.ledger import fold_all_shards
+    from src.models.base import db
+    from src.models.account import Account
+    from src.models.user import User
+    from src.models.utils.ledger import balance_drift, set_balance_shards
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'hot.db')}"
+        app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'LOG_LEVEL': 'WARNING'})
+        with app.app_context():
+            db.create_all(bind_key=None)
+            user = User(username='merchant', email='merchant@example.com')
+            user.set_password('Bench1234!')
+            db.session.add(user)
+            db.session.flush()
+            account = Account(user_id=user.id, account_number='9999999999', account_type='checking', balance=0)
+            db.session.add(account)
+            db.session.commit()
+            account_id = account.id
+
+        runs = {}
+        for shard_count in shard_counts:
+            with app.app_context():
+                set_balance_shards(account_id, shard_count)
+                db.session.commit()
+            runs[shard_count] = deposits_per_second(app, account_id, args.workers, args.deposits)
+
+        with app.app_context():
+            fold_all_shards()
+            drifted = balance_drift()
+            balance = float(db.session.get(Account, account_id).balance)
+            db.drop_all(bind_key=None)
+
+    result = {
+        'database': url.split(':', 1)[0],
+        'workers': args.workers,
+        'deposits': args.deposits,
+        'deposits_per_second': {f'shards_{count}': round(rate) for count, rate in runs.items()},
+        'final_balance': balance,
+        'drifted_accounts': len(drifted)
+    }
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(result, handle, indent=2)
+
+if __name__ == '__main__':
+    main()
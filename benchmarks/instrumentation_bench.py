@@ -0,0 +1,83 @@
+"""
+Per-request cost of the request metrics.
+
+Serves the same requests through the test client with REQUEST_METRICS_ENABLED
+on and off (SQL listeners, Server-Timing header, histograms and the timed
+JSON encoders) and reports the difference in microseconds per request, for
+a route without SQL and for GET /accounts.
+
+    python benchmarks/instrumentation_bench.py --requests 5000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def build_app(database_url, enabled):
+    from src.app import create_app
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'REQUEST_METRICS_ENABLED': enabled,
+        'SSE_OUTBOX_POLL_SECONDS': 0
+    })
+
+def seed_user(app):
+    from flask_jwt_extended import create_access_token
+    from src.models.base import db
+    from src.models.account import Account
+    from src.models.user import User
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        user = User(username='bench', email='bench@example.com')
+        user.set_password('Bench1234!')
+        db.session.add(user)
+        db.session.flush()
+        for index in range(3):
+            db.session.add(Account(user_id=user.id, account_number=f'BENCH{index:05d}',
+                                   account_type='checking', balance=100))
+        db.session.commit()
+        return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+def us_per_request(app, path, headers, requests):
+    client = app.test_client()
+    client.get(path, headers=headers)
+    return min(timeit.repeat(lambda: client.get(path, headers=headers), number=requests, repeat=3)) / requests * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--output', help='Write the JSON result to this file as well')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        headers = seed_user(build_app(database_url, False))
+
+        paths = {'health': '/', 'accounts': '/accounts'}
+        # Every unmetered run goes first: the SQL listeners, once installed, stay for the process
+        off = {name: us_per_request(build_app(database_url, False), path, headers, args.requests)
+               for name, path in paths.items()}
+        on = {name: us_per_request(build_app(database_url, True), path, headers, args.requests)
+              for name, path in paths.items()}
+
+    result = {'requests': args.requests}
+    for name in paths:
+        result[name] = {
+            'off_us_per_request': round(off[name], 2),
+            'on_us_per_request': round(on[name], 2),
+            'overhead_us_per_request': round(on[name] - off[name], 2)
+        }
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(result, handle, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Posting throughput of the double-entry ledger.
+
+Posts a mix of deposits and withdrawals over a set of accounts in a SQLite
+file, one posting per commit (what a single POST /transactions costs) and
+then in batches of increasing size, and reports postings per second.
+
+    python benchmarks/ledger_bench.py --postings 20000 --accounts 100 --batch-sizes 10,100,500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def make_postings(count, account_ids, seed=42):
+    from src.models.utils.ledger import deposit, withdrawal
+    rng = random.Random(seed)
+    # Withdrawals stay small against the opening balances, so none overdraw
+    return [
+        deposit(rng.choice(account_ids), rng.randint(1, 500)) if rng.random() < 0.6
+        else withdrawal(rng.choice(account_ids), rng.randint(1, 50))
+        for _ in range(count)
+    ]
+
+def postings_per_second(postings, per_commit):
+    from src.models.base import db
+    from src.models.utils.ledger import posting_engine
+
+    started = time.perf_counter()
+    for start in range(0, len(postings), per_commit):
+        posting_engine.post(postings[start:start + per_commit])
+        db.session.commit()
+    return len(postings) / (time.perf_counter() - started)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--postings', type=int, default=20000)
+    parser.add_argument('--accounts', type=int, default=100)
+    parser.add_argument('--batch-sizes', default='10,100,500')
+    parser.add_argument('--output', help='Write the JSON result to this file as well')
+    args = parser.parse_args(argv)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+
+    from src.app import create_app
+    from src.models.base import db
+    from src.models.account import Account
+    from src.models.user import User
+    from src.models.utils.ledger import balance_drift, opening_balance, posting_engine, trial_balance
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directory, 'ledger.db')}",
+                          'LOG_LEVEL': 'WARNING'})
+        with app.app_context():
+            db.create_all(bind_key=None)
+            user = User(username='bench', email='bench@example.com')
+            user.set_password('Bench1234!')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all([
+                Account(user_id=user.id, account_number=f'{index:010d}', account_type='savings', balance=0)
+                for index in range(args.accounts)
+            ])
+            db.session.commit()
+            account_ids = db.session.scalars(db.select(Account.id)).all()
+            posting_engine.post([opening_balance(account_id, 100000) for account_id in account_ids])
+            db.session.commit()
+
+            # Smaller run for the slow path: it only has to be long enough to time
+            single_count = min(args.postings, 2000)
+            runs = {'1_per_commit': postings_per_second(make_postings(single_count, account_ids), 1)}
+            for size in batch_sizes:
+                runs[f'batch_{size}'] = postings_per_second(make_postings(args.postings, account_ids, seed=size), size)
+
+            debits, credits = trial_balance()
+            result = {
+                'postings': args.postings,
+                'accounts': args.accounts,
+                'postings_per_second': {name: round(rate) for name, rate in runs.items()},
+                'speedup_vs_1_per_commit': {
+                    name: round(rate / runs['1_per_commit'], 1) for name, rate in runs.items()
+                },
+                'journal_balances': debits == credits,
+                'drifted_accounts': len(balance_drift())
+            }
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(result, handle, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Cold-start benchmark for the API.
+
+Measures, in fresh interpreters, how long `import src.app` and `create_app()`
+take and exits non-zero when either median exceeds its budget, so a slow
+import or a database call sneaking back into startup fails CI.
+
+    python benchmarks/startup_bench.py --runs 5 --max-import-ms 1500 --max-startup-ms 250
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+from src.app import create_app
+imported = time.perf_counter()
+create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+created = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'startup_ms': (created - imported) * 1000}))
+'''
+
+def run_probe():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=float(os.environ.get('MAX_IMPORT_MS', 1500)))
+    parser.add_argument('--max-startup-ms', type=float, default=float(os.environ.get('MAX_STARTUP_MS', 250)))
+    parser.add_argument('--output', help='Write the JSON result to this file as well')
+    args = parser.parse_args(argv)
+
+    samples = [run_probe() for _ in range(args.runs)]
+    result = {
+        'runs': args.runs,
+        'import_ms': statistics.median(sample['import_ms'] for sample in samples),
+        'startup_ms': statistics.median(sample['startup_ms'] for sample in samples),
+        'max_import_ms': args.max_import_ms,
+        'max_startup_ms': args.max_startup_ms
+    }
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(result, handle, indent=2)
+
+    failures = []
+    if result['import_ms'] > args.max_import_ms:
+        failures.append(f"import took {result['import_ms']:.1f}ms (budget {args.max_import_ms:.0f}ms)")
+    if result['startup_ms'] > args.max_startup_ms:
+        failures.append(f"create_app took {result['startup_ms']:.1f}ms (budget {args.max_startup_ms:.0f}ms)")
+
+    for failure in failures:
+        print(f'Cold start regression: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
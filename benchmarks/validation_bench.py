@@ -0,0 +1,74 @@
+"""
+Microbenchmark for request body parsing.
+
+Times, per request, the reqparse parser the resources used to build on every
+call against the compile-once marshmallow schema, inside a real request
+context, plus whole-array validation of a bulk body with many=True.
+
+    python benchmarks/validation_bench.py --iterations 20000 --bulk-size 100
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BODY = {'account_id': 1, 'transaction_type': 'deposit', 'amount': 25.5, 'description': 'Salary'}
+
+def reqparse_per_request():
+    # What TransactionCreationResource.post did before the schema layer
+    from flask_restful import reqparse
+    parser = reqparse.RequestParser()
+    parser.add_argument('account_id', type=int, required=True, help='Account ID is required')
+    parser.add_argument('transaction_type', type=str, required=True, help='Transaction type is required')
+    parser.add_argument('amount', type=float, required=True, help='Amount is required')
+    parser.add_argument('description', type=str)
+    args = parser.parse_args()
+    valid_types = ['deposit', 'withdrawal', 'transfer']
+    if args['transaction_type'] not in valid_types:
+        raise ValueError(args['transaction_type'])
+    return args
+
+def time_per_call_us(function, iterations):
+    return min(timeit.repeat(function, number=iterations, repeat=3)) / iterations * 1e6
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--bulk-size', type=int, default=100)
+    parser.add_argument('--output', help='Write the JSON result to this file as well')
+    args = parser.parse_args(argv)
+
+    from src.app import create_app
+    from src.models.utils.schemas import TRANSACTION_CREATION_SCHEMA, load_request
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    bulk_body = [dict(BODY, amount=index + 1) for index in range(args.bulk_size)]
+
+    with app.test_request_context('/transactions', method='POST', json=BODY):
+        reqparse_us = time_per_call_us(reqparse_per_request, args.iterations)
+        schema_us = time_per_call_us(lambda: load_request(TRANSACTION_CREATION_SCHEMA), args.iterations)
+
+    bulk_iterations = max(1, args.iterations // args.bulk_size)
+    with app.test_request_context('/transactions', method='POST', json=bulk_body):
+        bulk_us = time_per_call_us(lambda: load_request(TRANSACTION_CREATION_SCHEMA, many=True), bulk_iterations)
+
+    result = {
+        'iterations': args.iterations,
+        'reqparse_us_per_request': round(reqparse_us, 2),
+        'schema_us_per_request': round(schema_us, 2),
+        'speedup': round(reqparse_us / schema_us, 2),
+        'bulk_size': args.bulk_size,
+        'bulk_us_per_item': round(bulk_us / args.bulk_size, 2)
+    }
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(result, handle, indent=2)
+
+if __name__ == '__main__':
+    main()
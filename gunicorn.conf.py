@@ -0,0 +1,33 @@
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+# gevent serves each connection on a greenlet, so thousands of idle
+# GET /transactions/stream clients fit in one worker. Under `sync` a stream
+# would hold a whole worker, and the app refuses streams with a 503.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 2000))
+
+if worker_class == 'gevent':
+    # Patched before the preloaded app creates its locks, threads and sockets
+    from gevent import monkey
+    monkey.patch_all()
+
+# Build the app once in the master and fork it into every worker
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master so each worker
+    opens its own pool instead of sharing sockets with its siblings
+    """
+    if not server.cfg.preload_app:
+        return
+
+    from src.models.base import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -1,6 +1,5 @@
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from flask import current_app, has_app_context
 from alembic import context
 import sys
 import os
@@ -11,25 +10,32 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import your app and models
 from src.app import create_app
 from src.models.base import db
-from src.models.user import User
-from src.models.account import Account
-from src.models.transaction import Transaction
+from src.commands.database import import_models
 
 # Alembic Config object
 config = context.config
 
 # Interpret the config file for Python logging
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
-# Add your model's MetaData object here
+# Every model must be imported for autogenerate to see its table
+import_models()
 target_metadata = db.metadata
 
+def app_context():
+    """
+    Reuse the app `flask db` (or flask_migrate.upgrade) is running under,
+    so migrations target the configured database instead of a fresh app's default
+    """
+    if has_app_context():
+        return current_app.app_context()
+    return create_app().app_context()
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode."""
-    app = create_app()
-    with app.app_context():
-        url = app.config.get('SQLALCHEMY_DATABASE_URI')
+    with app_context():
+        url = current_app.config.get('SQLALCHEMY_DATABASE_URI')
         context.configure(
             url=url,
             target_metadata=target_metadata,
@@ -42,18 +48,13 @@ def run_migrations_offline():
 
 def run_migrations_online():
     """Run migrations in 'online' mode."""
-    app = create_app()
-    with app.app_context():
-        connectable = engine_from_config(
-            app.config,
-            prefix="SQLALCHEMY_",
-            poolclass=pool.NullPool,
-        )
-
-        with connectable.connect() as connection:
+    with app_context():
+        # Migrations always run against the primary, never a replica bind
+        with db.engine.connect() as connection:
             context.configure(
-                connection=connection, 
-                target_metadata=target_metadata
+                connection=connection,
+                target_metadata=target_metadata,
+                render_as_batch=connection.dialect.name == 'sqlite'
             )
 
             with context.begin_transaction():
@@ -62,4 +63,4 @@ def run_migrations_online():
 if context.is_offline_mode():
     run_migrations_offline()
 else:
-    run_migrations_online()
\ No newline at end of file
+    run_migrations_online()
@@ -0,0 +1,37 @@
+"""Indexes for the columns the routes filter and sort on
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-11-04 09:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # GET /accounts, ownership checks on every account/transaction route
+    op.create_index('ix_accounts_user_id', 'accounts', ['user_id'])
+    # Transactions of an account, newest first; the prefix also serves account_id lookups
+    op.create_index('ix_transactions_account_id_created_at', 'transactions', ['account_id', 'created_at'])
+    op.create_index('ix_transactions_category_id', 'transactions', ['category_id'])
+    # GET /bills, upcoming bills by due date
+    op.create_index('ix_bills_user_id_due_date', 'bills', ['user_id', 'due_date'])
+    op.create_index('ix_bills_account_id', 'bills', ['account_id'])
+    # GET /budgets
+    op.create_index('ix_budgets_user_id', 'budgets', ['user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_budgets_user_id', table_name='budgets')
+    op.drop_index('ix_bills_account_id', table_name='bills')
+    op.drop_index('ix_bills_user_id_due_date', table_name='bills')
+    op.drop_index('ix_transactions_category_id', table_name='transactions')
+    op.drop_index('ix_transactions_account_id_created_at', table_name='transactions')
+    op.drop_index('ix_accounts_user_id', table_name='accounts')
@@ -0,0 +1,45 @@
+"""Cold transactions archive
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-11-11 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'transactions_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_type', sa.String(length=50), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+        sa.ForeignKeyConstraint(['category_id'], ['transaction_categories.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_transactions_archive_account_id_created_at', 'transactions_archive', ['account_id', 'created_at']
+    )
+    # The archival job walks the hot table oldest first
+    op.create_index('ix_transactions_created_at', 'transactions', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_transactions_created_at', table_name='transactions')
+    op.drop_index('ix_transactions_archive_account_id_created_at', table_name='transactions_archive')
+    op.drop_table('transactions_archive')
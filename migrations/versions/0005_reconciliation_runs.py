@@ -0,0 +1,37 @@
+"""Reconciliation runs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-11-25 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'reconciliation_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('mode', sa.String(length=20), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('accounts_checked', sa.Integer(), nullable=True),
+        sa.Column('discrepancies', sa.Integer(), nullable=True),
+        sa.Column('report_path', sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Incremental reconciliation looks up accounts touched since the last run
+    op.create_index('ix_accounts_updated_at', 'accounts', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_accounts_updated_at', table_name='accounts')
+    op.drop_table('reconciliation_runs')
@@ -0,0 +1,53 @@
+"""Double-entry journal
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-12-02 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'journal_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('reference', sa.String(length=32), nullable=False),
+        sa.Column('entry_type', sa.String(length=30), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=True),
+        sa.Column('description', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('reference')
+    )
+    op.create_index('ix_journal_entries_transaction_id', 'journal_entries', ['transaction_id'])
+    op.create_table(
+        'journal_lines',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entry_id', sa.Integer(), nullable=False),
+        sa.Column('account_id', sa.Integer(), nullable=True),
+        sa.Column('ledger_account', sa.String(length=50), nullable=True),
+        sa.Column('side', sa.String(length=6), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+        sa.ForeignKeyConstraint(['entry_id'], ['journal_entries.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_journal_lines_entry_id', 'journal_lines', ['entry_id'])
+    op.create_index('ix_journal_lines_account_id_entry_id', 'journal_lines', ['account_id', 'entry_id'])
+
+
+def downgrade():
+    op.drop_index('ix_journal_lines_account_id_entry_id', table_name='journal_lines')
+    op.drop_index('ix_journal_lines_entry_id', table_name='journal_lines')
+    op.drop_table('journal_lines')
+    op.drop_index('ix_journal_entries_transaction_id', table_name='journal_entries')
+    op.drop_table('journal_entries')
@@ -0,0 +1,35 @@
+"""Sharded balances for hot accounts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-12-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('accounts') as batch_op:
+        batch_op.add_column(sa.Column('balance_shards', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'account_balance_shards',
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('balance', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+        sa.PrimaryKeyConstraint('account_id', 'shard')
+    )
+
+
+def downgrade():
+    op.drop_table('account_balance_shards')
+    with op.batch_alter_table('accounts') as batch_op:
+        batch_op.drop_column('balance_shards')
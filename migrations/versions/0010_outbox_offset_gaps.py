@@ -0,0 +1,25 @@
+"""Outbox consumer offset gaps
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2024-12-27 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('outbox_consumer_offsets', sa.Column('gaps', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('outbox_consumer_offsets') as batch_op:
+        batch_op.drop_column('gaps')
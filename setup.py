@@ -9,9 +9,9 @@ setup(
     packages=find_packages(where='src'),
     package_dir={'': 'src'},
     install_requires=[
-        'flask>=2.1.0',
+        'flask>=2.3.2',
         'flask-restful>=0.3.9',
-        'flask-sqlalchemy>=2.5.1',
+        'flask-sqlalchemy>=3.0.3',
         'PyJWT>=2.3.0',
         'psycopg2-binary>=2.9.3',
         'email-validator>=1.1.3',
@@ -26,6 +26,10 @@ setup(
         ],
         'prod': [
             'gunicorn>=20.1.0',
+            'gevent>=24.2.1',
+        ],
+        'brotli': [
+            'brotli>=1.1.0',
         ]
     },
     classifiers=[
@@ -17,8 +17,12 @@ print("SECRET_KEY:", secrets.token_hex(32))
 print("JWT_SECRET_KEY:", secrets.token_hex(32))
 
 class FinancialFeaturesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Building the app is side-effect free, so one instance serves every test
+        cls.app = create_app("testing")
+
     def setUp(self):
-        self.app = create_app("testing")
         self.client = self.app.test_client()
         self.app_context = self.app.app_context()
         self.app_context.push()
@@ -1,7 +1,7 @@
 ﻿from src.app import create_app
 
-app = create_app()
+# Gunicorn builds the app through the factory (see Procfile and gunicorn.conf.py),
+# so importing this module stays free of side effects.
 
 if __name__ == "__main__":
-    app.run()
-    
\ No newline at end of file
+    create_app().run()